@@ -1,20 +1,220 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Entity
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q
+from django.utils.functional import cached_property
+from .models import (
+    User, Entity, AgentProfile, NotificationPreference, Report, ArchivedReport, Document, Activity, Transaction, Payment,
+    PaymentEvent,
+)
+from .db_router import ReplicaChangeListMixin
+from .services.archive_service import restore_report
+
+
+def estimated_row_count(queryset):
+    """Return the planner's row estimate for the queryset's table (PostgreSQL only), or None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 until the table has been analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts a whole large table.
+
+    Unfiltered changelists use PostgreSQL's row estimate once it exceeds
+    ADMIN_COUNT_LIMIT. Everything else is counted exactly, but only up to
+    ADMIN_COUNT_LIMIT rows, so the page count is capped rather than slow.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        limit = settings.ADMIN_COUNT_LIMIT
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
+
+
+class LargeTableAdminMixin:
+    """
+    Changelist settings for tables with millions of rows: no full-table
+    count, capped pagination counts and search by exact match on indexed
+    columns only (`search_fields`) instead of an icontains scan.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = Q()
+        for field_name in self.search_fields:
+            field = get_fields_from_path(self.model, field_name)[-1]
+            try:
+                value = field.to_python(term)
+            except ValidationError:
+                # e.g. a name typed into an id column
+                continue
+            query |= Q(**{field_name: value})
+        return (queryset.filter(query) if query else queryset.none()), False
+
+
+@admin.display(description='Report')
+def report_number(obj):
+    # The report's id without fetching the report (and, for its __str__, its user)
+    return obj.report_id
+
+
+class PaymentStatusFilter(admin.SimpleListFilter):
+    # Fixed options: the default filter would SELECT DISTINCT over the whole table
+    title = 'status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return [(status, status) for status in ('pending', 'completed', 'failed')]
+
+    def queryset(self, request, queryset):
+        return queryset.filter(status=self.value()) if self.value() else queryset
+
 
 # Register the User model with UserAdmin
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         ('Custom Fields', {
-            'fields': ('entity', 'name', 'hashed_password'),
+            'fields': ('entity', 'name'),
         }),
     )
     list_display = ('username', 'email', 'name', 'entity', 'is_admin', 'is_user')  # Fields to display in the user list
-    search_fields = ('username', 'email', 'name')  # Fields to search by
+    list_select_related = ('entity',)
+    search_fields = ('username', 'email')  # Unique, indexed columns
+    raw_id_fields = ('entity',)
+
+    def get_queryset(self, request):
+        # Role columns come from the changelist query instead of two queries per row
+        memberships = User.groups.through.objects.filter(user_id=OuterRef('pk'))
+        return super().get_queryset(request).annotate(
+            has_admin_role=Exists(memberships.filter(group__name='admin')),
+            has_user_role=Exists(memberships.filter(group__name='user')),
+        )
+
+    @admin.display(boolean=True, description='Admin', ordering='has_admin_role')
+    def is_admin(self, obj):
+        return obj.has_admin_role
+
+    @admin.display(boolean=True, description='User', ordering='has_user_role')
+    def is_user(self, obj):
+        return obj.has_user_role
 
 # Register the Entity model
 @admin.register(Entity)
-class EntityAdmin(admin.ModelAdmin):
-    list_display = ('name', 'entity_type', 'admin_user')  # Fields to display in the entity list
-    search_fields = ('name', 'entity_type')  # Fields to search by
\ No newline at end of file
+class EntityAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'entity_type', 'admin_user', 'credits')  # Fields to display in the entity list
+    list_select_related = ('admin_user',)
+    list_filter = ('entity_type',)
+    search_fields = ('id', 'name')
+    raw_id_fields = ('admin_user',)
+
+@admin.register(AgentProfile)
+class AgentProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'services', 'is_active')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ('user', 'enabled', 'statuses', 'digest_minutes')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Report)
+class ReportAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'target_entity_name', 'target_entity_pan', 'status', 'user', 'agent', 'credits', 'created_at',
+                    'escalated_at')
+    list_select_related = ('user', 'agent')
+    list_filter = ('status', 'service_links__service', ('escalated_at', admin.EmptyFieldListFilter))
+    # Status changes go through backend.services.report_status_service
+    readonly_fields = ('status', 'status_changed_at', 'escalated_at')
+    search_fields = ('id', 'target_entity_pan', 'user__email')
+    raw_id_fields = ('user', 'agent')
+    # Only primary-key order is index-backed on every filter
+    sortable_by = ('id',)
+
+
+@admin.register(ArchivedReport)
+class ArchivedReportAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'status', 'user', 'entity', 'created_at', 'archived_at')
+    list_select_related = ('user', 'entity')
+    list_filter = ('status',)
+    search_fields = ('id', 'user__email')
+    # The compressed payload is only readable through backend.services.archive_service
+    exclude = ('payload',)
+    readonly_fields = ('id', 'user', 'entity', 'status', 'created_at', 'archived_at')
+    sortable_by = ('id',)
+    actions = ('restore',)
+
+    @admin.action(description="Restore selected reports to the live tables")
+    def restore(self, request, queryset):
+        restored = sum(restore_report(report_id) is not None for report_id in queryset.values_list('id', flat=True))
+        self.message_user(request, f"Restored {restored} reports.")
+
+
+@admin.register(Document)
+class DocumentAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', report_number, 'user', 's3_path', 'uploaded_at')
+    list_select_related = ('user',)
+    search_fields = ('id', 'report__id', 'user__email')
+    raw_id_fields = ('report', 'user')
+    sortable_by = ('id',)
+
+
+@admin.register(Activity)
+class ActivityAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', report_number, 'user', 'timestamp', 'old_state', 'new_state')
+    list_select_related = ('user',)
+    search_fields = ('report__id', 'user__email')
+    raw_id_fields = ('report', 'user')
+    sortable_by = ('id',)
+
+
+@admin.register(Transaction)
+class TransactionAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', report_number, 'user', 'credits', 'created_at')
+    list_select_related = ('user',)
+    search_fields = ('report__id', 'user__email')
+    raw_id_fields = ('report', 'user')
+    sortable_by = ('id',)
+
+
+@admin.register(Payment)
+class PaymentAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'payment_id', 'user', 'amount', 'status', 'created_at')
+    list_select_related = ('user',)
+    list_filter = (PaymentStatusFilter,)
+    search_fields = ('order_id', 'payment_id', 'user__email')
+    raw_id_fields = ('user',)
+    sortable_by = ('id',)
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(ReplicaChangeListMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'event_id', 'event_type', 'received_at', 'processed_at')
+    search_fields = ('event_id',)
+    sortable_by = ('id',)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend'
+
+    def ready(self):
+        from django.core import checks
+        from backend.caching import check_shared_cache
+        from backend.services.event_stream import check_event_broker
+        checks.register(check_shared_cache, checks.Tags.caches)
+        checks.register(check_event_broker)
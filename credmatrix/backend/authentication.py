@@ -0,0 +1,63 @@
+from django.contrib.auth.backends import ModelBackend
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from backend.models import User
+from backend.services.password_service import acheck_password_pooled, check_password_pooled
+
+_jwt = JWTAuthentication()
+
+
+async def aauthenticate_jwt(request):
+    """
+    Async counterpart of JWTAuthentication for plain Django async views.
+
+    Token validation is pure CPU work and runs inline; only the user lookup
+    touches the database, through the async ORM.
+
+    :param request: The incoming HttpRequest.
+    :return: The active User for a valid Bearer access token, or None.
+    """
+    header = _jwt.get_header(request)
+    if header is None:
+        return None
+    raw_token = _jwt.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        validated_token = _jwt.get_validated_token(raw_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+
+    user = await User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend that checks passwords on the bounded hashing pool (see
+    backend.services.password_service), with one query for the user.
+
+    HashingPoolSaturated propagates out of authenticate() so the login views
+    can answer 503 instead of reporting invalid credentials.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = User.objects.filter(username=username, is_active=True).first()
+        return user if check_password_pooled(user, password) else None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = await User.objects.filter(username=username, is_active=True).afirst()
+        return user if await acheck_password_pooled(user, password) else None
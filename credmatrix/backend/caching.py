@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Warning
+
+# Backends whose entries live in (and are only visible to) the current process
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def is_shared_cache(alias='default'):
+    """Whether entries written to the `alias` cache are seen by every worker process."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """System check: outside DEBUG, throttling and replica pinning need a cache shared by all workers."""
+    if settings.DEBUG or is_shared_cache():
+        return []
+    return [Warning(
+        "The default cache is per process.",
+        hint="Throttle counters and replica pins are not shared between workers, so throttle rates are "
+             "multiplied by the number of workers. Set CACHE_BACKEND to Redis or Memcached.",
+        id='backend.W001',
+    )]
@@ -0,0 +1,145 @@
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+
+class RoutingState:
+    """Per-request routing flags."""
+
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when there is no replica."""
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def use_read_replica():
+    """Send the rest of this request's reads to the replica (until it writes)."""
+    state = _routing_state.get()
+    if state is not None:
+        state.use_replica = True
+
+
+def _pin_key(user_id):
+    return f"db_pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Route this user's reads to the primary until the replica has caught up."""
+    cache.set(_pin_key(user_id), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return bool(user_id) and cache.get(_pin_key(user_id)) is not None
+
+
+async def ais_pinned_to_primary(user_id):
+    return bool(user_id) and await cache.aget(_pin_key(user_id)) is not None
+
+
+class ReplicaRouter:
+    """
+    Read/write splitting that is opt-in per request.
+
+    Reads go to the replica only when the request has called
+    `use_read_replica()` and has not written anything yet. All writes and
+    migrations go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None and state.use_replica and not state.wrote:
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Installs fresh routing state for each request. After a request that wrote
+    on behalf of a user, that user's reads stay on the primary for
+    DATABASE_REPLICA_PIN_SECONDS (read-your-writes across replication lag).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+            if state.wrote and replica_alias():
+                self._pin_writer(request)
+            return response
+        finally:
+            _routing_state.reset(token)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+            if state.wrote and replica_alias():
+                # request.user may be a lazy session lookup, which is sync-only
+                await sync_to_async(self._pin_writer)(request)
+            return response
+        finally:
+            _routing_state.reset(token)
+
+    def _pin_writer(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+
+
+class ReplicaReadMixin:
+    """
+    For read-only APIViews: once the user is authenticated (against the
+    primary), safe requests read from the replica unless the user is pinned.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(request.user.pk):
+            use_read_replica()
+
+
+class ReplicaChangeListMixin:
+    """For ModelAdmin classes: serve changelist pages from the replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(request.user.pk):
+            use_read_replica()
+        return super().changelist_view(request, extra_context)
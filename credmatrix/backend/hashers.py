@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 hasher whose work factor comes from settings.
+
+    The algorithm name is unchanged, so existing hashes keep verifying; when
+    PASSWORD_HASHER_ITERATIONS changes, `must_update` flags old hashes and they
+    are re-encoded on the user's next successful login.
+    """
+
+    iterations = getattr(settings, 'PASSWORD_HASHER_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,80 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from backend.models import Entity, User
+from backend.services.token_blacklist_service import IndexedRefreshToken
+from backend.synthetic_data import generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Compare many concurrent polling clients on the sync and native async report endpoints under ASGI"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000, help='Concurrent polling clients')
+        parser.add_argument('--polls', type=int, default=3, help='Requests per client')
+        parser.add_argument('--reports', type=int, default=20, help="Reports visible to the polling user's entity")
+
+    def handle(self, *args, **options):
+        totals = generate_dataset(1, users_per_entity=1, reports_per_user=options['reports'])
+        try:
+            user = User.objects.get(username__startswith=f"{totals['run']}-")
+            headers = {"Authorization": f"Bearer {IndexedRefreshToken.for_user(user).access_token}"}
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for label, route in (('sync (DRF APIView)', 'get-reports'), ('native async', 'reports-async')):
+                    result = asyncio.run(self.run_clients(reverse(route), headers, options['clients'], options['polls']))
+                    self.report(label, result)
+        finally:
+            User.objects.filter(username__startswith=f"{totals['run']}-").delete()
+            Entity.objects.filter(name__startswith=f"Entity {totals['run']}-").delete()
+
+    async def run_clients(self, path, headers, clients, polls):
+        latencies, statuses = [], Counter()
+        peak_threads = threading.active_count()
+        done = asyncio.Event()
+
+        async def sample_threads():
+            nonlocal peak_threads
+            while not done.is_set():
+                peak_threads = max(peak_threads, threading.active_count())
+                await asyncio.sleep(0.01)
+
+        async def poll():
+            client = AsyncClient()
+            for _ in range(polls):
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] += 1
+
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        await asyncio.gather(*(poll() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await sampler
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50": statistics.median(latencies),
+            "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+            "threads": peak_threads,
+            "statuses": dict(statuses),
+        }
+
+    def report(self, label, result):
+        self.stdout.write(
+            f"{label:20} {result['requests']} requests  {result['rps']:8.1f} req/s  "
+            f"p50 {result['p50']:8.1f} ms  p99 {result['p99']:8.1f} ms  "
+            f"peak threads {result['threads']:4}  statuses {result['statuses']}"
+        )
@@ -0,0 +1,234 @@
+import hashlib
+import hmac
+import json
+import logging
+import statistics
+import subprocess
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend import urls as backend_urls
+from backend.models import OTP, Document, Report, ReportImport, User
+from backend.services.assignment_service import claim_reports
+from backend.services.payment_gateway import StubPaymentGateway, get_payment_gateway, set_payment_gateway
+from backend.services.token_blacklist_service import IndexedRefreshToken
+from backend.synthetic_data import DEFAULT_PASSWORD, generate_dataset
+
+
+class Scenarios:
+    """
+    One request builder per route name in backend/urls.py. Each builder gets
+    the iteration number so write endpoints can use fresh inputs every time.
+    """
+
+    def __init__(self, user, gateway):
+        self.user = user
+        self.gateway = gateway
+        self.anon = APIClient()
+        self.auth = APIClient()
+        self.auth.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+        self.reports = list(Report.objects.filter(user__entity_id=user.entity_id).values_list('id', flat=True)[:1000])
+        self.document_ids = list(Document.objects.filter(user=user).values_list('id', flat=True)[:1000])
+        self.run = uuid.uuid4().hex[:8]
+        # Status reads poll one import; starts each need a fresh one (never run, as the transaction rolls back)
+        self.import_id = ReportImport.objects.create(user=user, s3_path="benchmark.csv", file_format="CSV").id
+        # The queue endpoints are for admins
+        user.groups.add(Group.objects.get_or_create(name='admin')[0])
+
+    def report_id(self, i):
+        return self.reports[i % len(self.reports)]
+
+    def build(self):
+        return {
+            'signup': self.signup,
+            'login': lambda i: self.anon.post(reverse('login'), {"email": self.user.email, "password": DEFAULT_PASSWORD}),
+            'login-async': lambda i: self.anon.post(
+                reverse('login-async'), {"email": self.user.email, "password": DEFAULT_PASSWORD}, format='json'),
+            'logout': lambda i: self.anon.post(reverse('logout'), {"refresh": str(IndexedRefreshToken.for_user(self.user))}),
+            'otp': lambda i: self.anon.post(reverse('otp'), {"email": f"otp-{self.run}-{i}@example.com"}),
+            'token-refresh': lambda i: self.anon.post(
+                reverse('token-refresh'), {"refresh": str(IndexedRefreshToken.for_user(self.user))}),
+            'schema': lambda i: self.anon.get(reverse('schema')),
+            'swagger-ui': lambda i: self.anon.get(reverse('swagger-ui')),
+            'get-reports': lambda i: self.auth.get(reverse('get-reports')),
+            'edit-report': lambda i: self.auth.put(
+                reverse('edit-report', args=[self.report_id(i)]), {"target_entity_name": f"Renamed {i}"}, format='json'),
+            'delete-report': lambda i: self.auth.patch(
+                reverse('delete-report', args=[self.report_id(i)]), {"cancellation_reason": "Benchmark"}),
+            'initiate-request': lambda i: self.auth.post(reverse('initiate-request'), {
+                "entity_name": f"Target {i}", "entity_pan": "ABCDE1234F", "services": ["BUREAU_REPORT"], "credits": 10,
+            }, format='json'),
+            'reports-async': lambda i: self.auth.get(reverse('reports-async')),
+            'report-detail-async': lambda i: self.auth.get(reverse('report-detail-async', args=[self.report_id(i)])),
+            'report-activities-async': lambda i: self.auth.get(
+                reverse('report-activities-async', args=[self.report_id(i)])),
+            'report-documents-async': lambda i: self.auth.get(
+                reverse('report-documents-async', args=[self.report_id(i)])),
+            # Times opening the stream (authentication and subscription headers), not reading it
+            'report-events': lambda i: self.auth.get(reverse('report-events')),
+            'create-report-import': lambda i: self.auth.post(
+                reverse('create-report-import'), {"file_name": f"targets-{i}.csv"}),
+            'start-report-import': self.start_import,
+            'report-import-status': lambda i: self.auth.get(reverse('report-import-status', args=[self.import_id])),
+            'upload-document': lambda i: self.auth.post(
+                reverse('upload-document'), {"document_name": f"doc{i}.pdf", "report_id": self.report_id(i)}),
+            'confirm-document-upload': lambda i: self.auth.post(
+                reverse('confirm-document-upload'), {"document_id": self.document_ids[i % len(self.document_ids)]}),
+            'notification-preferences': lambda i: self.auth.put(
+                reverse('notification-preferences'), {"digest_minutes": 30 + i % 30}, format='json'),
+            'usage-analytics': lambda i: self.auth.get(reverse('usage-analytics')),
+            'create-order': lambda i: self.auth.post(reverse('create-order'), {"amount": 100}, format='json'),
+            'verify-payment': self.verify_payment,
+            'razorpay-webhook': self.webhook,
+            'claim-reports': lambda i: self.auth.post(reverse('claim-reports'), {"limit": 5}, format='json'),
+            'release-report': self.release,
+        }
+
+    def signup(self, i):
+        email = f"signup-{self.run}-{i}@example.com"
+        OTP.objects.create(email=email, otp="123456")
+        return self.anon.post(reverse('signup'), {
+            "email": email, "password": "benchmark-password", "name": "Bench",
+            "entity_name": "Bench Co", "entity_type": "STARTUP", "otp": "123456",
+        })
+
+    def release(self, i):
+        claimed = claim_reports(self.user)
+        report_id = claimed[0].id if claimed else self.report_id(i)
+        return self.auth.post(reverse('release-report', args=[report_id]))
+
+    def start_import(self, i):
+        job = ReportImport.objects.create(user=self.user, s3_path=f"benchmark-{i}.csv", file_format="CSV")
+        return self.auth.post(reverse('start-report-import', args=[job.id]))
+
+    def verify_payment(self, i):
+        order_id = self.auth.post(reverse('create-order'), {"amount": 100}, format='json').data['order_id']
+        return self.auth.post(reverse('verify-payment'), {
+            "order_id": order_id, "payment_id": f"pay_{i}", "signature": self.gateway.sign(order_id, f"pay_{i}"),
+        }, format='json')
+
+    def webhook(self, i):
+        body = json.dumps({"event": "payment.captured", "payload": {"payment": {"entity": {
+            "id": f"pay_hook_{self.run}_{i}", "order_id": f"order_hook_{self.run}_{i}", "status": "captured",
+        }}}}).encode()
+        signature = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        return self.anon.generic('POST', reverse('razorpay-webhook'), body, content_type='application/json',
+                                 HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=f"evt_{self.run}_{i}")
+
+
+def percentile(sorted_values, pct):
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = "Measure p50/p99 latency and query counts for every API route at several data sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Comma-separated total report counts to seed')
+        parser.add_argument('--reports-per-entity', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=30, help='Requests per route and size')
+        parser.add_argument('--routes', default='', help='Comma-separated route names (default: all)')
+        parser.add_argument('--output', default='', help='Where to write the JSON results')
+        parser.add_argument('--compare', default='', help='Earlier results file to diff against')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        wanted = {name for name in options['routes'].split(',') if name}
+        commit = current_commit()
+        results = {"commit": commit, "requests": options['requests'], "sizes": {}}
+
+        previous_gateway = get_payment_gateway()
+        set_payment_gateway(StubPaymentGateway())
+        # Expected 4xx responses would otherwise flood the output
+        logging.disable(logging.WARNING)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                RAZORPAY_WEBHOOK_SECRET='benchmark-webhook-secret',
+                REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+            ):
+                for size in sizes:
+                    results["sizes"][str(size)] = self.run_size(size, options, wanted)
+        finally:
+            logging.disable(logging.NOTSET)
+            set_payment_gateway(previous_gateway)
+
+        output = Path(options['output'] or settings.BASE_DIR / 'benchmarks' / f"{commit}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self.compare(json.loads(Path(options['compare']).read_text()), results)
+
+    def run_size(self, size, options, wanted):
+        """Seed `size` reports, benchmark every route, then roll everything back."""
+        per_user = 10
+        users_per_entity = max(options['reports_per_entity'] // per_user, 1)
+        entities = max(size // (users_per_entity * per_user), 1)
+        report = {}
+
+        with transaction.atomic():
+            totals = generate_dataset(entities, users_per_entity=users_per_entity, reports_per_user=per_user)
+            user = User.objects.filter(username__startswith=f"{totals['run']}-").order_by('id').first()
+            scenarios = Scenarios(user, get_payment_gateway()).build()
+
+            missing = {pattern.name for pattern in backend_urls.urlpatterns} - set(scenarios)
+            if missing:
+                raise CommandError(f"No benchmark scenario for routes: {', '.join(sorted(missing))}")
+
+            self.stdout.write(f"\n== {totals['reports']} reports ({entities} entities) ==")
+            for name, send in scenarios.items():
+                if wanted and name not in wanted:
+                    continue
+                timings, queries, statuses = [], [], set()
+                for i in range(options['requests']):
+                    start = time.perf_counter()
+                    response = send(i)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    queries.append(response.db_stats.query_count)
+                    statuses.add(response.status_code)
+                timings.sort()
+                report[name] = {
+                    "p50_ms": round(statistics.median(timings), 3),
+                    "p99_ms": round(percentile(timings, 99), 3),
+                    "queries": max(queries),
+                    "statuses": sorted(statuses),
+                }
+                self.stdout.write(
+                    f"{name:26} p50 {report[name]['p50_ms']:9.2f} ms  p99 {report[name]['p99_ms']:9.2f} ms  "
+                    f"queries {report[name]['queries']:3}  status {report[name]['statuses']}"
+                )
+            transaction.set_rollback(True)
+        return report
+
+    def compare(self, before, after):
+        self.stdout.write(f"\n== {before['commit']} -> {after['commit']} ==")
+        for size, routes in after["sizes"].items():
+            for name, now in routes.items():
+                old = before.get("sizes", {}).get(size, {}).get(name)
+                if not old:
+                    continue
+                change = (now["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0
+                self.stdout.write(
+                    f"[{size}] {name:26} p50 {old['p50_ms']:.2f} -> {now['p50_ms']:.2f} ms ({change:+.0f}%)  "
+                    f"queries {old['queries']} -> {now['queries']}"
+                )
@@ -0,0 +1,43 @@
+import os
+import time
+from concurrent.futures import wait
+
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.management.base import BaseCommand
+
+from backend.services.password_service import password_hashing_pool
+
+
+class Command(BaseCommand):
+    help = "Measure password verifications (logins) per second, overall and per core"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Number of password checks to run')
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        encoded = make_password('benchmark-password')
+        cores = os.cpu_count() or 1
+
+        start = time.perf_counter()
+        for _ in range(min(logins, 20)):
+            verify_password('benchmark-password', encoded)
+        serial_elapsed = time.perf_counter() - start
+        serial_rate = min(logins, 20) / serial_elapsed
+
+        start = time.perf_counter()
+        futures = []
+        for _ in range(logins):
+            # Submit in waves no larger than the admission limit
+            if len(futures) >= password_hashing_pool.max_pending:
+                wait(futures)
+                futures = []
+            futures.append(password_hashing_pool.submit(verify_password, 'benchmark-password', encoded))
+        wait(futures)
+        pooled_elapsed = time.perf_counter() - start
+        pooled_rate = logins / pooled_elapsed
+
+        self.stdout.write(f"hasher iterations : {encoded.split('$')[1]}")
+        self.stdout.write(f"cores             : {cores}, pool workers: {password_hashing_pool.max_workers}")
+        self.stdout.write(f"single thread     : {serial_rate:.1f} logins/s")
+        self.stdout.write(f"hashing pool      : {pooled_rate:.1f} logins/s ({pooled_rate / cores:.1f} per core)")
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.metrics import Counter, Histogram, MetricsRegistry, track
+
+
+class Command(BaseCommand):
+    help = "Measure the per-call overhead of recording metrics on the request hot path"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200000)
+        parser.add_argument('--views', type=int, default=20, help='Distinct view labels to spread samples over')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        views = [f"view-{i}" for i in range(options['views'])]
+        registry = MetricsRegistry()
+        counter = Counter('bench_requests_total', 'Benchmark counter', ['view', 'method', 'status'], registry=registry)
+        histogram = Histogram('bench_duration_seconds', 'Benchmark histogram', ['view', 'method'], registry=registry)
+        call_duration = Histogram('bench_call_duration_seconds', 'Benchmark calls', ['view'], registry=registry)
+        outcomes = Counter('bench_calls_total', 'Benchmark outcomes', ['view', 'outcome'], registry=registry)
+
+        def measure(label, fn):
+            start = time.perf_counter()
+            for i in range(iterations):
+                fn(views[i % len(views)])
+            per_call = (time.perf_counter() - start) / iterations * 1e9
+            self.stdout.write(f"{label:32} {per_call:8.0f} ns/call")
+
+        def tracked(view):
+            with track(call_duration, outcomes, view):
+                pass
+
+        measure('empty loop', lambda view: None)
+        measure('counter.labels().inc()', lambda view: counter.labels(view, 'GET', 200).inc())
+        measure('histogram.labels().observe()', lambda view: histogram.labels(view, 'GET').observe(0.012))
+        measure('track() context manager', tracked)
+
+        start = time.perf_counter()
+        body = registry.render()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stdout.write(f"{'render()':32} {elapsed:8.2f} ms for {len(body.splitlines())} lines")
@@ -0,0 +1,48 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from backend.models import Payment, User
+from backend.services.payment_gateway import StubPaymentGateway, get_payment_gateway, set_payment_gateway
+from backend.views.payment_views import CreateOrderView
+
+
+class Command(BaseCommand):
+    help = "Benchmark CreateOrderView offline against the stub payment gateway"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=500, help='Number of orders to create')
+        parser.add_argument('--latency', type=float, default=0.0, help='Simulated gateway latency in seconds')
+
+    def handle(self, *args, **options):
+        orders = options['orders']
+        factory = APIRequestFactory()
+        view = CreateOrderView.as_view(throttle_classes=[])
+        previous = get_payment_gateway()
+        set_payment_gateway(StubPaymentGateway(latency=options['latency']))
+
+        timings = []
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='bench-orders', email='bench-orders@example.com')
+                for _ in range(orders):
+                    request = factory.post('/api/payments/order/', {'amount': 500}, format='json')
+                    force_authenticate(request, user=user)
+                    start = time.perf_counter()
+                    response = view(request)
+                    timings.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.data
+                created = Payment.objects.filter(user=user).count()
+                # Leave no benchmark rows behind
+                transaction.set_rollback(True)
+        finally:
+            set_payment_gateway(previous)
+
+        timings.sort()
+        self.stdout.write(f"orders created : {created}")
+        self.stdout.write(f"throughput     : {orders / sum(timings):.1f} orders/s")
+        self.stdout.write(f"p50            : {statistics.median(timings) * 1000:.2f} ms")
+        self.stdout.write(f"p99            : {timings[int(len(timings) * 0.99) - 1] * 1000:.2f} ms")
@@ -0,0 +1,46 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from backend.models import Report
+from backend.renderers import ORJSONRenderer
+from backend.serializers import ReportSerializer
+from backend.synthetic_data import generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Compare JSON render time and bytes on the wire for a report list"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reports', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            totals = generate_dataset(1, users_per_entity=10, reports_per_user=max(options['reports'] // 10, 1))
+            reports = Report.objects.filter(user__username__startswith=f"{totals['run']}-").prefetch_related('documents')
+            data = ReportSerializer(reports, many=True).data
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{len(data)} reports, {options['iterations']} renders each")
+        outputs = {}
+        for label, renderer in (('DRF JSONRenderer', JSONRenderer()), ('ORJSONRenderer', ORJSONRenderer())):
+            start = time.perf_counter()
+            for _ in range(options['iterations']):
+                body = renderer.render(data)
+            per_render = (time.perf_counter() - start) / options['iterations'] * 1000
+            outputs[label] = body
+            self.stdout.write(f"{label:18} {per_render:8.2f} ms/render  {len(body):9} bytes")
+
+        body = outputs['ORJSONRenderer']
+        for level in (1, 6, 9):
+            start = time.perf_counter()
+            compressed = gzip.compress(body, compresslevel=level)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(
+                f"{'gzip level ' + str(level):18} {elapsed:8.2f} ms/compress {len(compressed):9} bytes "
+                f"({len(compressed) / len(body):.0%} of raw)"
+            )
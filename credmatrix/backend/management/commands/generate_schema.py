@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.schema import dump_schema, generate_schema, schema_artifact
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema artifact served at /api/schema/, or check that it is up to date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Fail if the artifact differs from the code')
+
+    def handle(self, *args, **options):
+        schema = generate_schema()
+        path = schema_artifact.path
+
+        if options['check']:
+            if not path.exists():
+                raise CommandError(f"{path} is missing; run `manage.py generate_schema`")
+            if path.read_text() != dump_schema(schema):
+                raise CommandError(f"{path} is out of date; run `manage.py generate_schema`")
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+
+        path.write_text(dump_schema(schema))
+        schema_artifact.reset()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
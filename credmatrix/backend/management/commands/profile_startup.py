@@ -0,0 +1,75 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Loads settings, apps and the full URLconf, as a web worker does before its first request
+BOOT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+)
+FIRST_REQUEST = BOOT + (
+    "from django.test import Client; from django.test.utils import override_settings; "
+    "o = override_settings(ALLOWED_HOSTS=['testserver']); o.enable(); "
+    "Client().get('/api/reports/')"
+)
+# Modules that only some requests need; none of them should load at boot. (The
+# celery package itself is imported by django_celery_beat's models, but the
+# configured app in credmatrix.celery is only built by code that queues tasks.)
+LAZY_MODULES = ('boto3', 'botocore', 'razorpay', 'credmatrix.celery', 'drf_spectacular.views')
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class Command(BaseCommand):
+    help = "Profile worker cold start: import times, lazily loaded modules and startup budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Slowest imports to list')
+        parser.add_argument('--runs', type=int, default=3, help='Timed runs per measurement (median is reported)')
+        parser.add_argument('--enforce', action='store_true', help='Fail when a budget in COLD_START_BUDGETS_MS is exceeded')
+
+    def run_python(self, *args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'credmatrix.settings')}
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode:
+            raise CommandError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+        return elapsed, result
+
+    def handle(self, *args, **options):
+        _, result = self.run_python(
+            '-X', 'importtime', '-c',
+            BOOT + f"import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))",
+        )
+        imports = [
+            (int(cumulative), len(indent) // 2, module)
+            for _, cumulative, indent, module in IMPORT_LINE.findall(result.stderr)
+        ]
+        self.stdout.write("Slowest imports at boot (cumulative ms, nesting level):")
+        for cumulative, level, module in sorted(imports, reverse=True)[:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f}  {'  ' * level}{module}")
+        loaded = [module for module in result.stdout.strip().split(',') if module]
+        self.stdout.write(f"Lazy modules loaded at boot: {', '.join(loaded) or 'none'}")
+
+        timings = {
+            'check': statistics.median(self.run_python('manage.py', 'check')[0] for _ in range(options['runs'])),
+            'first_request': statistics.median(
+                self.run_python('-c', FIRST_REQUEST)[0] for _ in range(options['runs'])
+            ),
+        }
+        budgets = settings.COLD_START_BUDGETS_MS
+        over = []
+        for name, elapsed in timings.items():
+            self.stdout.write(f"{name:14} {elapsed:8.0f} ms  (budget {budgets[name]} ms)")
+            if elapsed > budgets[name]:
+                over.append(name)
+
+        if options['enforce'] and (over or loaded):
+            raise CommandError(f"Cold start over budget: {', '.join(over + loaded)}")
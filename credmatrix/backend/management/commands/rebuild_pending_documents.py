@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from backend.models import Report, ReportStatus
+from backend.services.document_rules import rebuild_pending_documents
+
+FINAL_STATUSES = (ReportStatus.COMPLETED.name, ReportStatus.CANCELLED.name)
+
+
+class Command(BaseCommand):
+    help = "Recompute pending_documents of open reports, e.g. after REQUIRED_DOCUMENTS changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help="Include COMPLETED and CANCELLED reports")
+
+    def handle(self, *args, **options):
+        reports = Report.objects.only('id', 'services', 'pending_documents').order_by('id')
+        if not options['all']:
+            reports = reports.exclude(status__in=FINAL_STATUSES)
+        last_id = 0
+        changed = total = 0
+        while True:
+            batch = list(reports.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            before = {report.id: report.pending_documents for report in batch}
+            pending = rebuild_pending_documents(batch)
+            changed += sum(pending[report_id] != old for report_id, old in before.items())
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Checked {total} reports, updated {changed}"))
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate
+
+from backend.services.usage_service import rebuild_usage
+
+
+class Command(BaseCommand):
+    help = ("Recompute the per-entity daily usage rollups from reports, transactions and activities. "
+            "Days older than REPORT_ARCHIVE_AFTER_DAYS may have lost archived reports and come out low.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat,
+                            help="First day (YYYY-MM-DD); defaults to REPORT_ARCHIVE_AFTER_DAYS ago")
+        parser.add_argument('--until', type=date.fromisoformat,
+                            help="Last day (YYYY-MM-DD); defaults to yesterday, as today is still being rolled up")
+        parser.add_argument('--chunk-days', type=int, default=31, help="Days rebuilt per transaction")
+
+    def handle(self, *args, **options):
+        today = localdate()
+        since = options['since'] or today - timedelta(days=settings.REPORT_ARCHIVE_AFTER_DAYS)
+        until = options['until'] or today - timedelta(days=1)
+        if since > until:
+            raise CommandError(f"--since {since} is after --until {until}")
+
+        written = 0
+        chunk_start = since
+        while chunk_start <= until:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), until)
+            written += rebuild_usage(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt usage for {since} to {until}: {written} rollup rows"))
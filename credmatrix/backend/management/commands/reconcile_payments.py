@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.services.payment_service import reconcile_pending_payments
+
+
+class Command(BaseCommand):
+    help = "Settle pending payments by querying the payment gateway"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=settings.PAYMENT_RECONCILE_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.PAYMENT_RECONCILE_WORKERS)
+        parser.add_argument('--older-than-minutes', type=int, default=30)
+
+    def handle(self, *args, **options):
+        updated = reconcile_pending_payments(
+            chunk_size=options['chunk_size'],
+            max_workers=options['workers'],
+            older_than=timedelta(minutes=options['older_than_minutes']),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {updated} payments"))
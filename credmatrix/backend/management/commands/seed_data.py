@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.synthetic_data import DEFAULT_PASSWORD, generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate synthetic entities, users, reports, documents, activities and payments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entities', type=int, default=100)
+        parser.add_argument('--users-per-entity', type=int, default=5)
+        parser.add_argument('--reports-per-user', type=int, default=10)
+        parser.add_argument('--documents-per-report', type=int, default=3)
+        parser.add_argument('--activities-per-report', type=int, default=2)
+        parser.add_argument('--payments-per-user', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        def progress(totals):
+            self.stdout.write(f"  {totals['entities']} entities, {totals['reports']} reports ...")
+
+        totals = generate_dataset(
+            options['entities'],
+            users_per_entity=options['users_per_entity'],
+            reports_per_user=options['reports_per_user'],
+            documents_per_report=options['documents_per_report'],
+            activities_per_report=options['activities_per_report'],
+            payments_per_user=options['payments_per_user'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items() if name != 'run')
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {elapsed:.1f}s"))
+        self.stdout.write(f"Users are {totals['run']}-<entity id>-<n>@example.com with password '{DEFAULT_PASSWORD}'")
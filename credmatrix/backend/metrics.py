@@ -0,0 +1,358 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def state(self):
+        return self.value
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus the +Inf overflow slot
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def state(self):
+        return [list(self.counts), self.sum]
+
+
+class Metric:
+    """
+    A named metric family. Children are created once per label-value tuple
+    and cached, so the hot path is a dict lookup plus an uncontended lock.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+        (registry if registry is not None else default_registry).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(value) for value in values), self._new_child())
+                self._children[values] = child
+        return child
+
+    def reset(self):
+        with self._lock:
+            self._children = {}
+            if not self.labelnames:
+                self._default = self._children[()] = self._new_child()
+
+    def describe(self):
+        return {"type": self.type, "help": self.documentation, "labelnames": list(self.labelnames)}
+
+    def samples(self):
+        seen = set()
+        samples = []
+        for values, child in list(self._children.items()):
+            if id(child) in seen:
+                continue
+            seen.add(id(child))
+            samples.append([[str(value) for value in values], child.state()])
+        return samples
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def describe(self):
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Holds this process's metrics and renders the Prometheus text format.
+
+    With settings.METRICS_MULTIPROC_DIR set, every process periodically
+    writes a snapshot of its values to its own file in that directory and
+    `render()` merges all files, so any worker can answer a scrape with
+    totals for the whole deployment. The directory should be emptied when
+    the deployment restarts.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._token = uuid.uuid4().hex[:8]
+        self._last_flush = 0.0
+        self._atexit_registered = False
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def snapshot(self):
+        """Return this process's metric values as a JSON-serialisable dict."""
+        return {
+            name: {**metric.describe(), "samples": metric.samples()}
+            for name, metric in self._metrics.items()
+        }
+
+    def _after_fork(self):
+        # A forked worker inherits the parent's values and file token; start
+        # from zero under a fresh file so nothing is counted twice.
+        self._pid = os.getpid()
+        self._token = uuid.uuid4().hex[:8]
+        self._last_flush = 0.0
+        for metric in self._metrics.values():
+            # The parent may have held the lock mid-update when it forked
+            metric._lock = threading.Lock()
+            metric.reset()
+
+    def _directory(self):
+        directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        return Path(directory) if directory else None
+
+    def flush(self):
+        """Write this process's snapshot to the multi-process directory, if configured."""
+        directory = self._directory()
+        if directory is None:
+            return
+        snapshot = self.snapshot()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"metrics-{self._pid}-{self._token}.json"
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, path)
+        self._last_flush = time.monotonic()
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def flush_due(self):
+        """True when multi-process mode is on and the last flush is older than METRICS_FLUSH_INTERVAL."""
+        return (
+            bool(getattr(settings, 'METRICS_MULTIPROC_DIR', ''))
+            and time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_INTERVAL
+        )
+
+    def maybe_flush(self):
+        """Flush if `flush_due()`."""
+        if self.flush_due():
+            self.flush()
+
+    def collect(self):
+        """Return merged values from every process (or just this one)."""
+        directory = self._directory()
+        if directory is None:
+            return self.snapshot()
+
+        self.flush()
+        merged = {}
+        for path in sorted(directory.glob('metrics-*.json')):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # Another process is replacing its file; its next flush will be picked up
+                continue
+            for name, family in snapshot.items():
+                target = merged.setdefault(name, {**family, "samples": {}})
+                for values, state in family["samples"]:
+                    key = tuple(values)
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = state
+                    elif family["type"] == 'counter':
+                        target["samples"][key] = current + state
+                    else:
+                        counts = [a + b for a, b in zip(current[0], state[0])]
+                        target["samples"][key] = [counts, current[1] + state[1]]
+        for family in merged.values():
+            family["samples"] = [[list(key), state] for key, state in family["samples"].items()]
+        return merged
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for name, family in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+            for values, state in family["samples"]:
+                if family["type"] == 'counter':
+                    lines.append(f"{name}{_label_text(labelnames, values)} {_number(state)}")
+                    continue
+                counts, total = state
+                cumulative = 0
+                for bound, count in zip([*family["buckets"], float('inf')], counts):
+                    cumulative += count
+                    le = (('le', _number(bound)),)
+                    lines.append(f"{name}_bucket{_label_text(labelnames, values, le)} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_label_text(labelnames, values)} {_number(total)}")
+                lines.append(f"{name}_count{_label_text(labelnames, values)} {_number(cumulative)}")
+        return '\n'.join(lines) + '\n'
+
+
+default_registry = MetricsRegistry()
+
+
+@contextmanager
+def track(histogram, counter, *labels):
+    """
+    Time a block into `histogram` and count it in `counter` with an extra
+    trailing 'ok' or 'error' outcome label.
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - start)
+        counter.labels(*labels, outcome).inc()
+
+
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request', ['view', 'method'],
+)
+http_requests = Counter(
+    'http_requests_total', 'Requests handled', ['view', 'method', 'status'],
+)
+db_request_duration = Histogram(
+    'db_request_duration_seconds', 'Database time per request', ['view'],
+)
+db_queries = Counter(
+    'db_queries_total', 'Database queries executed', ['view'],
+)
+s3_operation_duration = Histogram(
+    's3_operation_duration_seconds', 'Time spent in S3 calls', ['operation'],
+)
+s3_operations = Counter(
+    's3_operations_total', 'S3 presigns, reads and deletes', ['operation', 'outcome'],
+)
+smtp_send_duration = Histogram(
+    'smtp_send_duration_seconds', 'Time spent sending email',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+smtp_sends = Counter(
+    'smtp_sends_total', 'Emails sent', ['outcome'],
+)
+razorpay_call_duration = Histogram(
+    'razorpay_call_duration_seconds', 'Time spent in Razorpay API calls', ['operation'],
+)
+razorpay_calls = Counter(
+    'razorpay_calls_total', 'Razorpay API calls (outcome ok, error or circuit_open)', ['operation', 'outcome'],
+)
+credits_debited = Counter(
+    'credits_debited_total', 'Entity credits spent on reports',
+)
+report_assignments = Counter(
+    'report_assignments_total', 'Reports handed to agents, by source (claim or auto)', ['source'],
+)
+report_sla_escalations = Counter(
+    'report_sla_escalations_total', 'Reports flagged for overstaying a status SLA', ['status'],
+)
+stream_events_dropped = Counter(
+    'stream_events_dropped_total', 'Report events dropped for slow event-stream clients (sent a resync instead)',
+)
+reports_archived = Counter(
+    'reports_archived_total', 'Final reports moved out of the hot tables',
+)
+usage_events_rolled_up = Counter(
+    'usage_events_rolled_up_total', 'Report creations and status changes folded into the usage rollups',
+)
+notification_digests = Counter(
+    'notification_digests_total', 'Report notification digest emails by outcome', ['outcome'],
+)
+cache_lookups = Counter(
+    'cache_lookups_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'],
+)
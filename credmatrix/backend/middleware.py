@@ -0,0 +1,171 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+
+from backend import metrics
+
+logger = logging.getLogger('backend.db')
+
+
+class QueryStats:
+    """Query count, total DB time and slowest statement for one request."""
+
+    __slots__ = ('query_count', 'total_time', 'slowest_time', 'slowest_sql')
+
+    def __init__(self):
+        self.query_count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.query_count += 1
+            self.total_time += elapsed
+            if elapsed > self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+
+
+def get_query_budget(view_func):
+    """Return the `query_budget` declared by a view function or its class, if any."""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, DB time and the slowest SQL for every request via
+    `connection.execute_wrapper`.
+
+    Stats are attached to the response as `response.db_stats`, logged to the
+    'backend.db' logger (as a warning when the view's `query_budget` is
+    exceeded) and, with DEBUG on, returned in X-DB-* response headers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _instrument(self, stack, stats):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats()
+        request.query_budget = None
+        with ExitStack() as stack:
+            self._instrument(stack, stats)
+            response = self.get_response(request)
+        return self._record(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        request.query_budget = None
+        with ExitStack() as stack:
+            self._instrument(stack, stats)
+            response = await self.get_response(request)
+        return self._record(request, response, stats)
+
+    def _record(self, request, response, stats):
+        response.db_stats = stats
+        budget = request.query_budget
+        over_budget = budget is not None and stats.query_count > budget
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            "%s %s: %d queries (budget %s), %.1f ms in DB, slowest %.1f ms: %s",
+            request.method,
+            request.path,
+            stats.query_count,
+            budget,
+            stats.total_time * 1000,
+            stats.slowest_time * 1000,
+            stats.slowest_sql,
+        )
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(stats.query_count)
+            response['X-DB-Time-Ms'] = f"{stats.total_time * 1000:.1f}"
+            if stats.slowest_sql:
+                response['X-DB-Slowest-Ms'] = f"{stats.slowest_time * 1000:.1f}"
+                response['X-DB-Slowest-SQL'] = ' '.join(stats.slowest_sql.split())[:200]
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+        return None
+
+
+class MetricsMiddleware:
+    """
+    Records request latency and status per view, plus the DB time and query
+    count gathered by QueryInstrumentationMiddleware, which must sit after
+    this middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start)
+        if metrics.default_registry.flush_due():
+            metrics.default_registry.flush()
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start)
+        if metrics.default_registry.flush_due():
+            # File IO stays off the event loop
+            await sync_to_async(metrics.default_registry.flush)()
+        return response
+
+    def _record(self, request, response, elapsed):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        metrics.http_request_duration.labels(view, request.method).observe(elapsed)
+        metrics.http_requests.labels(view, request.method, response.status_code).inc()
+
+        stats = getattr(response, 'db_stats', None)
+        if stats is not None:
+            metrics.db_request_duration.labels(view).observe(stats.total_time)
+            metrics.db_queries.labels(view).inc(stats.query_count)
+
+
+class EventStreamGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves server-sent event streams uncompressed: the
+    compressor holds small writes back, so events would reach clients late.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0002_otp_remove_user_hashed_password'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entity',
+            name='admin_user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='admin_of_entities', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='entity',
+            name='entity_type',
+            field=models.CharField(choices=[('INDIVIDUAL', 'INDIVIDUAL'), ('BANK', 'BANK'), ('NBFC', 'NBFC'), ('CORPORATE', 'CORPORATE'), ('STARTUP', 'STARTUP'), ('CONSULTANT', 'CONSULTANT'), ('OTHER', 'OTHER')], default='INDIVIDUAL', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='entity',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='backend.entity'),
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('payment_id', models.CharField(max_length=255)),
+                ('order_id', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Report',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('COMPLETED', 'COMPLETED'), ('REQUEST_RAISED', 'REQUEST_RAISED'), ('UNDER_ASSESMENT', 'UNDER_ASSESMENT'), ('DOC_PENDING', 'DOC_PENDING'), ('DRAFT', 'DRAFT'), ('CANCELLED', 'CANCELLED')], default='DRAFT', max_length=20)),
+                ('services', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('target_entity_name', models.CharField(max_length=255)),
+                ('target_entity_pan', models.CharField(max_length=20)),
+                ('credits', models.IntegerField(default=0)),
+                ('pending_documents', models.JSONField(default=list)),
+                ('cancellation_reason', models.TextField(blank=True, null=True)),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assigned_reports', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('s3_path', models.CharField(max_length=255)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to=settings.AUTH_USER_MODEL)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='backend.report')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('old_state', models.JSONField(default=dict)),
+                ('new_state', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='backend.report')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('credits', models.IntegerField()),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='backend.report')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+def mark_blank_statuses_pending(apps, schema_editor):
+    Payment = apps.get_model('backend', 'Payment')
+    Payment.objects.filter(status='').update(status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_entity_credits_paymentevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='order_id',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(default='pending', max_length=255),
+        ),
+        migrations.RunPython(mark_blank_statuses_pending, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'id'], name='payment_status_id_idx'),
+        ),
+    ]
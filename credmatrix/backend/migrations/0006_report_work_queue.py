@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_payment_reconciliation_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('services', models.JSONField(blank=True, default=list)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='assigned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_reports', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('agent__isnull', True)), fields=['status', 'created_at', 'id'], name='report_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['agent', 'status'], name='report_agent_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='agentprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='agent_profile', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_report_work_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entity',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_id',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='target_entity_pan',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_sla_clock_at_creation(apps, schema_editor):
+    # Existing reports' last status change is unknown; creation time is the closest bound
+    Report = apps.get_model('backend', 'Report')
+    Report.objects.update(status_changed_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(start_sla_clock_at_creation, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('escalated_at__isnull', True)), fields=['status', 'status_changed_at', 'id'], name='report_sla_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_report_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReport',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('payload', models.BinaryField()),
+                ('entity', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reports', to='backend.entity')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
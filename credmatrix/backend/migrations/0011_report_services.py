@@ -0,0 +1,57 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:23
+
+import backend.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+SERVICE_NAMES = {'FINANCIAL_INFO', 'COMPREHENSIVE_REPORT_WITH_SCORES', 'BUREAU_REPORT', 'BANK_REF_CHECK'}
+BATCH_SIZE = 2000
+
+
+def backfill_report_services(apps, schema_editor):
+    # Names outside ServiceType were never valid and get no row; the JSON list is left as it was
+    Report = apps.get_model('backend', 'Report')
+    ReportService = apps.get_model('backend', 'ReportService')
+    last_id = 0
+    while True:
+        batch = list(Report.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'services')[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        ReportService.objects.bulk_create(
+            [
+                ReportService(report_id=report_id, service=service)
+                for report_id, services in batch
+                if isinstance(services, list)
+                for service in SERVICE_NAMES.intersection(name for name in services if isinstance(name, str))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_archived_reports'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='services',
+            field=models.JSONField(default=list, validators=[backend.models.validate_services]),
+        ),
+        migrations.CreateModel(
+            name='ReportService',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service', models.CharField(choices=[('FINANCIAL_INFO', 'FINANCIAL_INFO'), ('COMPREHENSIVE_REPORT_WITH_SCORES', 'COMPREHENSIVE_REPORT_WITH_SCORES'), ('BUREAU_REPORT', 'BUREAU_REPORT'), ('BANK_REF_CHECK', 'BANK_REF_CHECK')], max_length=50)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='service_links', to='backend.report')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['service', 'report'], name='report_service_service_idx')],
+                'constraints': [models.UniqueConstraint(fields=('report', 'service'), name='report_service_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_report_services, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_report_services'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='document_type',
+            field=models.CharField(blank=True, choices=[('PAN_CARD', 'PAN_CARD'), ('BANK_STATEMENT', 'BANK_STATEMENT'), ('FINANCIAL_STATEMENT', 'FINANCIAL_STATEMENT'), ('INCOME_TAX_RETURN', 'INCOME_TAX_RETURN'), ('GST_RETURN', 'GST_RETURN')], max_length=30, null=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_document_types'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=50)),
+                ('created', models.BooleanField(default=False)),
+                ('credits', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_events', to='backend.report')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EntityDailyServiceUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service', models.CharField(choices=[('FINANCIAL_INFO', 'FINANCIAL_INFO'), ('COMPREHENSIVE_REPORT_WITH_SCORES', 'COMPREHENSIVE_REPORT_WITH_SCORES'), ('BUREAU_REPORT', 'BUREAU_REPORT'), ('BANK_REF_CHECK', 'BANK_REF_CHECK')], max_length=50)),
+                ('reports', models.IntegerField(default=0)),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_service_usage', to='backend.entity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('entity', 'date', 'service'), name='entity_daily_service_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntityDailyStatusUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=50)),
+                ('reports', models.IntegerField(default=0)),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_status_usage', to='backend.entity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('entity', 'date', 'status'), name='entity_daily_status_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntityDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reports_created', models.IntegerField(default=0)),
+                ('credits_spent', models.IntegerField(default=0)),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='backend.entity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('entity', 'date'), name='entity_daily_usage_unique')],
+            },
+        ),
+    ]
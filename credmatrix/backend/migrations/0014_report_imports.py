@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_usage_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('s3_path', models.CharField(max_length=255)),
+                ('file_format', models.CharField(choices=[('CSV', 'CSV'), ('XLSX', 'XLSX')], max_length=10)),
+                ('status', models.CharField(choices=[('AWAITING_UPLOAD', 'AWAITING_UPLOAD'), ('QUEUED', 'QUEUED'), ('RUNNING', 'RUNNING'), ('COMPLETED', 'COMPLETED'), ('FAILED', 'FAILED')], default='AWAITING_UPLOAD', max_length=20)),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('rows_failed', models.IntegerField(default=0)),
+                ('reports_created', models.IntegerField(default=0)),
+                ('credits_spent', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('failure_reason', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0014_report_imports'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='claimed_by',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0015_notification_claims'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='uploaded_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
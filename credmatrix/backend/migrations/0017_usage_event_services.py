@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:40
+
+from django.db import migrations, models
+
+
+def snapshot_pending_services(apps, schema_editor):
+    UsageEvent = apps.get_model('backend', 'UsageEvent')
+    events = list(UsageEvent.objects.filter(created=True).select_related('report'))
+    for event in events:
+        event.services = list(event.report.services)
+    UsageEvent.objects.bulk_update(events, ['services'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0016_document_uploaded_at_nullable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usageevent',
+            name='services',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(snapshot_pending_services, migrations.RunPython.noop),
+    ]
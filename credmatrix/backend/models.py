@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from enum import Enum
 from django.utils.timezone import now
 from datetime import timedelta
@@ -27,15 +28,37 @@ class ServiceType(Enum):
     BUREAU_REPORT = 2
     BANK_REF_CHECK = 3
 
+class DocumentType(Enum):
+    PAN_CARD = 0
+    BANK_STATEMENT = 1
+    FINANCIAL_STATEMENT = 2
+    INCOME_TAX_RETURN = 3
+    GST_RETURN = 4
+
+class ImportStatus(Enum):
+    AWAITING_UPLOAD = 0
+    QUEUED = 1
+    RUNNING = 2
+    COMPLETED = 3
+    FAILED = 4
+
+def validate_services(value):
+    """Report.services must be a list of ServiceType names."""
+    names = {service.name for service in ServiceType}
+    if not isinstance(value, list) or not all(isinstance(name, str) and name in names for name in value):
+        raise ValidationError(f"Services must be a list of: {', '.join(sorted(names))}")
+
+
 class Entity(models.Model):
     ENTITY_TYPE_CHOICES = [(etype.name, etype.name) for etype in EntityType]
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     entity_type = models.CharField(
         max_length=20,
         choices=ENTITY_TYPE_CHOICES,
         default=EntityType.INDIVIDUAL.name
     )
     admin_user = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, related_name='admin_of_entities')
+    credits = models.IntegerField(default=0)
 
     def __str__(self):
         return f"{self.name} ({self.entity_type})"
@@ -65,31 +88,267 @@ class OTP(models.Model):
 
 class Report(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
-    agent = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assigned_reports')
+    # Unassigned while the report waits in the agent work queue (see backend.services.assignment_service)
+    agent = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_reports')
+    assigned_at = models.DateTimeField(null=True, blank=True)
+    # Set on every status transition (backend.services.report_status_service); starts the SLA clock
+    status_changed_at = models.DateTimeField(default=now)
+    # Set when the report overstays its status's SLA, cleared by the next transition
+    escalated_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(
         max_length=20,
         default=ReportStatus.DRAFT.name,
         choices=[(status.name, status.name) for status in ReportStatus]
     )
-    services = models.JSONField(default=list)  # Changed to JSONField to store a list of services
+    # The API's list of ServiceType names; mirrored into ReportService rows for indexed filtering
+    services = models.JSONField(default=list, validators=[validate_services])
     created_at = models.DateTimeField(auto_now_add=True)
     target_entity_name = models.CharField(max_length=255)
-    target_entity_pan = models.CharField(max_length=20)
+    target_entity_pan = models.CharField(max_length=20, db_index=True)
     credits = models.IntegerField(default=0)
+    # DocumentType names still missing, maintained by backend.services.document_rules
     pending_documents = models.JSONField(default=list)
     cancellation_reason = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # The work queue: unassigned reports, oldest first
+            models.Index(
+                fields=['status', 'created_at', 'id'],
+                condition=models.Q(agent__isnull=True),
+                name='report_queue_idx',
+            ),
+            # Open-report counts per agent for least-loaded assignment
+            models.Index(fields=['agent', 'status'], name='report_agent_status_idx'),
+            # SLA breach scans: reports not yet escalated, by time in their status
+            models.Index(
+                fields=['status', 'status_changed_at', 'id'],
+                condition=models.Q(escalated_at__isnull=True),
+                name='report_sla_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        report = super().from_db(db, field_names, values)
+        # The services the ReportService rows mirror; saves resync only when they change
+        report._synced_services = report.__dict__.get('services')
+        return report
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'services' not in update_fields:
+            return
+        if adding or self.services != getattr(self, '_synced_services', None):
+            ReportService.sync([self], replace=not adding)
+            self._synced_services = list(self.services)
+
     def __str__(self):
         return f"Report by {self.user.email} - Status: {self.status}"
 
+
+class ReportService(models.Model):
+    """
+    One service of a report. Mirrors Report.services so reports can be
+    filtered and counted by service through an index instead of scanning
+    JSON. Kept in sync by Report.save(); bulk writers call `sync`.
+    """
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='service_links')
+    service = models.CharField(max_length=50, choices=[(service.name, service.name) for service in ServiceType])
+
+    class Meta:
+        constraints = [
+            # Also serves "does this report include the service" probes
+            models.UniqueConstraint(fields=['report', 'service'], name='report_service_unique'),
+        ]
+        indexes = [
+            # Reports per service, and per-service counts
+            models.Index(fields=['service', 'report'], name='report_service_service_idx'),
+        ]
+
+    @classmethod
+    def sync(cls, reports, replace=True):
+        """
+        Write the ReportService rows of `reports` from their `services`.
+
+        :param reports: Saved Reports.
+        :param replace: Delete existing rows first; False for reports that have none yet.
+        """
+        if replace:
+            cls.objects.filter(report_id__in=[report.pk for report in reports]).delete()
+        cls.objects.bulk_create(
+            [cls(report_id=report.pk, service=service) for report in reports for service in dict.fromkeys(report.services)],
+            batch_size=1000,
+        )
+
+    def __str__(self):
+        return f"Report ID {self.report_id} - {self.service}"
+
+
+class ArchivedReport(models.Model):
+    """
+    A final report moved out of the hot tables by backend.services.archive_service,
+    stored with its documents, activities and transactions as compressed JSON.
+    """
+    # The original Report.id, so archived reports keep their URLs
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_reports')
+    # The owner's entity when archived; scopes read-through lookups without unpacking
+    entity = models.ForeignKey(Entity, on_delete=models.SET_NULL, null=True, related_name='archived_reports')
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=now)
+    payload = models.BinaryField()
+
+    def __str__(self):
+        return f"Archived report ID {self.id} - Status: {self.status}"
+
+
+class AgentProfile(models.Model):
+    """Marks a user as an analyst who is handed reports from the work queue."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='agent_profile')
+    # ServiceType names this agent can handle; empty means every service
+    services = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    def handles(self, services):
+        return not self.services or set(services) <= set(self.services)
+
+    def __str__(self):
+        return f"Agent {self.user.email}"
+
+class NotificationPreference(models.Model):
+    """How a user hears about report lifecycle events; users without one get the defaults."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_preference')
+    enabled = models.BooleanField(default=True)
+    # ReportStatus names to be told about; empty means every status in NOTIFICATION_STATUSES
+    statuses = models.JSONField(default=list, blank=True)
+    # Minutes to collect events into one email; null uses NOTIFICATION_DIGEST_MINUTES
+    digest_minutes = models.PositiveIntegerField(null=True, blank=True)
+
+    def wants(self, status):
+        return self.enabled and (not self.statuses or status in self.statuses)
+
+    def __str__(self):
+        return f"Notification preferences for {self.user.email}"
+
+
+class ReportLifecycleEvent(models.Model):
+    """A notifiable status change, recorded with the transition and fanned out to recipients later."""
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='lifecycle_events')
+    status = models.CharField(max_length=50)
+    created_at = models.DateTimeField(default=now)
+
+    def __str__(self):
+        return f"Report ID {self.report_id} moved to {self.status}"
+
+
+class Notification(models.Model):
+    """One lifecycle event waiting for its recipient's next digest; deleted once sent."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='notifications')
+    status = models.CharField(max_length=50)
+    created_at = models.DateTimeField(default=now)
+    # Set by the digest run that is sending this notification
+    claimed_by = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Oldest pending notification per recipient, for digest windows
+            models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user_id}: report ID {self.report_id} {self.status}"
+
+
+class UsageEvent(models.Model):
+    """
+    A report creation or status change not yet counted in the usage rollups.
+    Written by the write path, folded into the rollups and deleted by
+    backend.services.usage_service.
+    """
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='usage_events')
+    status = models.CharField(max_length=50)
+    # True for the report's creation, which also counts it and its credits and services
+    created = models.BooleanField(default=False)
+    credits = models.IntegerField(default=0)
+    # The services the report was created with; later edits don't move its counts
+    services = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(default=now)
+
+    def __str__(self):
+        return f"Usage of report ID {self.report_id}: {self.status}"
+
+
+class EntityDailyUsage(models.Model):
+    """Reports created and credits spent by an entity on one day (TIME_ZONE)."""
+    entity = models.ForeignKey(Entity, on_delete=models.CASCADE, related_name='daily_usage')
+    date = models.DateField()
+    reports_created = models.IntegerField(default=0)
+    credits_spent = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves the per-entity date range reads of the analytics endpoint
+            models.UniqueConstraint(fields=['entity', 'date'], name='entity_daily_usage_unique'),
+        ]
+
+    def __str__(self):
+        return f"Usage of entity {self.entity_id} on {self.date}"
+
+
+class EntityDailyServiceUsage(models.Model):
+    """Reports an entity requested a service for, by creation day."""
+    entity = models.ForeignKey(Entity, on_delete=models.CASCADE, related_name='daily_service_usage')
+    date = models.DateField()
+    service = models.CharField(max_length=50, choices=[(service.name, service.name) for service in ServiceType])
+    reports = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'date', 'service'], name='entity_daily_service_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.service} usage of entity {self.entity_id} on {self.date}"
+
+
+class EntityDailyStatusUsage(models.Model):
+    """Reports of an entity that entered a status on one day."""
+    entity = models.ForeignKey(Entity, on_delete=models.CASCADE, related_name='daily_status_usage')
+    date = models.DateField()
+    status = models.CharField(max_length=50)
+    reports = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'date', 'status'], name='entity_daily_status_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.status} usage of entity {self.entity_id} on {self.date}"
+
+
 class Document(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='documents', db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='documents')
     s3_path = models.CharField(max_length=255)
-    uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Which required document this is, if any (see settings.REQUIRED_DOCUMENTS)
+    document_type = models.CharField(
+        max_length=30,
+        null=True,
+        blank=True,
+        choices=[(document_type.name, document_type.name) for document_type in DocumentType],
+    )
+    # Null while only a presigned upload URL has been issued; set when the upload is confirmed
+    uploaded_at = models.DateTimeField(null=True, blank=True, default=now)
 
     def __str__(self):
-        return f"Document for Report ID {self.report.id} - S3 Path"
+        return f"Document for Report ID {self.report_id} - S3 Path"
 
 class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -108,16 +367,63 @@ class Activity(models.Model):
     new_state = models.JSONField(default=dict)
 
     def __str__(self):
-        return f"Activity for Report ID {self.report.id} by {self.user.email}"
+        return f"Activity for Report ID {self.report_id} by {self.user.email}"
     
 
 class Payment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payments')
     amount = models.IntegerField()
-    payment_id = models.CharField(max_length=255)
-    order_id = models.CharField(max_length=255)
+    payment_id = models.CharField(max_length=255, db_index=True)
+    order_id = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=255, default='pending')
+
+    class Meta:
+        indexes = [
+            # Keyset pagination over pending payments during reconciliation
+            models.Index(fields=['status', 'id'], name='payment_status_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Payment of {self.amount} by {self.user.email}"
+
+
+class PaymentEvent(models.Model):
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Payment event {self.event_id} ({self.event_type})"
+
+
+class ReportImport(models.Model):
+    """
+    A spreadsheet of report requests uploaded to S3 and imported in chunks
+    by backend.services.import_service. The counters double as the resume
+    point, so an interrupted import picks up after the last committed chunk.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_imports')
+    s3_path = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=10, choices=[('CSV', 'CSV'), ('XLSX', 'XLSX')])
+    status = models.CharField(
+        max_length=20,
+        choices=[(status.name, status.name) for status in ImportStatus],
+        default=ImportStatus.AWAITING_UPLOAD.name,
+    )
+    rows_processed = models.IntegerField(default=0)
+    rows_failed = models.IntegerField(default=0)
+    reports_created = models.IntegerField(default=0)
+    credits_spent = models.IntegerField(default=0)
+    # The first REPORT_IMPORT_MAX_ERRORS invalid rows: [{"row": n, "errors": {...}}]
+    errors = models.JSONField(default=list, blank=True)
+    # Why the import stopped, if it failed
+    failure_reason = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=255)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
-        return f"Payment of {self.amount} by {self.user.email}"
\ No newline at end of file
+        return f"Report import {self.id} by {self.user.email} - Status: {self.status}"
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+
+def generate_schema():
+    """Introspect the API and return the OpenAPI schema as a dict."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    # Round-trip through JSON so the result compares equal to a loaded artifact
+    return json.loads(json.dumps(generator.get_schema(request=None, public=True)))
+
+
+def dump_schema(schema):
+    return json.dumps(schema, indent=2, ensure_ascii=False) + '\n'
+
+
+class SchemaArtifact:
+    """
+    The OpenAPI schema, loaded once per process from the committed artifact
+    (settings.OPENAPI_SCHEMA_FILE, written by `manage.py generate_schema`) or,
+    if there is none, generated on first use. Each output format is rendered
+    once and kept in memory with its ETag.
+    """
+
+    def __init__(self):
+        self._schema = None
+        self._rendered = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return Path(settings.OPENAPI_SCHEMA_FILE)
+
+    def get_schema(self):
+        if self._schema is None:
+            with self._lock:
+                if self._schema is None:
+                    self._schema = json.loads(self.path.read_text()) if self.path.exists() else generate_schema()
+        return self._schema
+
+    def render(self, renderer):
+        """
+        :param renderer: A drf-spectacular OpenAPI renderer instance.
+        :return: Tuple of (body bytes, quoted ETag).
+        """
+        key = renderer.media_type
+        if key not in self._rendered:
+            body = renderer.render(self.get_schema(), renderer_context={})
+            if isinstance(body, str):
+                body = body.encode()
+            self._rendered[key] = (body, f'"{hashlib.sha256(body).hexdigest()}"')
+        return self._rendered[key]
+
+    def reset(self):
+        with self._lock:
+            self._schema = None
+            self._rendered = {}
+
+
+schema_artifact = SchemaArtifact()
+
+
+class PrecomputedSchemaView(SpectacularAPIView):
+    """
+    SpectacularAPIView that serves `schema_artifact` from memory instead of
+    regenerating the schema on every request. The format is still chosen by
+    content negotiation (?format=json / Accept), and clients revalidate with
+    If-None-Match.
+    """
+
+    def get(self, request, *args, **kwargs):
+        renderer, media_type = self.perform_content_negotiation(request, force=True)
+        body, etag = schema_artifact.render(renderer)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type=media_type)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
@@ -1,10 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.timezone import localdate
 from rest_framework import serializers
-from backend.models import Report, Document
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from backend.models import Report, Document, Activity, DocumentType, NotificationPreference, ReportImport, ServiceType
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+SERVICE_CHOICES = [service.name for service in ServiceType]
+DOCUMENT_TYPE_CHOICES = [document_type.name for document_type in DocumentType]
+NOTIFICATION_STATUS_CHOICES = list(settings.NOTIFICATION_STATUSES)
 
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
-        fields = ["id", "s3_path", "uploaded_at"]
+        fields = ["id", "s3_path", "document_type", "uploaded_at"]
+        read_only_fields = ["uploaded_at"]
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -24,14 +35,28 @@ class ReportSerializer(serializers.ModelSerializer):
             "cancellation_reason",
             "documents",
         ]
+        # Derived from the services and confirmed documents (backend.services.document_rules)
+        read_only_fields = ["pending_documents"]
+
+
+class ArchivedReportSerializer(ReportSerializer):
+    """ReportSerializer for a report unpacked from the archive, whose documents are no longer in the hot table."""
+    documents = DocumentSerializer(many=True, read_only=True, source="archived_documents")
+
+
+class ActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Activity
+        fields = ["id", "user", "timestamp", "old_state", "new_state"]
 
 
 class InitiateRequestSerializer(serializers.Serializer):
     entity_name = serializers.CharField(max_length=255, required=True)
     entity_pan = serializers.CharField(max_length=20, required=True)
     services = serializers.ListField(  # Updated to handle a list of services
-        child=serializers.CharField(max_length=50),
+        child=serializers.ChoiceField(choices=SERVICE_CHOICES),
         required=True,
+        allow_empty=False,
     )
     credits = serializers.IntegerField(required=True)
     document_ids = serializers.ListField(  # Added to handle document IDs
@@ -40,6 +65,71 @@ class InitiateRequestSerializer(serializers.Serializer):
     )
 
 
+class ImportRowSerializer(InitiateRequestSerializer):
+    """One row of a report import: InitiateRequestSerializer's rules, with credits priced by the server."""
+    credits = None
+    document_ids = None
+
+
+class CreateReportImportSerializer(serializers.Serializer):
+    file_name = serializers.RegexField(
+        r"^[\w\-. ]+\.(csv|xlsx)$",
+        max_length=200,
+        help_text="Name of the spreadsheet to upload, ending in .csv or .xlsx.",
+        error_messages={"invalid": "Expected a .csv or .xlsx file name"},
+    )
+
+
+class ReportImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportImport
+        fields = [
+            "id", "status", "file_format", "rows_processed", "rows_failed", "reports_created", "credits_spent",
+            "errors", "failure_reason", "created_at", "started_at", "finished_at",
+        ]
+
+
+class ClaimReportsSerializer(serializers.Serializer):
+    service = serializers.ChoiceField(choices=SERVICE_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, default=1)
+
+    def validate_limit(self, value):
+        return min(value, settings.REPORT_CLAIM_MAX)
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    statuses = serializers.ListField(
+        child=serializers.ChoiceField(choices=NOTIFICATION_STATUS_CHOICES),
+        required=False,
+        help_text="Statuses to be emailed about; empty means all of them.",
+    )
+    digest_minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=7 * 24 * 60,
+        required=False,
+        allow_null=True,
+        help_text="Minutes to collect updates into one email; null uses the default.",
+    )
+
+    class Meta:
+        model = NotificationPreference
+        fields = ["enabled", "statuses", "digest_minutes"]
+
+
+class UsageQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="First day (inclusive); defaults to 29 days before `end`.")
+    end = serializers.DateField(required=False, help_text="Last day (inclusive); defaults to today.")
+
+    def validate(self, attrs):
+        end = attrs.setdefault("end", localdate())
+        start = attrs.setdefault("start", end - timedelta(days=29))
+        if start > end:
+            raise serializers.ValidationError("start must not be after end")
+        if (end - start).days >= settings.USAGE_ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(f"At most {settings.USAGE_ANALYTICS_MAX_DAYS} days can be requested")
+        return attrs
+
+
 class DeleteReportSerializer(serializers.Serializer):
     cancellation_reason = serializers.CharField(max_length=255, required=True)
 
@@ -49,4 +139,13 @@ class ConfirmDocumentUploadSerializer(serializers.Serializer):
 
 class UploadDocumentSerializer(serializers.Serializer):
     report_id = serializers.IntegerField(required=False, help_text="ID of the report to associate the document with (optional).")
-    document_name = serializers.CharField(required=True, help_text="Name of the document to upload.")
\ No newline at end of file
+    document_name = serializers.CharField(required=True, help_text="Name of the document to upload.")
+    document_type = serializers.ChoiceField(
+        choices=DOCUMENT_TYPE_CHOICES,
+        required=False,
+        help_text="Which required document this is; confirming it removes the type from the report's pending_documents.",
+    )
+
+
+class IndexedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = IndexedRefreshToken
@@ -0,0 +1,136 @@
+import logging
+import zlib
+from datetime import timedelta
+
+import orjson
+from django.core import serializers
+from django.db import transaction
+from django.utils.timezone import now
+
+from backend.metrics import reports_archived
+from backend.models import Activity, ArchivedReport, Document, Report, ReportService, ReportStatus, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Only reports that can no longer change are archived
+ARCHIVABLE_STATUSES = (ReportStatus.COMPLETED.name, ReportStatus.CANCELLED.name)
+
+
+class ArchivedReportData:
+    """A report unpacked from the archive: unsaved model instances, ready for the usual serializers."""
+
+    __slots__ = ('report', 'documents', 'activities', 'transactions')
+
+    def __init__(self, report, documents, activities, transactions):
+        self.report = report
+        self.documents = documents
+        self.activities = activities
+        self.transactions = transactions
+
+
+def pack(report, documents, activities, transactions):
+    """Serialize a report and its rows to compressed JSON."""
+    # orjson keeps microseconds, which Django's json serializer would round away
+    data = serializers.serialize('python', [report, *documents, *activities, *transactions])
+    return zlib.compress(orjson.dumps(data), 6)
+
+
+def _deserialize(archived):
+    data = orjson.loads(zlib.decompress(archived.payload))
+    return serializers.deserialize('python', data, ignorenonexistent=True)
+
+
+def unpack(archived):
+    """
+    Rebuild an ArchivedReport's rows without touching the hot tables.
+
+    :param archived: The ArchivedReport.
+    :return: ArchivedReportData; `report.archived_documents` holds the documents for ArchivedReportSerializer.
+    """
+    rows = {Report: [], Document: [], Activity: [], Transaction: []}
+    for row in _deserialize(archived):
+        rows[type(row.object)].append(row.object)
+    report = rows[Report][0]
+    documents = sorted(rows[Document], key=lambda document: document.id)
+    activities = sorted(rows[Activity], key=lambda activity: (activity.timestamp, activity.id))
+    report.archived_documents = documents
+    return ArchivedReportData(report, documents, activities, rows[Transaction])
+
+
+def archivable_reports(cutoff):
+    """
+    Final reports whose status has not changed since `cutoff`. Final reports
+    are never escalated, so the scan is a range over report_sla_idx.
+    """
+    return Report.objects.filter(
+        status__in=ARCHIVABLE_STATUSES, escalated_at__isnull=True, status_changed_at__lt=cutoff,
+    )
+
+
+def archive_reports(older_than_days=180, batch_size=200):
+    """
+    Move COMPLETED and CANCELLED reports older than the retention age out
+    of the hot tables. Each batch locks its reports (skipping rows other
+    transactions hold), writes one compressed ArchivedReport per report and
+    deletes the originals, whose documents, activities and transactions
+    cascade, in a single transaction.
+
+    :param older_than_days: Days a report must have been in its final status.
+    :param batch_size: Reports moved per transaction.
+    :return: Number of reports archived.
+    """
+    cutoff = now() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            reports = list(
+                archivable_reports(cutoff).select_for_update(skip_locked=True, of=('self',))
+                .select_related('user').prefetch_related('documents', 'activities', 'transactions')
+                .order_by('status_changed_at', 'id')[:batch_size]
+            )
+            if not reports:
+                break
+            timestamp = now()
+            ArchivedReport.objects.bulk_create([
+                ArchivedReport(
+                    id=report.id,
+                    user_id=report.user_id,
+                    entity_id=report.user.entity_id,
+                    status=report.status,
+                    created_at=report.created_at,
+                    archived_at=timestamp,
+                    payload=pack(report, report.documents.all(), report.activities.all(), report.transactions.all()),
+                )
+                for report in reports
+            ])
+            Report.objects.filter(id__in=[report.id for report in reports]).delete()
+        archived += len(reports)
+        reports_archived.inc(len(reports))
+        if len(reports) < batch_size:
+            break
+    if archived:
+        logger.info("Archived %d reports older than %d days", archived, older_than_days)
+    return archived
+
+
+def restore_report(report_id):
+    """
+    Move an archived report and its rows back into the hot tables, with
+    their original ids.
+
+    :param report_id: ArchivedReport.id (the original Report.id).
+    :return: The restored Report, or None if it is not archived.
+    """
+    with transaction.atomic():
+        archived = ArchivedReport.objects.select_for_update().filter(id=report_id).first()
+        if archived is None:
+            return None
+        # Raw saves keep the original auto_now_add timestamps; the report comes first in the payload
+        rows = list(_deserialize(archived))
+        for row in rows:
+            row.save()
+        report = rows[0].object
+        # Service rows are derived from the report, so they are rebuilt rather than archived
+        ReportService.sync([report], replace=False)
+        archived.delete()
+    return report
@@ -0,0 +1,147 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.utils.timezone import now
+
+from backend.metrics import report_assignments
+from backend.models import Activity, AgentProfile, Report, ReportService, ReportStatus
+from backend.services.event_stream import publish_report_event, publish_report_events, report_event
+from backend.services.report_status_service import InvalidTransition, transition
+from backend.services.usage_service import record_status_change
+
+QUEUED = ReportStatus.REQUEST_RAISED.name
+ASSIGNED = ReportStatus.UNDER_ASSESMENT.name
+# Statuses that count towards an agent's load
+OPEN_STATUSES = (ReportStatus.REQUEST_RAISED.name, ReportStatus.UNDER_ASSESMENT.name, ReportStatus.DOC_PENDING.name)
+
+
+class AssignmentError(Exception):
+    """The report is not in a state that allows the requested queue operation."""
+
+
+def queued_reports():
+    """Unassigned reports waiting for an agent, oldest first (served by report_queue_idx)."""
+    # The owner is joined (but not locked) for the change events
+    return Report.objects.filter(status=QUEUED, agent__isnull=True).select_related('user').order_by('created_at', 'id')
+
+
+def _lock_queued(limit, service=None):
+    """
+    Lock up to `limit` of the oldest queued reports, skipping rows that other
+    transactions hold, so concurrent claims never wait on or double-assign a
+    report. A service-specific claim walks the queue in order and probes
+    report_service_unique for each report.
+    """
+    reports = queued_reports()
+    if service is not None:
+        reports = reports.filter(Exists(ReportService.objects.filter(report=OuterRef('pk'), service=service)))
+    return list(reports.select_for_update(skip_locked=True, of=('self',))[:limit])
+
+
+def _assign(reports, agent_id, actor_id, timestamp):
+    """Hand locked, queued `reports` to an agent with one UPDATE, two INSERTs and one change notification."""
+    # A bulk transition: the rows are locked and known to be queued, so no per-row status check is needed
+    Report.objects.filter(id__in=[report.id for report in reports]).update(
+        agent_id=agent_id, status=ASSIGNED, assigned_at=timestamp, status_changed_at=timestamp, escalated_at=None,
+    )
+    Activity.objects.bulk_create([
+        Activity(
+            report=report,
+            user_id=actor_id,
+            old_state={"status": QUEUED, "agent": None},
+            new_state={"status": ASSIGNED, "agent": agent_id},
+        )
+        for report in reports
+    ])
+    record_status_change(reports, ASSIGNED)
+    for report in reports:
+        report.agent_id, report.status, report.assigned_at = agent_id, ASSIGNED, timestamp
+        report.status_changed_at, report.escalated_at = timestamp, None
+    publish_report_events(
+        report_event(report.user.entity_id, "report.status_changed", report.id, status=ASSIGNED) for report in reports
+    )
+
+
+def claim_reports(agent, service=None, limit=1):
+    """
+    Pull the oldest queued reports for `agent`.
+
+    :param agent: The claiming User.
+    :param service: Optional ServiceType name; only reports that include it are claimed.
+    :param limit: Maximum number of reports to claim.
+    :return: List of the claimed Reports (possibly empty).
+    """
+    with transaction.atomic():
+        reports = _lock_queued(limit, service)
+        if reports:
+            _assign(reports, agent.id, agent.id, now())
+    report_assignments.labels('claim').inc(len(reports))
+    return reports
+
+
+def release_report(report_id, actor):
+    """
+    Put an assigned report back in the queue.
+
+    :param report_id: Report.id to release.
+    :param actor: User performing the release (recorded in the activity log).
+    :return: The released Report, or None if it does not exist.
+    :raises AssignmentError: If the report is not currently under assessment.
+    """
+    report = Report.objects.select_related('user').filter(id=report_id).first()
+    if report is None:
+        return None
+    if report.agent_id is None or report.status != ASSIGNED:
+        raise AssignmentError(f"Only reports in {ASSIGNED} with an agent can be released")
+    try:
+        # Conditional on the status read above, so a racing release or transition wins cleanly
+        transition(report, QUEUED, actor, agent_id=None, assigned_at=None)
+    except InvalidTransition as e:
+        raise AssignmentError(str(e)) from e
+    publish_report_event(report.user.entity_id, "report.status_changed", report.id, status=QUEUED)
+    return report
+
+
+def assign_queued_reports(limit=200):
+    """
+    Push queued reports to active agents.
+
+    Each report goes to the least-loaded agent whose profile covers all of
+    its services; ties go to the agent who has waited longest since their
+    last assignment, so equally loaded agents are served round-robin.
+    Reports no agent can handle stay queued for a manual claim.
+
+    :param limit: Maximum number of reports to assign in this call.
+    :return: Number of reports assigned.
+    """
+    with transaction.atomic():
+        reports = _lock_queued(limit)
+        if not reports:
+            return 0
+
+        agents = list(
+            AgentProfile.objects.filter(is_active=True, user__is_active=True).annotate(
+                load=Count('user__assigned_reports', filter=Q(user__assigned_reports__status__in=OPEN_STATUSES)),
+                last_assigned=Max('user__assigned_reports__assigned_at'),
+            )
+        )
+        never = datetime.min.replace(tzinfo=timezone.utc)
+        timestamp = now()
+        batches = defaultdict(list)
+        for report in reports:
+            eligible = [agent for agent in agents if agent.handles(report.services)]
+            if not eligible:
+                continue
+            agent = min(eligible, key=lambda agent: (agent.load, agent.last_assigned or never, agent.user_id))
+            agent.load += 1
+            agent.last_assigned = timestamp
+            batches[agent.user_id].append(report)
+
+        for agent_id, batch in batches.items():
+            _assign(batch, agent_id, agent_id, timestamp)
+
+    assigned = sum(len(batch) for batch in batches.values())
+    report_assignments.labels('auto').inc(assigned)
+    return assigned
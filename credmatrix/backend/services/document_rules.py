@@ -0,0 +1,137 @@
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from backend.models import Document, DocumentType, Report, ServiceType
+
+# Conditional updates retried before giving up on a report under heavy concurrent confirmation
+MAX_UPDATE_ATTEMPTS = 5
+
+
+class DocumentRules:
+    """
+    Required document types per service, compiled from a {ServiceType name:
+    [DocumentType names]} mapping. Every name is checked once, up front;
+    the requirement for each distinct combination of services is computed
+    once and memoised.
+    """
+
+    def __init__(self, rules):
+        services = {service.name for service in ServiceType}
+        order = {document_type.name: i for i, document_type in enumerate(DocumentType)}
+        unknown = set(rules) - services
+        if unknown:
+            raise ImproperlyConfigured(f"REQUIRED_DOCUMENTS names unknown services: {sorted(unknown)}")
+        self._order = order
+        self._by_service = {}
+        for service, document_types in rules.items():
+            invalid = set(document_types) - set(order)
+            if invalid:
+                raise ImproperlyConfigured(
+                    f"REQUIRED_DOCUMENTS[{service!r}] names unknown document types: {sorted(invalid)}"
+                )
+            self._by_service[service] = frozenset(document_types)
+        self._combinations = {}
+
+    def required(self, services):
+        """Document types required by a report with `services`, in DocumentType order."""
+        key = frozenset(services)
+        required = self._combinations.get(key)
+        if required is None:
+            needed = set().union(*(self._by_service.get(service, ()) for service in key))
+            required = self._combinations[key] = tuple(sorted(needed, key=self._order.__getitem__))
+        return required
+
+    def pending(self, services, received=()):
+        """Required document types of `services` not among the `received` types, as a list."""
+        received = set(received)
+        return [document_type for document_type in self.required(services) if document_type not in received]
+
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_document_rules():
+    """Return the process-wide rules, compiled from settings.REQUIRED_DOCUMENTS on first use."""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = DocumentRules(settings.REQUIRED_DOCUMENTS)
+    return _rules
+
+
+def set_document_rules(rules=None):
+    """Replace the process-wide rules (e.g. in tests). None recompiles them from settings."""
+    global _rules
+    _rules = rules
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting == 'REQUIRED_DOCUMENTS':
+        set_document_rules(None)
+
+
+def received_types(report_id):
+    """Types of a report's confirmed documents (one query); presigned, unconfirmed uploads don't count."""
+    return set(
+        Document.objects.filter(report_id=report_id, document_type__isnull=False, uploaded_at__isnull=False)
+        .values_list('document_type', flat=True)
+    )
+
+
+def document_received(report, document_type):
+    """
+    Tick `document_type` off `report`'s pending documents after a document
+    of that type is confirmed. No query if it was not pending; otherwise
+    one UPDATE, conditional on the list read with the report, retried with
+    a fresh read if another confirmation changed it first.
+
+    :param report: The Report, with `pending_documents` as last read.
+    :param document_type: The confirmed document's DocumentType name, or None.
+    :return: The report's pending document types.
+    """
+    pending = report.pending_documents
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        if document_type not in pending:
+            break
+        remaining = [name for name in pending if name != document_type]
+        if Report.objects.filter(pk=report.pk, pending_documents=pending).update(pending_documents=remaining):
+            pending = remaining
+            break
+        pending = Report.objects.values_list('pending_documents', flat=True).get(pk=report.pk)
+    else:
+        # Persistently contended: fall back to a full recomputation
+        pending = rebuild_pending_documents([report])[report.pk]
+    report.pending_documents = pending
+    return pending
+
+
+def rebuild_pending_documents(reports):
+    """
+    Recompute `pending_documents` from scratch for `reports`, e.g. after
+    their services or the rules changed: one query for their confirmed
+    documents' types and one UPDATE per report whose list changed.
+
+    :param reports: Reports with `services` loaded.
+    :return: Dict of {report id: pending document types}.
+    """
+    rules = get_document_rules()
+    received = {}
+    for report_id, document_type in Document.objects.filter(
+        report_id__in=[report.pk for report in reports], document_type__isnull=False, uploaded_at__isnull=False,
+    ).values_list('report_id', 'document_type'):
+        received.setdefault(report_id, set()).add(document_type)
+
+    pending = {}
+    for report in reports:
+        pending[report.pk] = rules.pending(report.services, received.get(report.pk, ()))
+        if pending[report.pk] != report.pending_documents:
+            Report.objects.filter(pk=report.pk).update(pending_documents=pending[report.pk])
+            report.pending_documents = pending[report.pk]
+    return pending
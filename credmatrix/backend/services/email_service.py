@@ -1,6 +1,11 @@
-from django.core.mail import send_mail
+import logging
+
 from django.conf import settings
 
+from backend.metrics import smtp_send_duration, smtp_sends, track
+
+logger = logging.getLogger(__name__)
+
 def send_email(subject, message, recipient_list, from_email=None):
     """
     Utility function to send an email using Amazon SES.
@@ -10,18 +15,61 @@ def send_email(subject, message, recipient_list, from_email=None):
     :param from_email: Sender email address (optional, defaults to settings.DEFAULT_FROM_EMAIL)
     :return: None
     """
+    # django.core.mail pulls in the smtplib/email stack; only load it when sending
+    from django.core.mail import send_mail
+
     if from_email is None:
         from_email = settings.DEFAULT_FROM_EMAIL
 
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=from_email,
-            recipient_list=recipient_list,
-            fail_silently=False,  # Raise errors if email fails
-        )
+        with track(smtp_send_duration, smtp_sends):
+            send_mail(
+                subject=subject,
+                message=message,
+                from_email=from_email,
+                recipient_list=recipient_list,
+                fail_silently=False,  # Raise errors if email fails
+            )
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending email: %s", e)
         return False
-    return True
\ No newline at end of file
+    return True
+
+
+def send_emails(emails, from_email=None):
+    """
+    Send several emails over one SMTP connection instead of one connection per email.
+    :param emails: List of (subject, message, recipient_list) tuples
+    :param from_email: Sender email address (optional, defaults to settings.DEFAULT_FROM_EMAIL)
+    :return: List of booleans, True where the email at that position was sent
+    """
+    from django.core.mail import EmailMessage, get_connection
+
+    if not emails:
+        return []
+    if from_email is None:
+        from_email = settings.DEFAULT_FROM_EMAIL
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error("Error opening email connection: %s", e)
+        return [False] * len(emails)
+
+    results = []
+    try:
+        for subject, message, recipient_list in emails:
+            try:
+                with track(smtp_send_duration, smtp_sends):
+                    connection.send_messages([
+                        EmailMessage(subject, message, from_email, recipient_list, connection=connection)
+                    ])
+            except Exception as e:
+                logger.error("Error sending email: %s", e)
+                results.append(False)
+            else:
+                results.append(True)
+    finally:
+        connection.close()
+    return results
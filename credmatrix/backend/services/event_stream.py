@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import threading
+
+import orjson
+from django.conf import settings
+from django.core.checks import Warning
+from django.db import connection, transaction
+
+from backend.metrics import stream_events_dropped
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL NOTIFY channel shared by all processes
+CHANNEL = 'report_events'
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7000
+# Sent to a subscriber that missed events; clients should reload their reports
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    One open event stream: a bounded queue owned by the event loop that
+    serves the connection. When the client falls behind, the oldest event is
+    dropped and a single `resync` event tells it to reload instead.
+    """
+
+    __slots__ = ('entity_id', 'loop', 'queue', 'lagged')
+
+    def __init__(self, entity_id, loop, maxsize):
+        self.entity_id = entity_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.lagged = False
+
+    def deliver(self, event):
+        """Queue `event` from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The connection's loop has closed; it unsubscribes on its way out
+            pass
+
+    def _put(self, event):
+        if self.lagged:
+            return
+        if self.queue.full():
+            self.lagged = True
+            stream_events_dropped.inc(self.queue.qsize())
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        event = await self.queue.get()
+        if event is RESYNC:
+            self.lagged = False
+        return event
+
+
+class LocalFanout:
+    """This process's open subscriptions, grouped by entity."""
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def add(self, subscription):
+        with self._lock:
+            self._subscriptions.setdefault(subscription.entity_id, set()).add(subscription)
+
+    def remove(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.entity_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.entity_id]
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event["entity_id"], ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def resync_all(self):
+        with self._lock:
+            subscriptions = [sub for subs in self._subscriptions.values() for sub in subs]
+        for subscription in subscriptions:
+            subscription.deliver(RESYNC)
+
+    def count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscriptions.values())
+
+
+class InMemoryBroker:
+    """
+    Fan-out within one process. Used in tests and single-process
+    deployments; events published by other processes are not seen.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.fanout = LocalFanout()
+
+    def publish(self, events):
+        """Send a list of events to the matching subscriptions once the current transaction commits."""
+        def dispatch():
+            for event in events:
+                self.fanout.dispatch(event)
+        transaction.on_commit(dispatch)
+
+    def subscribe(self, entity_id):
+        """Register a stream for `entity_id`; call from the event loop that will read it."""
+        subscription = Subscription(entity_id, asyncio.get_running_loop(), self.queue_size)
+        self.fanout.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.fanout.remove(subscription)
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Fan-out across processes with PostgreSQL LISTEN/NOTIFY on the default
+    database. NOTIFY is transactional, so events are delivered only if the
+    change commits. Each process keeps one listening connection, however
+    many streams it serves, and fans events out locally.
+    """
+
+    def __init__(self, queue_size=100, reconnect_delay=1.0):
+        super().__init__(queue_size)
+        self.reconnect_delay = reconnect_delay
+        self._listener = None
+
+    def publish(self, events):
+        # One NOTIFY per batch of events that fits in a payload
+        payloads, batch, size = [], [], 2
+        for event in events:
+            encoded = orjson.dumps(event)
+            if batch and size + len(encoded) + 1 > MAX_NOTIFY_PAYLOAD:
+                payloads.append(b'[' + b','.join(batch) + b']')
+                batch, size = [], 2
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            payloads.append(b'[' + b','.join(batch) + b']')
+        with connection.cursor() as cursor:
+            for payload in payloads:
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload.decode()])
+
+    def subscribe(self, entity_id):
+        subscription = super().subscribe(entity_id)
+        if self._listener is None or self._listener.done():
+            self._listener = subscription.loop.create_task(self._listen())
+        return subscription
+
+    def _conninfo(self):
+        # Django's parameters for the default database, OPTIONS such as sslmode included,
+        # without the sync cursor class and adapters it sets for its own connections
+        params = connection.get_connection_params()
+        params.pop('cursor_factory', None)
+        params.pop('context', None)
+        return params
+
+    async def _listen(self):
+        import psycopg
+
+        connected_before = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(**self._conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    if connected_before:
+                        # Anything published while we were disconnected is lost
+                        self.fanout.resync_all()
+                    connected_before = True
+                    async for notify in conn.notifies():
+                        for event in orjson.loads(notify.payload):
+                            self.fanout.dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Report event listener lost its connection; reconnecting")
+                await asyncio.sleep(self.reconnect_delay)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """
+    Return the process-wide event broker, building it on first use.
+    settings.EVENT_BROKER selects 'memory' or 'postgres'.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = PostgresBroker if settings.EVENT_BROKER == 'postgres' else InMemoryBroker
+                _broker = broker_class(queue_size=settings.EVENT_STREAM_QUEUE_SIZE)
+    return _broker
+
+
+def set_event_broker(broker=None):
+    """Replace the process-wide broker (e.g. in tests). None rebuilds it from settings."""
+    global _broker
+    _broker = broker
+
+
+def check_event_broker(app_configs, **kwargs):
+    """System check: outside DEBUG, the in-memory broker only reaches streams of the publishing process."""
+    if settings.DEBUG or settings.EVENT_BROKER != 'memory':
+        return []
+    return [Warning(
+        "EVENT_BROKER is 'memory'.",
+        hint="Report events published by other processes, including Celery workers, never reach this "
+             "process's streams. Set EVENT_BROKER=postgres when running more than one process.",
+        id='backend.W002',
+    )]
+
+
+def report_event(entity_id, event_type, report_id, **data):
+    """
+    Build a report change event for `publish_report_events`.
+
+    :param entity_id: Entity that owns the report.
+    :param event_type: e.g. 'report.created', 'report.updated', 'report.status_changed', 'document.confirmed'.
+    :param report_id: The report's id.
+    :param data: Small extra fields for the event (e.g. status).
+    """
+    return {"type": event_type, "entity_id": entity_id, "report_id": report_id, **data}
+
+
+def publish_report_events(events):
+    """
+    Tell the owning entities' open streams about report changes. Delivery
+    happens after the surrounding transaction commits. Events without an
+    entity are dropped.
+    """
+    events = [event for event in events if event["entity_id"] is not None]
+    if events:
+        get_event_broker().publish(events)
+
+
+def publish_report_event(entity_id, event_type, report_id, **data):
+    """Publish a single report change event (see `report_event`)."""
+    publish_report_events([report_event(entity_id, event_type, report_id, **data)])
+
+
+def format_event(event):
+    """Encode an event in the text/event-stream format."""
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+class EventStream:
+    """
+    An entity's report events as server-sent events, with a comment line
+    every `heartbeat` seconds so idle proxies keep the connection open.
+
+    The subscription is made when iteration starts. StreamingHttpResponse
+    calls `close()` when the response is closed, which removes it even when
+    the client disconnects mid-stream.
+    """
+
+    def __init__(self, entity_id, heartbeat=None):
+        self.entity_id = entity_id
+        self.heartbeat = heartbeat or settings.EVENT_STREAM_HEARTBEAT
+        self.broker = get_event_broker()
+        self.subscription = None
+
+    async def __aiter__(self):
+        self.subscription = self.broker.subscribe(self.entity_id)
+        try:
+            yield f"retry: {settings.EVENT_STREAM_RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(self.subscription.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.subscription is not None:
+            self.broker.unsubscribe(self.subscription)
+            self.subscription = None
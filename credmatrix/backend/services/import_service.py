@@ -0,0 +1,264 @@
+import csv
+import io
+import logging
+import re
+import shutil
+import tempfile
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from backend.metrics import credits_debited
+from backend.models import Entity, ImportStatus, Report, ReportImport, ReportService, ReportStatus, Transaction
+from backend.serializers import ImportRowSerializer
+from backend.services.document_rules import get_document_rules
+from backend.services.event_stream import publish_report_events, report_event
+from backend.services.pricing_service import get_required_credits
+from backend.services.s3_service import s3_service
+from backend.services.usage_service import record_reports_created
+
+logger = logging.getLogger(__name__)
+
+AWAITING_UPLOAD = ImportStatus.AWAITING_UPLOAD.name
+QUEUED = ImportStatus.QUEUED.name
+RUNNING = ImportStatus.RUNNING.name
+COMPLETED = ImportStatus.COMPLETED.name
+FAILED = ImportStatus.FAILED.name
+
+# Bytes read from S3 at a time
+READ_SIZE = 64 * 1024
+# Accepted spellings of the header row, after lower-casing and replacing spaces with underscores
+COLUMNS = {
+    "entity_name": "entity_name",
+    "name": "entity_name",
+    "entity_pan": "entity_pan",
+    "pan": "entity_pan",
+    "services": "services",
+}
+REQUIRED_COLUMNS = ("entity_name", "entity_pan", "services")
+
+
+class ImportFileError(Exception):
+    """The file cannot be imported: unreadable, empty, or missing a required column."""
+
+
+class ImportStopped(Exception):
+    """A chunk could not be committed and the import ends here: the entity ran out of credits."""
+
+
+class _RawStream(io.RawIOBase):
+    """Adapts a stream that only has read(n) (such as an S3 body) for io.BufferedReader."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _csv_rows(stream):
+    text = io.TextIOWrapper(io.BufferedReader(_RawStream(stream), READ_SIZE), encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Not a readable UTF-8 CSV file: {e}") from e
+
+
+def _xlsx_rows(stream):
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise ImportFileError("XLSX imports are not available on this server; upload a CSV file") from e
+    # Workbooks are zip files, which need seeking: spool to disk rather than memory
+    with tempfile.TemporaryFile() as spool:
+        shutil.copyfileobj(stream, spool, READ_SIZE)
+        spool.seek(0)
+        try:
+            # Read-only mode parses the sheet as it is iterated instead of loading it whole
+            workbook = openpyxl.load_workbook(spool, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"Not a readable XLSX file: {e}") from e
+        try:
+            for values in workbook.active.iter_rows(values_only=True):
+                yield ["" if value is None else str(value) for value in values]
+        finally:
+            workbook.close()
+
+
+def read_rows(stream, file_format):
+    """
+    Parse a spreadsheet of report requests as it is read.
+
+    :param stream: Binary file-like object.
+    :param file_format: 'CSV' or 'XLSX'.
+    :return: Generator of (row number, row data) for non-blank rows, row 1 being the header.
+    :raises ImportFileError: If the file is unreadable or lacks a required column.
+    """
+    rows = _xlsx_rows(stream) if file_format == 'XLSX' else _csv_rows(stream)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("The file is empty")
+    columns = {}
+    for index, name in enumerate(header):
+        field = COLUMNS.get(name.strip().lower().replace(" ", "_"))
+        if field is not None:
+            columns.setdefault(field, index)
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+
+    for row_number, values in enumerate(rows, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        data = {field: values[index].strip() if index < len(values) else "" for field, index in columns.items()}
+        # One cell lists the services, separated by commas, semicolons, pipes or spaces
+        data["services"] = [service for service in re.split(r"[\s,;|]+", data["services"].upper()) if service]
+        yield row_number, data
+
+
+def _error_messages(detail):
+    # ErrorDetail strings and nested structures, as plain JSON
+    if isinstance(detail, dict):
+        return {field: _error_messages(value) for field, value in detail.items()}
+    if isinstance(detail, list):
+        return [_error_messages(value) for value in detail]
+    return str(detail)
+
+
+def _import_chunk(job, entity_id, chunk, max_errors):
+    """
+    Validate a chunk of rows and create reports for the valid ones in one
+    transaction: the progress update (conditional on the progress read, so
+    a duplicate worker cannot import the chunk twice), a single credit
+    debit for the whole chunk, and bulk inserts of the reports, their
+    service rows, transactions and usage events.
+
+    :return: False if another worker has moved the import on, True otherwise.
+    :raises ImportStopped: If the entity lacks the credits for the chunk.
+    """
+    serializer = ImportRowSerializer()
+    rules = get_document_rules()
+    timestamp = now()
+    reports, errors = [], []
+    for row_number, data in chunk:
+        try:
+            data = serializer.run_validation(data)
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": _error_messages(e.detail)})
+            continue
+        reports.append(Report(
+            user_id=job.user_id,
+            status=ReportStatus.REQUEST_RAISED.name,
+            status_changed_at=timestamp,
+            services=data["services"],
+            target_entity_name=data["entity_name"],
+            target_entity_pan=data["entity_pan"],
+            credits=get_required_credits(data["services"]),
+            pending_documents=rules.pending(data["services"]),
+        ))
+    credits = sum(report.credits for report in reports)
+    kept_errors = job.errors + errors[:max(max_errors - len(job.errors), 0)]
+
+    with transaction.atomic():
+        progressed = ReportImport.objects.filter(pk=job.pk, status=RUNNING, rows_processed=job.rows_processed).update(
+            rows_processed=F('rows_processed') + len(chunk),
+            rows_failed=F('rows_failed') + len(errors),
+            reports_created=F('reports_created') + len(reports),
+            credits_spent=F('credits_spent') + credits,
+            errors=kept_errors,
+        )
+        if not progressed:
+            return False
+        if reports:
+            if not Entity.objects.filter(pk=entity_id, credits__gte=credits).update(credits=F('credits') - credits):
+                raise ImportStopped(
+                    f"Insufficient credits for rows {chunk[0][0]} to {chunk[-1][0]} ({credits} credits needed)"
+                )
+            Report.objects.bulk_create(reports)
+            # bulk_create skips Report.save(), which normally writes these
+            ReportService.sync(reports, replace=False)
+            Transaction.objects.bulk_create([
+                Transaction(user_id=job.user_id, report=report, credits=report.credits) for report in reports
+            ])
+            record_reports_created(reports)
+            publish_report_events(
+                report_event(entity_id, "report.created", report.id, status=report.status) for report in reports
+            )
+    credits_debited.inc(credits)
+
+    job.rows_processed += len(chunk)
+    job.rows_failed += len(errors)
+    job.reports_created += len(reports)
+    job.credits_spent += credits
+    job.errors = kept_errors
+    return True
+
+
+def _finish(job, status, failure_reason=None):
+    job.status, job.failure_reason, job.finished_at = status, failure_reason, now()
+    ReportImport.objects.filter(pk=job.pk, status__in=(QUEUED, RUNNING)).update(
+        status=status, failure_reason=failure_reason, finished_at=job.finished_at,
+    )
+
+
+def fail_import(import_id, reason):
+    """Mark an unfinished import as failed, keeping the reports created so far."""
+    ReportImport.objects.filter(pk=import_id, status__in=(QUEUED, RUNNING)).update(
+        status=FAILED, failure_reason=reason, finished_at=now(),
+    )
+
+
+def run_import(import_id, chunk_size=500, max_errors=100):
+    """
+    Import the uploaded spreadsheet of a queued ReportImport.
+
+    The file is streamed from S3 and handled `chunk_size` rows at a time,
+    so memory stays bounded whatever its size. Each chunk commits on its
+    own (see `_import_chunk`) and advances the job's counters, which
+    callers poll for progress; a rerun after a crash skips the rows
+    already processed. Invalid rows are counted and the first
+    `max_errors` of them recorded, without stopping the import.
+
+    :param import_id: ReportImport.id.
+    :param chunk_size: Rows validated and inserted per transaction.
+    :param max_errors: Invalid rows whose errors are kept.
+    :return: The ReportImport.
+    """
+    job = ReportImport.objects.select_related('user').get(pk=import_id)
+    if job.status not in (QUEUED, RUNNING):
+        return job
+    entity_id = job.user.entity_id
+    if entity_id is None:
+        _finish(job, FAILED, "User does not belong to any entity")
+        return job
+
+    job.status, job.started_at = RUNNING, job.started_at or now()
+    ReportImport.objects.filter(pk=job.pk).update(status=RUNNING, started_at=job.started_at)
+
+    stream = s3_service.open_file(job.s3_path)
+    try:
+        rows = islice(read_rows(stream, job.file_format), job.rows_processed, None)
+        while chunk := list(islice(rows, chunk_size)):
+            if not _import_chunk(job, entity_id, chunk, max_errors):
+                return job
+    except ImportFileError as e:
+        _finish(job, FAILED, str(e))
+        return job
+    except ImportStopped as e:
+        logger.warning("Report import %s stopped after %d rows: %s", job.pk, job.rows_processed, e)
+        _finish(job, FAILED, str(e))
+        return job
+    finally:
+        stream.close()
+
+    _finish(job, COMPLETED)
+    logger.info("Report import %s created %d reports from %d rows", job.pk, job.reports_created, job.rows_processed)
+    return job
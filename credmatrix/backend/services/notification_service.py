@@ -0,0 +1,221 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils.timezone import localtime, now
+
+from backend.metrics import notification_digests
+from backend.models import Notification, NotificationPreference, ReportLifecycleEvent, User
+from backend.services.email_service import send_emails
+
+logger = logging.getLogger(__name__)
+
+
+def record_lifecycle_event(report, status):
+    """
+    Note a status change that recipients should hear about. This is one
+    INSERT inside the caller's transaction; recipients are worked out and
+    emailed in the background.
+    """
+    if status in settings.NOTIFICATION_STATUSES:
+        ReportLifecycleEvent.objects.create(report_id=report.pk, status=status)
+
+
+def _preference(user):
+    # Reverse one-to-one: missing rows raise an AttributeError subclass
+    return getattr(user, 'notification_preference', None)
+
+
+def _wants(user, status):
+    preference = _preference(user)
+    return preference is None or preference.wants(status)
+
+
+def _digest_window(preference):
+    minutes = getattr(preference, 'digest_minutes', None)
+    return timedelta(minutes=settings.NOTIFICATION_DIGEST_MINUTES if minutes is None else minutes)
+
+
+def fan_out_lifecycle_events(batch_size=500):
+    """
+    Turn recorded lifecycle events into one Notification per interested
+    recipient: the active users of the report owner's entity (or the owner
+    alone if they have no entity), filtered by their preferences.
+
+    Each batch locks its events with SKIP LOCKED, so concurrent workers
+    split the backlog, and deletes them in the same transaction.
+
+    :param batch_size: Events handled per transaction.
+    :return: Number of notifications created.
+    """
+    created = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                ReportLifecycleEvent.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('report__user').order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+
+            entity_ids = {event.report.user.entity_id for event in events} - {None}
+            members = defaultdict(list)
+            for user in User.objects.filter(entity_id__in=entity_ids, is_active=True).select_related(
+                'notification_preference'
+            ):
+                members[user.entity_id].append(user)
+
+            notifications = []
+            for event in events:
+                owner = event.report.user
+                recipients = members[owner.entity_id] if owner.entity_id is not None else [owner]
+                notifications += [
+                    Notification(user=user, report_id=event.report_id, status=event.status, created_at=event.created_at)
+                    for user in recipients if _wants(user, event.status)
+                ]
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+            ReportLifecycleEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        created += len(notifications)
+        if len(events) < batch_size:
+            break
+    return created
+
+
+def digest_email(user, notifications):
+    """Return the (subject, message, recipient_list) of one user's digest."""
+    count = len(notifications)
+    lines = [
+        f"- Report #{notification.report_id} ({notification.report.target_entity_name}): "
+        f"{notification.status} at {localtime(notification.created_at):%Y-%m-%d %H:%M}"
+        for notification in notifications
+    ]
+    subject = f"CredMatrix: {count} report update{'s' if count != 1 else ''}"
+    message = "\n".join([
+        f"Hello {user.first_name or user.email},",
+        "",
+        "These reports have changed status:",
+        "",
+        *lines,
+        "",
+        "You can change how often you receive these emails in your notification preferences.",
+    ])
+    return subject, message, [user.email]
+
+
+def due_recipients(at=None):
+    """
+    Users with pending notifications whose digest window has passed, i.e.
+    whose oldest pending notification is at least their digest interval old.
+
+    :return: List of user ids, longest waiting first.
+    """
+    at = at or now()
+    oldest = dict(
+        Notification.objects.order_by().values('user_id').annotate(oldest=Min('created_at'))
+        .values_list('user_id', 'oldest')
+    )
+    preferences = {
+        preference.user_id: preference
+        for preference in NotificationPreference.objects.filter(user_id__in=list(oldest))
+    }
+    return [
+        user_id for user_id, first in sorted(oldest.items(), key=lambda item: item[1])
+        if first <= at - _digest_window(preferences.get(user_id))
+    ]
+
+
+def send_notification_digests(batch_size=200, max_workers=4, at=None):
+    """
+    Email each due recipient one digest of their pending notifications.
+
+    Digests are built per batch of recipients with two queries, sent by a
+    bounded pool of workers that each hold one SMTP connection for their
+    share of the batch, and the notifications of delivered digests are
+    deleted with one query. Failed digests stay pending and are retried on
+    the next run. Notifications of users who have since switched
+    notifications off are dropped.
+
+    Each batch first claims its notifications in a short transaction, so a
+    run that overlaps a slow one (beat fires every minute) skips what the
+    other is sending instead of emailing it again. The emails go out with
+    no transaction or row lock held; failed digests are released again,
+    and claims older than NOTIFICATION_CLAIM_MINUTES (a run that died
+    mid-send) are taken over.
+
+    :param batch_size: Recipients per batch.
+    :param max_workers: Concurrent SMTP connections.
+    :param at: Current time (defaults to now).
+    :return: Number of digests sent.
+    """
+    at = at or now()
+    recipients = due_recipients(at)
+    sent = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for start in range(0, len(recipients), batch_size):
+            sent += _send_batch(executor, recipients[start:start + batch_size], max_workers, at)
+    return sent
+
+
+def _claim(user_ids, at):
+    """
+    Mark the unclaimed (or abandoned) notifications of `user_ids` as taken
+    by a new claim and return its id. SKIP LOCKED keeps concurrent claims
+    from waiting on each other, and the UPDATE re-checks the claim so that
+    on backends without row locks a row still goes to one run only.
+    """
+    claim, claimed_at = uuid4(), now()
+    claimable = Q(claimed_by__isnull=True) | Q(
+        claimed_at__lt=claimed_at - timedelta(minutes=settings.NOTIFICATION_CLAIM_MINUTES)
+    )
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.filter(claimable, user_id__in=user_ids, created_at__lte=at)
+            .select_for_update(skip_locked=True, of=('self',)).values_list('id', flat=True)
+        )
+        Notification.objects.filter(claimable, id__in=ids).update(claimed_by=claim, claimed_at=claimed_at)
+    return claim
+
+
+def _send_batch(executor, user_ids, max_workers, at):
+    """Claim and send the digests of one batch of recipients."""
+    claim = _claim(user_ids, at)
+    pending = list(
+        Notification.objects.filter(claimed_by=claim)
+        .select_related('user__notification_preference', 'report')
+        .order_by('user_id', 'created_at', 'id')
+    )
+    digests, muted = [], []
+    for _, group in groupby(pending, key=lambda notification: notification.user_id):
+        group = list(group)
+        user = group[0].user
+        preference = _preference(user)
+        if not user.is_active or (preference is not None and not preference.enabled):
+            muted += group
+        else:
+            digests.append((user, group))
+
+    emails = [digest_email(user, group) for user, group in digests]
+    chunks = [emails[i::max_workers] for i in range(max_workers)]
+    results = [None] * len(emails)
+    # Each worker sends its chunk over a single SMTP connection
+    for i, chunk_results in enumerate(executor.map(send_emails, chunks)):
+        results[i::max_workers] = chunk_results
+
+    delivered = [group for (_, group), ok in zip(digests, results) if ok]
+    done = [notification.id for group in delivered + [muted] for notification in group]
+    if done:
+        Notification.objects.filter(id__in=done).delete()
+    failed = len(digests) - len(delivered)
+    notification_digests.labels('ok').inc(len(delivered))
+    if failed:
+        # Release the undelivered rest of the claim for the next run
+        Notification.objects.filter(claimed_by=claim).update(claimed_by=None, claimed_at=None)
+        notification_digests.labels('error').inc(failed)
+        logger.warning("Failed to send %d notification digests; they will be retried", failed)
+    return len(delivered)
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import aauthenticate, authenticate
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password, verify_password
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool already has its maximum amount of pending work."""
+
+
+class PasswordHashingPool:
+    """
+    Bounded pool for password hashing.
+
+    PBKDF2 releases the GIL inside OpenSSL, so a thread pool spreads hashing
+    over all cores while capping how much CPU login traffic can take. Work
+    beyond `max_pending` is rejected immediately instead of queueing, so a
+    login storm fails fast rather than starving every other endpoint.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password-hashing'
+                    )
+        return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Schedule `fn(*args)` on the pool.
+
+        :raises HashingPoolSaturated: If `max_pending` calls are already queued or running.
+        :return: A concurrent.futures.Future.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated("Too many concurrent password checks")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        """Run `fn(*args)` on the pool and block until it finishes."""
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """Run `fn(*args)` on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+def check_password_pooled(user, password):
+    """
+    Check `password` against `user`'s hash, doing the hashing on the bounded pool.
+
+    Only the CPU-bound hashing is offloaded; any rehash write happens on the
+    calling thread. A missing user still pays for one hash so response times
+    do not reveal which emails exist.
+
+    :param user: The User whose password is checked, or None.
+    :param password: The raw password.
+    :raises HashingPoolSaturated: If the pool is at capacity.
+    :return: True if `user` exists and the password matches.
+    """
+    encoded = user.password if user else UNUSABLE_PASSWORD_PREFIX
+    is_correct, must_update = password_hashing_pool.run(verify_password, password, encoded)
+    if user is None or not is_correct:
+        return False
+    if must_update:
+        # Transparent upgrade to the current hasher policy
+        user.password = password_hashing_pool.run(make_password, password)
+        user.save(update_fields=['password'])
+    return True
+
+
+async def acheck_password_pooled(user, password):
+    """Async counterpart of `check_password_pooled`."""
+    encoded = user.password if user else UNUSABLE_PASSWORD_PREFIX
+    is_correct, must_update = await password_hashing_pool.arun(verify_password, password, encoded)
+    if user is None or not is_correct:
+        return False
+    if must_update:
+        user.password = await password_hashing_pool.arun(make_password, password)
+        await user.asave(update_fields=['password'])
+    return True
+
+
+def authenticate_credentials(email, password, request=None):
+    """
+    Check an email/password pair through django.contrib.auth.authenticate,
+    so AUTHENTICATION_BACKENDS apply and failures send `user_login_failed`.
+    The default backend (backend.authentication.PooledModelBackend) hashes on
+    the bounded pool.
+
+    :param email: The user's email (used as username).
+    :param password: The raw password.
+    :param request: The login request, passed on to backends and signal receivers.
+    :raises HashingPoolSaturated: If the pool is at capacity.
+    :return: The authenticated User, or None.
+    """
+    return authenticate(request, username=email, password=password)
+
+
+async def aauthenticate_credentials(email, password, request=None):
+    """Async counterpart of `authenticate_credentials`."""
+    return await aauthenticate(request, username=email, password=password)
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', None),
+    max_pending=getattr(settings, 'PASSWORD_HASHING_MAX_PENDING', None),
+)
@@ -0,0 +1,233 @@
+import hashlib
+import hmac
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from backend.metrics import razorpay_call_duration, razorpay_calls, track
+
+
+class GatewayUnavailable(Exception):
+    """Raised when the payment gateway is failing or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated gateway failures.
+
+    After `failure_threshold` consecutive failures the breaker opens and calls
+    are rejected without touching the network. Once `reset_timeout` seconds
+    have passed a single trial call is let through; success closes the
+    breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this call through and push the window forward
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+
+def timeout_session(timeout):
+    """Return a requests.Session that applies a default timeout to every request."""
+    import requests
+
+    class TimeoutSession(requests.Session):
+        def request(self, method, url, **kwargs):
+            kwargs.setdefault('timeout', timeout)
+            return super().request(method, url, **kwargs)
+
+    return TimeoutSession()
+
+
+def verify_payment_signature(order_id, payment_id, signature, secret):
+    """Check the checkout signature (hex HMAC-SHA256 of "order_id|payment_id")."""
+    expected = hmac.new(secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or '')
+
+
+class RazorpayGateway:
+    """
+    Razorpay client wrapper with a pooled session, strict timeouts, a small
+    retry budget and a circuit breaker.
+
+    The SDK client is only built on first use, so importing this module does
+    not import razorpay or requests.
+    """
+
+    def __init__(self, key_id, key_secret, timeout=(3.05, 10), max_retries=2, pool_size=20,
+                 failure_threshold=5, reset_timeout=30):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _build_session(self):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = timeout_session(self.timeout)
+        # Retry only where it is safe: connection failures (nothing was sent)
+        # and idempotent reads. Order creation is never replayed after a response.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET'}),
+            backoff_factor=0.2,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import razorpay
+                    self._client = razorpay.Client(auth=(self.key_id, self.key_secret), session=self._build_session())
+        return self._client
+
+    def _call(self, operation, fn, *args, **kwargs):
+        import razorpay.errors
+        import requests
+        if not self.breaker.allow():
+            razorpay_calls.labels(operation, 'circuit_open').inc()
+            raise GatewayUnavailable("Payment gateway circuit is open")
+        try:
+            with track(razorpay_call_duration, razorpay_calls, operation):
+                result = fn(*args, **kwargs)
+        except (requests.RequestException, razorpay.errors.ServerError, razorpay.errors.GatewayError) as e:
+            self.breaker.record(False)
+            raise GatewayUnavailable(str(e)) from e
+        # Any answer from the gateway, including a 4xx, means it is healthy
+        self.breaker.record(True)
+        return result
+
+    def create_order(self, amount, currency, receipt):
+        """
+        Create an order.
+
+        :param amount: Amount in the smallest currency unit (paise).
+        :param currency: ISO currency code.
+        :param receipt: Merchant receipt reference.
+        :return: Order dict as returned by Razorpay.
+        """
+        data = {"amount": amount, "currency": currency, "receipt": receipt}
+        return self._call('create_order', self.client.order.create, data=data)
+
+    def fetch_order_payments(self, order_id):
+        """Return the list of payment dicts attempted against an order."""
+        return self._call('fetch_order_payments', self.client.order.payments, order_id).get('items', [])
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        return verify_payment_signature(order_id, payment_id, signature, self.key_secret)
+
+
+class StubPaymentGateway:
+    """
+    Offline stand-in for Razorpay, for local development, tests and benchmarks.
+
+    Orders are generated locally and `payments` lets callers pre-seed what
+    `fetch_order_payments` returns for an order.
+    """
+
+    def __init__(self, key_id='rzp_test_stub', key_secret='stub-secret', latency=0.0):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.latency = latency
+        self.payments = {}
+
+    def create_order(self, amount, currency, receipt):
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "id": f"order_{uuid.uuid4().hex[:14]}",
+            "entity": "order",
+            "amount": amount,
+            "currency": currency,
+            "receipt": receipt,
+            "status": "created",
+        }
+
+    def fetch_order_payments(self, order_id):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.payments.get(order_id, [])
+
+    def sign(self, order_id, payment_id):
+        """Produce the signature checkout would return for this pair."""
+        return hmac.new(self.key_secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        return verify_payment_signature(order_id, payment_id, signature, self.key_secret)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_payment_gateway():
+    """
+    Return the process-wide payment gateway, building it on first use.
+    settings.PAYMENT_GATEWAY selects 'razorpay' or 'stub'.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                if settings.PAYMENT_GATEWAY == 'stub':
+                    _gateway = StubPaymentGateway(
+                        key_id=settings.RAZORPAY_KEY_ID or 'rzp_test_stub',
+                        key_secret=settings.RAZORPAY_KEY_SECRET or 'stub-secret',
+                    )
+                else:
+                    _gateway = RazorpayGateway(
+                        settings.RAZORPAY_KEY_ID,
+                        settings.RAZORPAY_KEY_SECRET,
+                        timeout=(settings.RAZORPAY_CONNECT_TIMEOUT, settings.RAZORPAY_READ_TIMEOUT),
+                        max_retries=settings.RAZORPAY_MAX_RETRIES,
+                        pool_size=settings.RAZORPAY_POOL_SIZE,
+                        failure_threshold=settings.RAZORPAY_BREAKER_THRESHOLD,
+                        reset_timeout=settings.RAZORPAY_BREAKER_RESET_TIMEOUT,
+                    )
+    return _gateway
+
+
+def set_payment_gateway(gateway=None):
+    """
+    Replace the process-wide gateway, e.g. with a StubPaymentGateway in tests
+    or benchmarks. Passing None makes the next call rebuild it from settings.
+    """
+    global _gateway
+    _gateway = gateway
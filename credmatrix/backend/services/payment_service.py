@@ -0,0 +1,211 @@
+import hashlib
+import hmac
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.timezone import now
+
+from backend.models import Entity, Payment, PaymentEvent
+from backend.services.payment_gateway import GatewayUnavailable, get_payment_gateway
+
+CAPTURE_EVENTS = ('payment.captured', 'order.paid')
+FAILURE_EVENTS = ('payment.failed',)
+
+
+def verify_webhook_signature(body, signature, secret=None):
+    """
+    Check a Razorpay webhook signature (hex HMAC-SHA256 of the raw body).
+
+    :param body: Raw request body as bytes.
+    :param signature: Value of the X-Razorpay-Signature header.
+    :param secret: Webhook secret (optional, defaults to settings.RAZORPAY_WEBHOOK_SECRET).
+    :return: True if the signature matches.
+    """
+    secret = settings.RAZORPAY_WEBHOOK_SECRET if secret is None else secret
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def record_webhook_event(body, event_id=None):
+    """
+    Persist a verified webhook event and queue it for processing.
+
+    Razorpay retries deliveries, so events are stored once per event id. A
+    redelivery queues the event again while it is still unprocessed, which
+    recovers events whose first enqueue failed; processing is idempotent.
+
+    :param body: Raw, already verified request body.
+    :param event_id: Value of the X-Razorpay-Event-Id header (optional).
+    :return: Tuple of (PaymentEvent, created).
+    :raises ValueError: If the body is not a JSON object.
+    """
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Webhook payload must be a JSON object")
+    event_id = event_id or hashlib.sha256(body).hexdigest()
+
+    event, created = PaymentEvent.objects.get_or_create(
+        event_id=event_id,
+        defaults={'event_type': data.get('event', ''), 'payload': data},
+    )
+    if event.processed_at is None:
+        from backend.tasks import process_payment_event
+        transaction.on_commit(lambda: process_payment_event.delay(event_id))
+    return event, created
+
+
+def credits_for_amount(amount):
+    """Convert a payment amount in paise into entity credits."""
+    return amount // settings.PAISE_PER_CREDIT
+
+
+def complete_payment(order_id, payment_id):
+    """
+    Mark the payment for `order_id` as completed and credit the payer's entity.
+
+    Safe to call any number of times, from both the verify endpoint and the
+    webhook worker: the payment row is locked and credits are only granted on
+    the transition into 'completed'.
+
+    :param order_id: Razorpay order id.
+    :param payment_id: Razorpay payment id.
+    :return: The Payment, or None if no payment exists for the order.
+    """
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().select_related('user').filter(order_id=order_id).first()
+        if payment is None or payment.status == 'completed':
+            return payment
+
+        payment.payment_id = payment_id
+        payment.status = 'completed'
+        payment.save(update_fields=['payment_id', 'status'])
+
+        if payment.user.entity_id:
+            Entity.objects.filter(pk=payment.user.entity_id).update(
+                credits=F('credits') + credits_for_amount(payment.amount)
+            )
+    return payment
+
+
+def fail_payment(order_id, payment_id):
+    """Record a failed payment unless it already completed."""
+    return Payment.objects.filter(order_id=order_id).exclude(status='completed').update(
+        payment_id=payment_id, status='failed'
+    )
+
+
+def process_payment_event(event_id):
+    """
+    Apply a stored webhook event. Events already processed are skipped.
+
+    :param event_id: The PaymentEvent.event_id to process.
+    :return: True if the event was applied by this call.
+    """
+    with transaction.atomic():
+        event = PaymentEvent.objects.select_for_update().filter(event_id=event_id).first()
+        if event is None or event.processed_at is not None:
+            return False
+
+        entity = event.payload.get('payload', {}).get('payment', {}).get('entity', {})
+        order_id, payment_id = entity.get('order_id'), entity.get('id')
+
+        if order_id and event.event_type in CAPTURE_EVENTS:
+            complete_payment(order_id, payment_id)
+        elif order_id and event.event_type in FAILURE_EVENTS:
+            fail_payment(order_id, payment_id)
+
+        event.processed_at = now()
+        event.save(update_fields=['processed_at'])
+    return True
+
+
+def _gateway_outcome(gateway, order_id):
+    """
+    Ask the gateway what happened to an order.
+
+    :return: ('completed', payment_id), ('failed', payment_id) or None if still open.
+    """
+    try:
+        attempts = gateway.fetch_order_payments(order_id)
+    except GatewayUnavailable:
+        return None
+
+    for attempt in attempts:
+        if attempt.get('status') == 'captured':
+            return 'completed', attempt.get('id', '')
+    if attempts and all(attempt.get('status') == 'failed' for attempt in attempts):
+        return 'failed', attempts[-1].get('id', '')
+    return None
+
+
+def _apply_outcomes(outcomes):
+    """
+    Write gateway outcomes for one chunk in a single transaction.
+
+    Rows are re-read under lock and only still-pending ones are touched, so a
+    webhook or verify call that raced the job cannot be credited twice.
+    """
+    with transaction.atomic():
+        payments = list(
+            Payment.objects.select_for_update()
+            .filter(id__in=outcomes.keys(), status='pending')
+            .select_related('user')
+        )
+        credits_by_entity = defaultdict(int)
+        for payment in payments:
+            payment.status, payment.payment_id = outcomes[payment.id]
+            if payment.status == 'completed' and payment.user.entity_id:
+                credits_by_entity[payment.user.entity_id] += credits_for_amount(payment.amount)
+
+        Payment.objects.bulk_update(payments, ['status', 'payment_id'])
+        if credits_by_entity:
+            Entity.objects.filter(pk__in=credits_by_entity.keys()).update(
+                credits=F('credits') + Case(
+                    *[When(pk=pk, then=Value(amount)) for pk, amount in credits_by_entity.items()],
+                    output_field=IntegerField(),
+                )
+            )
+    return len(payments)
+
+
+def reconcile_pending_payments(chunk_size=500, max_workers=8, older_than=timedelta(minutes=30)):
+    """
+    Settle payments whose client never called verify, by asking the gateway.
+
+    Pending payments are paged by primary key, each chunk's orders are looked
+    up concurrently on a bounded thread pool, and results are written back
+    with one bulk update per chunk.
+
+    :param chunk_size: Payments per page.
+    :param max_workers: Concurrent gateway lookups.
+    :param older_than: Skip payments created more recently than this.
+    :return: Number of payments whose status changed.
+    """
+    gateway = get_payment_gateway()
+    cutoff = now() - older_than
+    last_id = 0
+    updated = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            chunk = list(
+                Payment.objects.filter(status='pending', id__gt=last_id, created_at__lt=cutoff)
+                .order_by('id')
+                .values_list('id', 'order_id')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+
+            results = executor.map(lambda row: _gateway_outcome(gateway, row[1]), chunk)
+            outcomes = {pk: outcome for (pk, _), outcome in zip(chunk, results) if outcome}
+            if outcomes:
+                updated += _apply_outcomes(outcomes)
+    return updated
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def get_required_credits(services):
+    """Total credits charged for a report covering `services` (priced by settings.SERVICE_CREDITS)."""
+    return sum(settings.SERVICE_CREDITS[service] for service in set(services))
@@ -0,0 +1,127 @@
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.timezone import now
+
+from backend.metrics import report_sla_escalations
+from backend.models import Activity, Report, ReportStatus
+from backend.services.notification_service import record_lifecycle_event
+from backend.services.usage_service import record_status_change
+
+logger = logging.getLogger(__name__)
+
+DRAFT = ReportStatus.DRAFT.name
+REQUEST_RAISED = ReportStatus.REQUEST_RAISED.name
+UNDER_ASSESMENT = ReportStatus.UNDER_ASSESMENT.name
+DOC_PENDING = ReportStatus.DOC_PENDING.name
+COMPLETED = ReportStatus.COMPLETED.name
+CANCELLED = ReportStatus.CANCELLED.name
+
+# Allowed status changes; COMPLETED and CANCELLED are final
+TRANSITIONS = {
+    DRAFT: {REQUEST_RAISED, CANCELLED},
+    REQUEST_RAISED: {UNDER_ASSESMENT, CANCELLED},
+    UNDER_ASSESMENT: {REQUEST_RAISED, DOC_PENDING, COMPLETED, CANCELLED},
+    DOC_PENDING: {UNDER_ASSESMENT, CANCELLED},
+    COMPLETED: set(),
+    CANCELLED: set(),
+}
+
+
+class InvalidTransition(Exception):
+    """The requested status change is not an allowed edge from the report's current status."""
+
+    def __init__(self, old_status, new_status, reason=None):
+        self.old_status = old_status
+        self.new_status = new_status
+        super().__init__(reason or f"Cannot move a report from {old_status} to {new_status}")
+
+
+def can_transition(old_status, new_status):
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def _json_state(state):
+    # Activity states are JSON; timestamps and the like become strings
+    return json.loads(json.dumps(state, cls=DjangoJSONEncoder))
+
+
+def transition(report, status, user, **fields):
+    """
+    Move `report` to `status` and record the change in its activity log.
+
+    The UPDATE only matches while the report still has the status the caller
+    read, so of two racing transitions at most one applies. Entering a
+    status resets `status_changed_at` (the SLA clock) and `escalated_at`,
+    statuses in NOTIFICATION_STATUSES are queued for digest emails, and
+    the change is recorded for the usage rollups.
+
+    :param report: The Report to change.
+    :param status: Target ReportStatus name.
+    :param user: User making the change (recorded in the activity log).
+    :param fields: Other Report columns to set in the same UPDATE.
+    :return: The updated Report.
+    :raises InvalidTransition: If the edge is not allowed or the status changed concurrently.
+    """
+    old_status = report.status
+    if not can_transition(old_status, status):
+        raise InvalidTransition(old_status, status)
+
+    changes = {"status": status, "status_changed_at": now(), "escalated_at": None, **fields}
+    with transaction.atomic():
+        if not Report.objects.filter(pk=report.pk, status=old_status).update(**changes):
+            raise InvalidTransition(old_status, status, "The report's status changed concurrently, please retry")
+        Activity.objects.create(
+            report=report,
+            user=user,
+            old_state=_json_state({"status": old_status, **{name: getattr(report, name) for name in fields}}),
+            new_state=_json_state({"status": status, **fields}),
+        )
+        record_lifecycle_event(report, status)
+        record_status_change([report], status)
+    for name, value in changes.items():
+        setattr(report, name, value)
+    return report
+
+
+def sla_cutoffs(at=None):
+    """Return {status: cutoff}; reports in `status` since before `cutoff` have breached their SLA."""
+    at = at or now()
+    return {status: at - timedelta(hours=hours) for status, hours in settings.REPORT_SLA_HOURS.items()}
+
+
+def escalate_sla_breaches(batch_size=500):
+    """
+    Flag reports that have stayed in a status longer than its SLA
+    (settings.REPORT_SLA_HOURS).
+
+    Per status, each batch is one range query over report_sla_idx (status,
+    status_changed_at, among reports not yet escalated) plus one UPDATE.
+    Escalated rows leave the index condition, so the next batch starts
+    where the last one ended without scanning anything twice.
+
+    :param batch_size: Reports flagged per UPDATE.
+    :return: Dict of {status: number of reports escalated}.
+    """
+    timestamp = now()
+    escalated = {}
+    for status, cutoff in sla_cutoffs(timestamp).items():
+        overdue = Report.objects.filter(status=status, escalated_at__isnull=True, status_changed_at__lt=cutoff)
+        count = 0
+        while True:
+            ids = list(overdue.order_by('status_changed_at', 'id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            # Re-applies the filter, so reports that moved on meanwhile are left alone
+            count += overdue.filter(id__in=ids).update(escalated_at=timestamp)
+            if len(ids) < batch_size:
+                break
+        if count:
+            report_sla_escalations.labels(status).inc(count)
+            logger.warning("Escalated %d reports that exceeded the %s SLA", count, status)
+        escalated[status] = count
+    return escalated
@@ -1,17 +1,34 @@
-import boto3
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError
+import threading
+
 from django.conf import settings
 
+from backend.metrics import s3_operation_duration, s3_operations, track
+
 class S3Service:
+    """
+    Presigned URLs and deletes for the documents bucket. boto3 is imported and
+    the client created on first use, so importing this module stays cheap.
+    """
+
     def __init__(self, is_test=False):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key= settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION,
-        )
+        self._client = None
+        self._lock = threading.Lock()
         self.bucket_name = settings.AWS_BUCKET_NAME if not is_test else settings.AWS_TEST_BUCKET_NAME
 
+    @property
+    def s3_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    self._client = boto3.client(
+                        's3',
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key= settings.AWS_SECRET_ACCESS_KEY,
+                        region_name=settings.AWS_REGION,
+                    )
+        return self._client
+
     def upload_file(self, file_key, expiration=3600):
         """
         Generate a presigned URL for uploading a file to S3.
@@ -20,12 +37,14 @@ class S3Service:
         :param expiration: Time in seconds for the presigned URL to remain valid.
         :return: Presigned URL for uploading the file.
         """
+        from botocore.exceptions import NoCredentialsError, PartialCredentialsError
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'put_object',
-                Params={'Bucket': self.bucket_name, 'Key': file_key},
-                ExpiresIn=expiration,
-            )
+            with track(s3_operation_duration, s3_operations, 'presign_upload'):
+                presigned_url = self.s3_client.generate_presigned_url(
+                    'put_object',
+                    Params={'Bucket': self.bucket_name, 'Key': file_key},
+                    ExpiresIn=expiration,
+                )
             return presigned_url
         except (NoCredentialsError, PartialCredentialsError) as e:
             raise Exception(f"Error generating presigned URL for upload: {str(e)}")
@@ -38,16 +57,31 @@ class S3Service:
         :param expiration: Time in seconds for the presigned URL to remain valid.
         :return: Presigned URL for downloading the file.
         """
+        from botocore.exceptions import NoCredentialsError, PartialCredentialsError
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': file_key},
-                ExpiresIn=expiration,
-            )
+            with track(s3_operation_duration, s3_operations, 'presign_download'):
+                presigned_url = self.s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': self.bucket_name, 'Key': file_key},
+                    ExpiresIn=expiration,
+                )
             return presigned_url
         except (NoCredentialsError, PartialCredentialsError) as e:
             raise Exception(f"Error generating presigned URL for download: {str(e)}")
         
+    def open_file(self, file_key):
+        """
+        Open a file in S3 for reading as a stream.
+
+        :param file_key: The key (path) of the file in the S3 bucket.
+        :return: A binary file-like object; the body is fetched as it is read.
+        """
+        try:
+            with track(s3_operation_duration, s3_operations, 'get'):
+                return self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)['Body']
+        except Exception as e:
+            raise Exception(f"Failed to read file from S3: {str(e)}")
+
     def delete_file(self, file_key):
         """
         Delete a file from S3.
@@ -56,7 +90,8 @@ class S3Service:
         :return: None
         """
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_key)
+            with track(s3_operation_duration, s3_operations, 'delete'):
+                self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_key)
         except Exception as e:
             raise Exception(f"Failed to delete file from S3: {str(e)}")
 
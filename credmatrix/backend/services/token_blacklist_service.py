@@ -0,0 +1,179 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.caching import is_shared_cache
+from backend.metrics import cache_lookups
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Answers "definitely absent" or "maybe present"; never gives false negatives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class TokenBlacklistIndex:
+    """
+    Two-level lookup of blacklisted refresh token JTIs.
+
+    Every blacklisting writes a marker into the shared cache, so other workers
+    see it immediately. Each process also keeps a Bloom filter built from the
+    database, refreshed every `refresh_interval` seconds, which lets lookups
+    for tokens that were never blacklisted skip the database entirely. Only
+    Bloom filter hits fall through to a database query.
+
+    A Bloom filter miss is only final when the cache is shared: with a
+    per-process cache (LocMemCache) another worker's blacklisting is not seen
+    until the next rebuild, so every lookup that misses the cache queries the
+    database instead.
+    """
+
+    CACHE_PREFIX = 'token_blacklist:'
+
+    def __init__(self, capacity=100000, error_rate=0.001, refresh_interval=300, shared_cache=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        # None: decided by the configured cache backend (see backend.caching)
+        self.shared_cache = shared_cache
+        self._bloom = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _cache_key(self, jti):
+        return f"{self.CACHE_PREFIX}{jti}"
+
+    def _cache_timeout(self, exp):
+        """Keep the marker until the token would have expired anyway."""
+        if exp is None:
+            return None
+        return max(int(exp - time.time()), 1)
+
+    def rebuild(self):
+        """Rebuild the local Bloom filter from unexpired blacklisted tokens."""
+        jtis = BlacklistedToken.objects.filter(
+            token__expires_at__gt=now()
+        ).values_list('token__jti', flat=True)
+
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in jtis.iterator(chunk_size=2000):
+            bloom.add(jti)
+
+        self._bloom = bloom
+        self._built_at = time.monotonic()
+
+    def _get_bloom(self):
+        if self._bloom is None or time.monotonic() - self._built_at > self.refresh_interval:
+            with self._lock:
+                if self._bloom is None or time.monotonic() - self._built_at > self.refresh_interval:
+                    self.rebuild()
+        return self._bloom
+
+    def add(self, jti, exp=None):
+        """Record a newly blacklisted JTI locally and in the shared cache."""
+        self._get_bloom().add(jti)
+        cache.set(self._cache_key(jti), True, timeout=self._cache_timeout(exp))
+
+    def _is_shared(self):
+        return is_shared_cache() if self.shared_cache is None else self.shared_cache
+
+    def contains(self, jti, exp=None):
+        """
+        Check whether a JTI is blacklisted.
+
+        :param jti: The JTI claim of the refresh token.
+        :param exp: The token's expiry claim, bounding how long a hit is cached.
+        :return: True if the token has been blacklisted.
+        """
+        if cache.get(self._cache_key(jti)):
+            cache_lookups.labels('token_blacklist', 'hit').inc()
+            return True
+        cache_lookups.labels('token_blacklist', 'miss').inc()
+
+        if jti not in self._get_bloom() and self._is_shared():
+            return False
+
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if blacklisted:
+            cache.set(self._cache_key(jti), True, timeout=self._cache_timeout(exp))
+        return blacklisted
+
+    def reset(self):
+        self._bloom = None
+        self._built_at = 0.0
+
+
+class IndexedRefreshToken(RefreshToken):
+    """
+    Refresh token that checks and updates the blacklist through
+    `token_blacklist_index` instead of querying the database on every check.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if token_blacklist_index.contains(jti, self.payload.get('exp')):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        token_blacklist_index.add(self.payload[api_settings.JTI_CLAIM], self.payload.get('exp'))
+        return result
+
+
+def prune_expired_tokens(chunk_size=1000):
+    """
+    Delete expired outstanding tokens and their blacklist entries in chunks.
+
+    Each chunk is its own short statement, so the tables stay bounded without
+    holding long locks.
+
+    :param chunk_size: Number of outstanding tokens deleted per round trip.
+    :return: Number of outstanding tokens deleted.
+    """
+    deleted = 0
+    cutoff = now()
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+    return deleted
+
+
+token_blacklist_index = TokenBlacklistIndex(**getattr(settings, 'TOKEN_BLACKLIST_INDEX', {}))
@@ -0,0 +1,225 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import get_current_timezone, localdate, make_aware
+
+from backend.metrics import usage_events_rolled_up
+from backend.models import (
+    Activity,
+    EntityDailyServiceUsage,
+    EntityDailyStatusUsage,
+    EntityDailyUsage,
+    Report,
+    ReportService,
+    ReportStatus,
+    Transaction,
+    UsageEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+# Reports are created in the work queue (InitiateRequestView); rebuilds count their creation as entering it
+CREATED_STATUS = ReportStatus.REQUEST_RAISED.name
+
+# Rollup tables with the columns that identify a row
+ROLLUPS = (
+    (EntityDailyUsage, ('entity_id', 'date')),
+    (EntityDailyServiceUsage, ('entity_id', 'date', 'service')),
+    (EntityDailyStatusUsage, ('entity_id', 'date', 'status')),
+)
+
+
+def record_reports_created(reports):
+    """Note new reports for the rollups: one INSERT inside the caller's transaction."""
+    UsageEvent.objects.bulk_create([
+        UsageEvent(report=report, status=report.status, created=True, credits=report.credits,
+                   services=list(report.services))
+        for report in reports
+    ])
+
+
+def record_status_change(reports, status):
+    """Note that `reports` entered `status`: one INSERT inside the caller's transaction."""
+    UsageEvent.objects.bulk_create([UsageEvent(report=report, status=status) for report in reports])
+
+
+def _increment(model, key_fields, deltas):
+    """
+    Add `deltas` ({key: {column: amount}}) to the rollup rows of `model`,
+    creating missing rows first. Rows are touched in key order so
+    concurrent roll-ups cannot deadlock.
+    """
+    keys = sorted(deltas)
+    model.objects.bulk_create([model(**dict(zip(key_fields, key))) for key in keys], ignore_conflicts=True)
+    for key in keys:
+        model.objects.filter(**dict(zip(key_fields, key))).update(
+            **{column: F(column) + amount for column, amount in deltas[key].items()}
+        )
+
+
+def roll_up_usage(batch_size=1000):
+    """
+    Fold recorded usage events into the daily rollups.
+
+    Each batch locks its events with SKIP LOCKED, so concurrent workers
+    split the backlog, adds them up per entity and day, and applies one
+    UPDATE per rollup row touched before deleting the events, all in one
+    transaction. Events of users without an entity are dropped. Reports
+    count under the services they were created with, even if edited since.
+
+    :param batch_size: Events handled per transaction.
+    :return: Number of events rolled up.
+    """
+    rolled_up = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                UsageEvent.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('report__user').order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+
+            deltas = {model: defaultdict(Counter) for model, _ in ROLLUPS}
+            for event in events:
+                entity_id = event.report.user.entity_id
+                if entity_id is None:
+                    continue
+                date = localdate(event.created_at)
+                if event.created:
+                    deltas[EntityDailyUsage][entity_id, date].update(reports_created=1, credits_spent=event.credits)
+                    for service in dict.fromkeys(event.services):
+                        deltas[EntityDailyServiceUsage][entity_id, date, service]['reports'] += 1
+                deltas[EntityDailyStatusUsage][entity_id, date, event.status]['reports'] += 1
+
+            for model, key_fields in ROLLUPS:
+                _increment(model, key_fields, deltas[model])
+            UsageEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        rolled_up += len(events)
+        usage_events_rolled_up.inc(len(events))
+        if len(events) < batch_size:
+            break
+    return rolled_up
+
+
+def _day_start(date):
+    return make_aware(datetime.combine(date, time.min), get_current_timezone())
+
+
+def rebuild_usage(since, until):
+    """
+    Recompute the rollups of the days `since` to `until` (inclusive) from
+    reports, transactions and activity logs, replacing what is stored.
+    Pending usage events of those days are discarded, as the recomputation
+    covers them. Reports whose services were edited count under the
+    services of their first edit's old state, i.e. the ones they were
+    created with, as in `roll_up_usage`. Archived and deleted reports are
+    no longer counted, so days before the archive horizon come out low.
+
+    :param since: First date to rebuild.
+    :param until: Last date to rebuild.
+    :return: Number of rollup rows written.
+    """
+    start, end = _day_start(since), _day_start(until + timedelta(days=1))
+    deltas = {model: defaultdict(Counter) for model, _ in ROLLUPS}
+
+    created = (
+        Report.objects.filter(created_at__gte=start, created_at__lt=end, user__entity__isnull=False)
+        .annotate(date=TruncDate('created_at')).values('user__entity_id', 'date')
+    )
+    for row in created.annotate(reports=Count('id')):
+        deltas[EntityDailyUsage][row['user__entity_id'], row['date']]['reports_created'] += row['reports']
+        deltas[EntityDailyStatusUsage][row['user__entity_id'], row['date'], CREATED_STATUS]['reports'] += row['reports']
+
+    spent = (
+        Transaction.objects.filter(created_at__gte=start, created_at__lt=end, user__entity__isnull=False)
+        .annotate(date=TruncDate('created_at')).values('user__entity_id', 'date').annotate(credits=Sum('credits'))
+    )
+    for row in spent:
+        deltas[EntityDailyUsage][row['user__entity_id'], row['date']]['credits_spent'] += row['credits']
+
+    services = (
+        ReportService.objects.filter(report__created_at__gte=start, report__created_at__lt=end,
+                                     report__user__entity__isnull=False)
+        .annotate(date=TruncDate('report__created_at'))
+        .values('report__user__entity_id', 'date', 'service').annotate(reports=Count('id'))
+    )
+    for row in services:
+        deltas[EntityDailyServiceUsage][row['report__user__entity_id'], row['date'], row['service']]['reports'] += (
+            row['reports']
+        )
+
+    # Move edited reports back to the services they were created with
+    original = {}
+    for report_id, old_state in Activity.objects.filter(
+        report__created_at__gte=start, report__created_at__lt=end, report__user__entity__isnull=False,
+        old_state__has_key='services',
+    ).order_by('timestamp', 'id').values_list('report_id', 'old_state'):
+        original.setdefault(report_id, old_state['services'])
+    for report_id, entity_id, created_at, current in Report.objects.filter(id__in=list(original)).values_list(
+        'id', 'user__entity_id', 'created_at', 'services'
+    ):
+        date = localdate(created_at)
+        for service in dict.fromkeys(current):
+            deltas[EntityDailyServiceUsage][entity_id, date, service]['reports'] -= 1
+        for service in dict.fromkeys(original[report_id]):
+            deltas[EntityDailyServiceUsage][entity_id, date, service]['reports'] += 1
+
+    # Status changes are the activities whose status differs from the one before
+    changes = Activity.objects.filter(
+        timestamp__gte=start, timestamp__lt=end, report__user__entity__isnull=False,
+    ).values_list('timestamp', 'report__user__entity_id', 'old_state', 'new_state')
+    for timestamp, entity_id, old_state, new_state in changes.iterator(chunk_size=2000):
+        status = new_state.get('status') if isinstance(new_state, dict) else None
+        if status and status != (old_state.get('status') if isinstance(old_state, dict) else None):
+            deltas[EntityDailyStatusUsage][entity_id, localdate(timestamp), status]['reports'] += 1
+
+    written = 0
+    with transaction.atomic():
+        UsageEvent.objects.filter(created_at__gte=start, created_at__lt=end).delete()
+        for model, key_fields in ROLLUPS:
+            model.objects.filter(date__gte=since, date__lte=until).delete()
+            rows = [
+                model(**dict(zip(key_fields, key)), **columns)
+                for key, columns in deltas[model].items() if any(columns.values())
+            ]
+            model.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+    logger.info("Rebuilt %d usage rollup rows for %s to %s", written, since, until)
+    return written
+
+
+def usage_between(entity_id, since, until):
+    """
+    An entity's usage from `since` to `until` (inclusive), read from the
+    rollups with one range query per table.
+
+    :return: Dict with the period's `totals` and the `days` that had any usage, oldest first.
+    """
+    days = defaultdict(lambda: {"reports_created": 0, "credits_spent": 0, "statuses": {}, "services": {}})
+    dates = {"entity_id": entity_id, "date__gte": since, "date__lte": until}
+    for date, reports_created, credits_spent in EntityDailyUsage.objects.filter(**dates).values_list(
+        'date', 'reports_created', 'credits_spent'
+    ):
+        days[date].update(reports_created=reports_created, credits_spent=credits_spent)
+    for date, status, reports in EntityDailyStatusUsage.objects.filter(**dates).values_list('date', 'status', 'reports'):
+        days[date]["statuses"][status] = reports
+    for date, service, reports in EntityDailyServiceUsage.objects.filter(**dates).values_list(
+        'date', 'service', 'reports'
+    ):
+        days[date]["services"][service] = reports
+
+    totals = {"reports_created": 0, "credits_spent": 0, "statuses": Counter(), "services": Counter()}
+    for day in days.values():
+        totals["reports_created"] += day["reports_created"]
+        totals["credits_spent"] += day["credits_spent"]
+        totals["statuses"].update(day["statuses"])
+        totals["services"].update(day["services"])
+    return {
+        "totals": {**totals, "statuses": dict(totals["statuses"]), "services": dict(totals["services"])},
+        "days": [{"date": date, **days[date]} for date in sorted(days)],
+    }
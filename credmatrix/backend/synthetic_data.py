@@ -0,0 +1,137 @@
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from backend.models import (
+    Activity,
+    Document,
+    Entity,
+    EntityType,
+    Payment,
+    Report,
+    ReportService,
+    ReportStatus,
+    ServiceType,
+    User,
+)
+
+DEFAULT_PASSWORD = 'benchmark-password'
+
+
+def generate_dataset(entities, users_per_entity=5, reports_per_user=10, documents_per_report=3,
+                     activities_per_report=2, payments_per_user=2, batch_size=2000, seed=None,
+                     password=DEFAULT_PASSWORD, progress=None):
+    """
+    Bulk-insert a synthetic dataset.
+
+    Rows are generated and inserted a slice of entities at a time, so memory
+    stays bounded however large the dataset is. Every user shares one
+    password hash, so hashing cost does not grow with the user count.
+
+    :param entities: Number of entities to create.
+    :param batch_size: Target number of reports per slice and bulk_create batch size.
+    :param seed: Optional random seed for reproducible data.
+    :param password: Raw password given to every generated user.
+    :param progress: Optional callable receiving the running totals after each slice.
+    :return: Dict of row counts per model, plus the generated users' email prefix.
+    """
+    rng = random.Random(seed)
+    password_hash = make_password(password)
+    run = uuid.uuid4().hex[:8]
+    statuses = [status.name for status in ReportStatus]
+    services = [service.name for service in ServiceType]
+    entity_types = [etype.name for etype in EntityType]
+    totals = dict.fromkeys(['entities', 'users', 'reports', 'documents', 'activities', 'payments'], 0)
+
+    reports_per_entity = max(users_per_entity * reports_per_user, 1)
+    entities_per_slice = max(batch_size // reports_per_entity, 1)
+
+    for start in range(0, entities, entities_per_slice):
+        count = min(entities_per_slice, entities - start)
+        with transaction.atomic():
+            entity_rows = Entity.objects.bulk_create(
+                [
+                    Entity(name=f"Entity {run}-{start + i}", entity_type=rng.choice(entity_types), credits=1000)
+                    for i in range(count)
+                ],
+                batch_size=batch_size,
+            )
+
+            user_rows = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{run}-{entity.id}-{u}@example.com",
+                        email=f"{run}-{entity.id}-{u}@example.com",
+                        name=f"User {u}",
+                        entity=entity,
+                        password=password_hash,
+                    )
+                    for entity in entity_rows
+                    for u in range(users_per_entity)
+                ],
+                batch_size=batch_size,
+            )
+
+            report_rows = Report.objects.bulk_create(
+                [
+                    Report(
+                        user=user,
+                        # Freshly raised reports are still waiting in the agent work queue
+                        agent=None if status == ReportStatus.REQUEST_RAISED.name else user,
+                        status=status,
+                        services=rng.sample(services, rng.randint(1, len(services))),
+                        target_entity_name=f"Target {user.id}-{r}",
+                        target_entity_pan=f"PAN{user.id:07d}{r:03d}"[-10:],
+                        credits=rng.randint(1, 20),
+                    )
+                    for user in user_rows
+                    for r, status in enumerate(rng.choice(statuses) for _ in range(reports_per_user))
+                ],
+                batch_size=batch_size,
+            )
+            # bulk_create skips Report.save(), which normally writes these
+            ReportService.sync(report_rows, replace=False)
+
+            Document.objects.bulk_create(
+                [
+                    Document(report=report, user=report.user, s3_path=f"{report.user.id}/{report.id}/doc{d}.pdf")
+                    for report in report_rows
+                    for d in range(documents_per_report)
+                ],
+                batch_size=batch_size,
+            )
+
+            Activity.objects.bulk_create(
+                [
+                    Activity(report=report, user=report.user, old_state={"status": "DRAFT"},
+                             new_state={"status": report.status})
+                    for report in report_rows
+                    for _ in range(activities_per_report)
+                ],
+                batch_size=batch_size,
+            )
+
+            Payment.objects.bulk_create(
+                [
+                    Payment(user=user, amount=rng.choice([50000, 100000, 250000]),
+                            order_id=f"order_{run}_{user.id}_{p}", payment_id=f"pay_{run}_{user.id}_{p}",
+                            status=rng.choice(['pending', 'completed', 'completed', 'failed']))
+                    for user in user_rows
+                    for p in range(payments_per_user)
+                ],
+                batch_size=batch_size,
+            )
+
+        totals['entities'] += len(entity_rows)
+        totals['users'] += len(user_rows)
+        totals['reports'] += len(report_rows)
+        totals['documents'] += len(report_rows) * documents_per_report
+        totals['activities'] += len(report_rows) * activities_per_report
+        totals['payments'] += len(user_rows) * payments_per_user
+        if progress:
+            progress(totals)
+
+    totals['run'] = run
+    return totals
@@ -0,0 +1,99 @@
+from celery import shared_task
+from celery.signals import task_postrun
+from django.conf import settings
+
+from backend import metrics
+from credmatrix.celery import app  # noqa: F401  (configures Celery before tasks are queued)
+from backend.services import (
+    archive_service,
+    assignment_service,
+    import_service,
+    notification_service,
+    payment_service,
+    report_status_service,
+    token_blacklist_service,
+    usage_service,
+)
+
+
+@task_postrun.connect
+def flush_metrics(**kwargs):
+    # Workers have no /metrics endpoint of their own; publish for the web processes to merge
+    metrics.default_registry.maybe_flush()
+
+
+@shared_task
+def prune_expired_tokens():
+    """Delete expired outstanding and blacklisted JWTs in bounded chunks."""
+    return token_blacklist_service.prune_expired_tokens(chunk_size=settings.TOKEN_PRUNE_CHUNK_SIZE)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=30)
+def process_payment_event(self, event_id):
+    """Apply a stored Razorpay webhook event; safe to retry."""
+    try:
+        return payment_service.process_payment_event(event_id)
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def import_reports(self, import_id):
+    """Import an uploaded spreadsheet of report requests; retries resume after the last committed chunk."""
+    try:
+        return import_service.run_import(
+            import_id,
+            chunk_size=settings.REPORT_IMPORT_CHUNK_SIZE,
+            max_errors=settings.REPORT_IMPORT_MAX_ERRORS,
+        ).status
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            import_service.fail_import(import_id, "The import stopped after repeated errors, please contact support")
+            raise
+        raise self.retry(exc=exc)
+
+
+@shared_task
+def reconcile_payments():
+    """Settle pending payments against the gateway."""
+    return payment_service.reconcile_pending_payments(
+        chunk_size=settings.PAYMENT_RECONCILE_CHUNK_SIZE,
+        max_workers=settings.PAYMENT_RECONCILE_WORKERS,
+    )
+
+
+@shared_task
+def assign_queued_reports():
+    """Hand queued reports to the least-loaded eligible agents."""
+    return assignment_service.assign_queued_reports(limit=settings.REPORT_ASSIGN_BATCH_SIZE)
+
+
+@shared_task
+def escalate_sla_breaches():
+    """Flag reports that overstayed their status SLA."""
+    return report_status_service.escalate_sla_breaches(batch_size=settings.REPORT_SLA_BATCH_SIZE)
+
+
+@shared_task
+def send_notification_digests():
+    """Fan report lifecycle events out to recipients and email the digests that are due."""
+    notification_service.fan_out_lifecycle_events(batch_size=settings.NOTIFICATION_FAN_OUT_BATCH_SIZE)
+    return notification_service.send_notification_digests(
+        batch_size=settings.NOTIFICATION_DIGEST_BATCH_SIZE,
+        max_workers=settings.NOTIFICATION_SMTP_CONNECTIONS,
+    )
+
+
+@shared_task
+def archive_reports():
+    """Move old final reports out of the hot tables."""
+    return archive_service.archive_reports(
+        older_than_days=settings.REPORT_ARCHIVE_AFTER_DAYS,
+        batch_size=settings.REPORT_ARCHIVE_BATCH_SIZE,
+    )
+
+
+@shared_task
+def roll_up_usage():
+    """Fold recorded report creations and status changes into the daily usage rollups."""
+    return usage_service.roll_up_usage(batch_size=settings.USAGE_ROLLUP_BATCH_SIZE)
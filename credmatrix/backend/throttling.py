@@ -0,0 +1,99 @@
+import math
+import time
+
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class CacheWindowCounterBackend:
+    """
+    Fixed-window request counters stored in a Django cache.
+
+    Each window is a single integer entry taken with `cache.add` + `cache.incr`,
+    so concurrent requests never read-modify-write the same state and at most
+    `capacity` of them are allowed per window. `incr` is atomic on Redis,
+    Memcached and LocMemCache (used in tests); the database and file caches
+    emulate it with a get/set and must not be used here. A request costs two
+    cache round trips regardless of traffic.
+
+    The cache must be shared by all workers: with a per-process cache
+    (LocMemCache) every worker keeps its own counters and the effective limit
+    is the rate times the number of workers (see backend.caching).
+    """
+
+    def __init__(self, cache_alias='default'):
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def consume(self, key, capacity, window, now=None):
+        """
+        Count one request against the current window of the counter at `key`.
+
+        :param key: Cache key prefix identifying the counter.
+        :param capacity: Requests allowed per window.
+        :param window: Window length in seconds.
+        :param now: Current unix time; defaults to time.time().
+        :return: Tuple of (allowed, seconds until the next window).
+        """
+        now = time.time() if now is None else now
+        index = int(now // window)
+        retry_after = (index + 1) * window - now
+        window_key = f"{key}:{index}"
+
+        # The entry outlives its window so it cannot expire between the add and the incr
+        self.cache.add(window_key, 0, timeout=math.ceil(window) + 1)
+        try:
+            taken = self.cache.incr(window_key)
+        except ValueError:
+            # Evicted under memory pressure: deny rather than hand out a fresh window
+            return False, retry_after
+
+        if taken <= capacity:
+            return True, 0.0
+        return False, retry_after
+
+
+class FixedWindowThrottle(BaseThrottle):
+    """
+    Fixed-window throttle keyed on the view's `throttle_scope`.
+
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] using DRF's
+    "<requests>/<period>" format; the request count is also the burst size.
+    Authenticated requests are counted per user, anonymous ones per client IP.
+    """
+
+    backend = CacheWindowCounterBackend()
+    durations = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def __init__(self):
+        self.wait_time = None
+
+    def parse_rate(self, rate):
+        num, period = rate.split('/')
+        return int(num), self.durations[period[0]]
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return f"throttle_window:{scope}:{ident}"
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+
+        capacity, window = self.parse_rate(rate)
+        allowed, self.wait_time = self.backend.consume(
+            self.get_cache_key(request, scope), capacity, window
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_time
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views.auth_views import signup_view, login_view, logout_view, send_otp_view
+from .views.auth_views import signup_view, login_view, async_login_view, logout_view, send_otp_view
 from .views.user_views import (
     GetReportsView,
     EditReportView,
@@ -7,17 +7,40 @@ from .views.user_views import (
     InitiateRequestView,
     UploadDocumentView,
     ConfirmDocumentUploadView,
+    NotificationPreferenceView,
+    async_reports_view,
+    async_report_detail_view,
+    async_report_activities_view,
+    async_report_documents_view,
+    report_events_view,
 )
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from .views.payment_views import CreateOrderView, VerifyPaymentView, RazorpayWebhookView
+from .views.admin_views import ClaimReportsView, ReleaseReportView
+from .views.analytics_views import UsageAnalyticsView
+from .views.import_views import CreateReportImportView, ReportImportStatusView, StartReportImportView
+from rest_framework_simplejwt.views import TokenRefreshView
+from .views import lazy_view
+
+# Schema views are static pages; they should never touch the database. They are
+# imported on first use so workers do not load drf_spectacular's views and PyYAML at boot.
+schema_view = lazy_view('backend.schema.PrecomputedSchemaView', query_budget=0)
+swagger_view = lazy_view('drf_spectacular.views.SpectacularSwaggerView', query_budget=0, url_name='schema')
+
+# Rotation blacklists the old token and stores the new one (simplejwt get_or_create calls), plus the
+# blacklist lookup that a per-process cache sends to the database
+token_refresh_view = TokenRefreshView.as_view()
+token_refresh_view.query_budget = 13
 
 urlpatterns = [
     path('signup/', signup_view.as_view(), name='signup'),
     path('login/', login_view.as_view(), name='login'),
+    path('login/async/', async_login_view, name='login-async'),
     path('logout/', logout_view.as_view(), name='logout'),
     path('send_otp/', send_otp_view.as_view(), name='otp'),
+    path('token/refresh/', token_refresh_view, name='token-refresh'),
     
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('schema/', schema_view, name='schema'),
+    path('docs/', swagger_view, name='swagger-ui'),
 
 ]
 
@@ -29,7 +52,33 @@ urlpatterns += [
     path('reports/<int:report_id>/edit/', EditReportView.as_view(), name='edit-report'),
     path('reports/<int:report_id>/delete/', DeleteReportView.as_view(), name='delete-report'),
     path('reports/initiate/', InitiateRequestView.as_view(), name='initiate-request'),
+    path('reports/imports/', CreateReportImportView.as_view(), name='create-report-import'),
+    path('reports/imports/<int:import_id>/', ReportImportStatusView.as_view(), name='report-import-status'),
+    path('reports/imports/<int:import_id>/start/', StartReportImportView.as_view(), name='start-report-import'),
+
+    # Native async read endpoints for ASGI deployments
+    path('async/reports/', async_reports_view, name='reports-async'),
+    path('async/reports/<int:report_id>/', async_report_detail_view, name='report-detail-async'),
+    path('async/reports/<int:report_id>/activities/', async_report_activities_view, name='report-activities-async'),
+    path('async/reports/<int:report_id>/documents/', async_report_documents_view, name='report-documents-async'),
+    path('async/reports/events/', report_events_view, name='report-events'),
 
     path('documents/upload/', UploadDocumentView.as_view(), name='upload-document'),
     path('documents/confirm/', ConfirmDocumentUploadView.as_view(), name='confirm-document-upload'),
-]
\ No newline at end of file
+
+    path('notifications/preferences/', NotificationPreferenceView.as_view(), name='notification-preferences'),
+
+    path('analytics/usage/', UsageAnalyticsView.as_view(), name='usage-analytics'),
+]
+
+urlpatterns += [
+    path('payments/order/', CreateOrderView.as_view(), name='create-order'),
+    path('payments/verify/', VerifyPaymentView.as_view(), name='verify-payment'),
+    path('payments/webhook/', RazorpayWebhookView.as_view(), name='razorpay-webhook'),
+]
+
+# Agent work queue (admins only)
+urlpatterns += [
+    path('queue/claim/', ClaimReportsView.as_view(), name='claim-reports'),
+    path('queue/<int:report_id>/release/', ReleaseReportView.as_view(), name='release-report'),
+]
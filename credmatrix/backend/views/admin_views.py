@@ -1,8 +1,100 @@
 from rest_framework.permissions import BasePermission
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
+from django.db.models import prefetch_related_objects
+from backend.serializers import ClaimReportsSerializer, ReportSerializer
+from backend.services.assignment_service import AssignmentError, claim_reports, release_report
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.is_admin
+        return request.user.is_authenticated and request.user.is_admin()
 
 
+class ClaimReportsView(APIView):
+    permission_classes = [IsAdmin]
+    # User, admin group check, savepoint pair, queue lock, assign, activity log, usage events, documents,
+    # change events (a NOTIFY with the postgres event broker)
+    query_budget = 10
 
+    @extend_schema(
+        summary="Claim Reports",
+        description="Assigns the oldest queued reports (optionally only those including `service`) to the authenticated agent and moves them to UNDER_ASSESMENT. Reports locked by concurrent claims are skipped, so each report is handed out once.",
+        request=ClaimReportsSerializer,
+        responses={
+            200: {
+                "description": "Reports claimed (the list is empty when the queue is)",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "reports": [
+                                {
+                                    "id": 1,
+                                    "status": "UNDER_ASSESMENT",
+                                    "services": ["BUREAU_REPORT"],
+                                    "created_at": "2025-07-01T10:00:00Z",
+                                    "target_entity_name": "CredMatrix Inc.",
+                                    "target_entity_pan": "ABCD123456",
+                                    "credits": 10,
+                                    "pending_documents": [],
+                                    "cancellation_reason": None,
+                                    "documents": []
+                                }
+                            ]
+                        }
+                    }
+                },
+            },
+            400: {"description": "Invalid data provided"},
+            403: {"description": "User is not an admin"},
+        },
+    )
+    def post(self, request):
+        serializer = ClaimReportsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=400)
+
+        claimed = claim_reports(
+            request.user,
+            service=serializer.validated_data.get("service"),
+            limit=serializer.validated_data["limit"],
+        )
+        prefetch_related_objects(claimed, 'documents')
+        return Response({"reports": ReportSerializer(claimed, many=True).data}, status=200)
+
+
+class ReleaseReportView(APIView):
+    permission_classes = [IsAdmin]
+    # User, admin group check, report, savepoint pair, conditional update, activity log, usage event,
+    # change event
+    query_budget = 9
+
+    @extend_schema(
+        summary="Release Report",
+        description="Unassigns a report that is under assessment and puts it back in the queue as REQUEST_RAISED.",
+        request=None,
+        responses={
+            200: {
+                "description": "Report released",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "message": "Report released",
+                            "report": {"id": 1, "status": "REQUEST_RAISED"}
+                        }
+                    }
+                },
+            },
+            403: {"description": "User is not an admin"},
+            404: {"description": "Report not found"},
+            409: {"description": "Report is not assigned"},
+        },
+    )
+    def post(self, request, report_id):
+        try:
+            report = release_report(report_id, request.user)
+        except AssignmentError as e:
+            return Response({"error": str(e)}, status=409)
+        if report is None:
+            return Response({"error": "Report not found"}, status=404)
+        return Response({"message": "Report released", "report": {"id": report.id, "status": report.status}}, status=200)
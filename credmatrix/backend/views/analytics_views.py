@@ -0,0 +1,67 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from backend.db_router import ReplicaReadMixin
+from backend.serializers import UsageQuerySerializer
+from backend.services.usage_service import usage_between
+
+
+class UsageAnalyticsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    # User, then one range read per rollup table
+    query_budget = 4
+
+    @extend_schema(
+        summary="Entity Usage",
+        description="Reports created, credits spent, status changes and service mix of the authenticated user's "
+                    "entity per day, read from rollups that trail the write path by about a minute.",
+        parameters=[UsageQuerySerializer],
+        responses={
+            200: {
+                "description": "Usage fetched successfully",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "start": "2025-07-01",
+                            "end": "2025-07-30",
+                            "totals": {
+                                "reports_created": 3,
+                                "credits_spent": 35,
+                                "statuses": {"REQUEST_RAISED": 3, "UNDER_ASSESMENT": 2, "COMPLETED": 1},
+                                "services": {"BUREAU_REPORT": 2, "FINANCIAL_INFO": 2},
+                            },
+                            "days": [
+                                {
+                                    "date": "2025-07-01",
+                                    "reports_created": 3,
+                                    "credits_spent": 35,
+                                    "statuses": {"REQUEST_RAISED": 3, "UNDER_ASSESMENT": 2},
+                                    "services": {"BUREAU_REPORT": 2, "FINANCIAL_INFO": 2},
+                                },
+                                {
+                                    "date": "2025-07-03",
+                                    "reports_created": 0,
+                                    "credits_spent": 0,
+                                    "statuses": {"COMPLETED": 1},
+                                    "services": {},
+                                },
+                            ],
+                        }
+                    }
+                },
+            },
+            400: {"description": "User does not belong to any entity, or an invalid date range"},
+            401: {"description": "Authentication credentials were not provided"},
+        },
+    )
+    def get(self, request):
+        entity_id = request.user.entity_id
+        if not entity_id:
+            return Response({"error": "User does not belong to any entity"}, status=400)
+
+        serializer = UsageQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=400)
+        start, end = serializer.validated_data["start"], serializer.validated_data["end"]
+        return Response({"start": start, "end": end, **usage_between(entity_id, start, end)}, status=200)
@@ -1,13 +1,40 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
 from django.contrib.auth.models import Group
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import extend_schema, OpenApiExample
 from ..models import User, Entity, EntityType, OTP
 from backend.services.email_service import send_email
+from backend.services.token_blacklist_service import IndexedRefreshToken
+from backend.throttling import FixedWindowThrottle
+from backend.services.password_service import (
+    HashingPoolSaturated,
+    authenticate_credentials,
+    aauthenticate_credentials,
+)
+import json
+import math
 import random
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_group_id(name):
+    """
+    Return the id of the named group, creating it on first use.
+    The id is cached for the lifetime of the process.
+    """
+    group, _ = Group.objects.get_or_create(name=name)
+    return group.id
+
+
+class EmailTaken(Exception):
+    """A signup collided with an existing user's username or email."""
 
 
 class signup_view(APIView):
@@ -16,6 +43,8 @@ class signup_view(APIView):
     ---
     Allows users to sign up by providing email, password, name, entity_name, entity_type, and OTP.
     """
+    query_budget = 7
+
     @extend_schema(
         request={
             "application/json": {
@@ -50,32 +79,44 @@ class signup_view(APIView):
             return Response({"error": "Invalid entity type"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Validate OTP
-        try:
-            otp_record = OTP.objects.get(email=email)
-            if otp_record.otp != otp:
-                return Response({"error": "Incorrect OTP"}, status=status.HTTP_400_BAD_REQUEST)
-        except OTP.DoesNotExist:
+        otp_record = OTP.objects.filter(email=email).first()
+        if otp_record is None:
             return Response({"error": "OTP not found for this email"}, status=status.HTTP_400_BAD_REQUEST)
+        if otp_record.otp != otp:
+            return Response({"error": "Incorrect OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create entity
-        entity = Entity.objects.create(name=entity_name, entity_type=entity_type)
-
-        # Create user
-        user = User.objects.create(
-            email=email,
-            username=email,
-            name=name,
-            entity=entity
-        )
+        # Hash outside the transaction so no locks are held during PBKDF2
+        user = User(email=email, username=email, name=name)
         user.set_password(password)
-        user.save()
 
-        # Assign user to the "User" group
-        user_group, _ = Group.objects.get_or_create(name='User')
-        user.groups.add(user_group)
+        # A cached group id goes stale if the group is deleted and recreated; the link's foreign key
+        # (checked at commit) then fails, and the signup is retried once with a fresh id
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    # Consume the OTP first; a concurrent signup with the same code deletes nothing
+                    deleted, _ = OTP.objects.filter(pk=otp_record.pk, otp=otp).delete()
+                    if not deleted:
+                        return Response({"error": "OTP not found for this email"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Delete OTP after successful signup
-        otp_record.delete()
+                    # Create entity and user in a single insert each
+                    user.pk = None
+                    user.entity = Entity.objects.create(name=entity_name, entity_type=entity_type)
+                    try:
+                        user.save(force_insert=True)
+                    except IntegrityError as e:
+                        # Username and email are the user's only unique columns
+                        raise EmailTaken from e
+
+                    # Assign user to the "User" group
+                    User.groups.through.objects.create(user_id=user.id, group_id=get_group_id('User'))
+                break
+            except EmailTaken:
+                return Response({"error": "User with this email already exists"}, status=status.HTTP_400_BAD_REQUEST)
+            except IntegrityError:
+                if attempt:
+                    raise
+                get_group_id.cache_clear()
 
         return Response({"message": "User created successfully"}, status=status.HTTP_201_CREATED)
 
@@ -85,6 +126,10 @@ class login_view(APIView):
     ---
     Allows users to log in by providing email and password. Returns JWT tokens.
     """
+    throttle_classes = [FixedWindowThrottle]
+    throttle_scope = 'login'
+    query_budget = 3
+
     @extend_schema(
         request={
             "application/json": {
@@ -109,16 +154,21 @@ class login_view(APIView):
                 },
             },
             401: {"description": "Invalid credentials"},
+            429: {"description": "Too many requests"},
+            503: {"description": "Too many concurrent logins, retry later"},
         },
     )
     def post(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
 
-        user = authenticate(request, username=email, password=password)
+        try:
+            user = authenticate_credentials(email, password, request=request)
+        except HashingPoolSaturated:
+            return Response({"error": "Too many login attempts, please retry"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         if user is not None:
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = IndexedRefreshToken.for_user(user)
             return Response({
                 "access": str(refresh.access_token),
                 "refresh": str(refresh),
@@ -126,12 +176,53 @@ class login_view(APIView):
         return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@csrf_exempt
+@require_POST
+async def async_login_view(request):
+    """
+    Async Login API
+    ---
+    Same contract as `login_view`, for ASGI deployments. Password hashing runs
+    on the shared hashing pool, so the event loop keeps serving other requests.
+    """
+    throttle = FixedWindowThrottle()
+    if not await sync_to_async(throttle.allow_request)(request, async_login_view):
+        response = JsonResponse({"error": "Request was throttled"}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(math.ceil(throttle.wait()))
+        return response
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = await aauthenticate_credentials(data.get('email'), data.get('password'), request=request)
+    except HashingPoolSaturated:
+        return JsonResponse({"error": "Too many login attempts, please retry"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if user is None:
+        return JsonResponse({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    refresh = await sync_to_async(IndexedRefreshToken.for_user)(user)
+    return JsonResponse({
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+    }, status=status.HTTP_200_OK)
+
+
+async_login_view.throttle_scope = 'login'
+async_login_view.query_budget = 3
+
+
 class logout_view(APIView):
     """
     Logout API
     ---
     Allows users to log out by blacklisting the refresh token.
     """
+    # Includes the blacklist lookup that a per-process cache sends to the database
+    query_budget = 8
+
     @extend_schema(
         request={
             "application/json": {
@@ -150,7 +241,7 @@ class logout_view(APIView):
     def post(self, request):
         refresh_token = request.data.get('refresh')
         try:
-            token = RefreshToken(refresh_token)
+            token = IndexedRefreshToken(refresh_token)
             token.blacklist()
             return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -164,6 +255,10 @@ class send_otp_view(APIView):
     ---
     Sends an OTP to the user's email address.
     """
+    throttle_classes = [FixedWindowThrottle]
+    throttle_scope = 'otp'
+    query_budget = 6
+
     @extend_schema(
         request={
             "application/json": {
@@ -177,6 +272,7 @@ class send_otp_view(APIView):
         responses={
             200: {"description": "OTP sent successfully"},
             400: {"description": "Email is required"},
+            429: {"description": "Too many requests"},
         },
     )
     def post(self, request):
@@ -0,0 +1,127 @@
+from uuid import uuid4
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from backend.models import ReportImport
+from backend.serializers import CreateReportImportSerializer, ReportImportSerializer
+from backend.services.import_service import AWAITING_UPLOAD, QUEUED
+from backend.services.s3_service import s3_service
+
+IMPORT_EXAMPLE = {
+    "id": 7,
+    "status": "RUNNING",
+    "file_format": "CSV",
+    "rows_processed": 1500,
+    "rows_failed": 2,
+    "reports_created": 1498,
+    "credits_spent": 14980,
+    "errors": [{"row": 17, "errors": {"services": {"0": ["\"BUREAU\" is not a valid choice."]}}}],
+    "failure_reason": None,
+    "created_at": "2025-07-01T10:00:00Z",
+    "started_at": "2025-07-01T10:01:00Z",
+    "finished_at": None,
+}
+
+
+class CreateReportImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    # User, import row
+    query_budget = 2
+
+    @extend_schema(
+        summary="Create Report Import",
+        description="Starts a bulk import of report requests from a CSV or XLSX file with `entity_name`, `entity_pan` "
+                    "and `services` columns (services separated by commas or semicolons). Returns a presigned URL to "
+                    "upload the file to; then call the start endpoint.",
+        request=CreateReportImportSerializer,
+        responses={
+            201: {
+                "description": "Import created; upload the file to `upload_url`",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "upload_url": "https://s3.amazonaws.com/bucket-name/5/imports/0f3c.../targets.csv?AWSAccessKeyId=...",
+                            "import": {**IMPORT_EXAMPLE, "status": "AWAITING_UPLOAD", "rows_processed": 0,
+                                       "rows_failed": 0, "reports_created": 0, "credits_spent": 0, "errors": [],
+                                       "started_at": None},
+                        }
+                    }
+                },
+            },
+            400: {"description": "User does not belong to any entity, or not a .csv or .xlsx file name"},
+        },
+    )
+    def post(self, request):
+        if not request.user.entity_id:
+            return Response({"error": "User does not belong to any entity"}, status=400)
+        serializer = CreateReportImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=400)
+
+        file_name = serializer.validated_data["file_name"]
+        s3_key = f"{request.user.id}/imports/{uuid4().hex}/{file_name}"
+        try:
+            upload_url = s3_service.upload_file(s3_key)
+        except Exception as e:
+            return Response({"error": str(e)}, status=500)
+        job = ReportImport.objects.create(
+            user=request.user,
+            s3_path=s3_key,
+            file_format=file_name.rsplit(".", 1)[1].upper(),
+        )
+        return Response({"upload_url": upload_url, "import": ReportImportSerializer(job).data}, status=201)
+
+
+class StartReportImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    # User, import, conditional status update
+    query_budget = 3
+
+    @extend_schema(
+        summary="Start Report Import",
+        description="Queues the import once its file has been uploaded. Progress is reported by the import status "
+                    "endpoint.",
+        request=None,
+        responses={
+            202: {"description": "Import queued", "content": {"application/json": {"example": {
+                **IMPORT_EXAMPLE, "status": "QUEUED", "rows_processed": 0, "rows_failed": 0, "reports_created": 0,
+                "credits_spent": 0, "errors": [], "started_at": None}}}},
+            404: {"description": "Import not found"},
+            409: {"description": "The import has already been started"},
+        },
+    )
+    def post(self, request, import_id):
+        job = ReportImport.objects.filter(id=import_id, user=request.user).first()
+        if job is None:
+            return Response({"error": "Import not found"}, status=404)
+        # Conditional, so a repeated request cannot queue the import twice
+        if not ReportImport.objects.filter(pk=job.pk, status=AWAITING_UPLOAD).update(status=QUEUED):
+            return Response({"error": "The import has already been started"}, status=409)
+        job.status = QUEUED
+
+        from backend.tasks import import_reports
+        transaction.on_commit(lambda: import_reports.delay(job.pk))
+        return Response(ReportImportSerializer(job).data, status=202)
+
+
+class ReportImportStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+
+    @extend_schema(
+        summary="Report Import Status",
+        description="Progress of a bulk import: rows processed so far, reports created, credits spent, and the first "
+                    "invalid rows with their errors. The counters advance as each chunk of rows commits.",
+        responses={
+            200: ReportImportSerializer,
+            404: {"description": "Import not found"},
+        },
+    )
+    def get(self, request, import_id):
+        job = ReportImport.objects.filter(id=import_id, user=request.user).first()
+        if job is None:
+            return Response({"error": "Import not found"}, status=404)
+        return Response(ReportImportSerializer(job).data, status=200)
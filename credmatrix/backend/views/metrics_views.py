@@ -0,0 +1,29 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from backend import metrics
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. When settings.METRICS_AUTH_TOKEN is set the
+    scraper must send it as a Bearer token. Without a token the endpoint is
+    only served in DEBUG, so business counters are never public by default.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=403)
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied, token):
+            return HttpResponse(status=401)
+    return HttpResponse(metrics.default_registry.render(), content_type=CONTENT_TYPE)
+
+
+metrics_view.query_budget = 0
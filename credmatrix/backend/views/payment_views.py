@@ -1,27 +1,38 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.conf import settings
 from backend.models import Payment
+from backend.throttling import FixedWindowThrottle
+from backend.services.payment_gateway import GatewayUnavailable, get_payment_gateway
+from backend.services.payment_service import complete_payment, record_webhook_event, verify_webhook_signature
 import time
 
 class CreateOrderView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [FixedWindowThrottle]
+    throttle_scope = 'payment'
+    query_budget = 2
 
     def post(self, request):
-        amount = request.data.get('amount') * 100
+        amount = request.data.get('amount')
         currency = request.data.get('currency', 'INR')
 
         if not amount:
             return Response({"error": "Amount is required"}, status=400)
+        try:
+            amount = int(amount) * 100
+        except (TypeError, ValueError):
+            return Response({"error": "Amount must be a whole number"}, status=400)
 
-
-        data = {
-            "amount": amount,
-            "currency": currency,
-            "receipt": f"receipt_{request.user.id}_{int(time.time())}"
-        }
-        order = settings.razorpay_client.order.create(data=data)
+        gateway = get_payment_gateway()
+        try:
+            order = gateway.create_order(
+                amount=amount,
+                currency=currency,
+                receipt=f"receipt_{request.user.id}_{int(time.time())}",
+            )
+        except GatewayUnavailable:
+            return Response({"error": "Payment gateway unavailable, please retry"}, status=503)
 
         Payment.objects.create(
             user=request.user,
@@ -33,12 +44,15 @@ class CreateOrderView(APIView):
             "order_id": order['id'],
             "amount": order['amount'],
             "currency": order['currency'],
-            "key": settings.RAZORPAY_KEY_ID
+            "key": gateway.key_id
         })
 
 
 class VerifyPaymentView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [FixedWindowThrottle]
+    throttle_scope = 'payment'
+    query_budget = 6
 
     def post(self, request):
         payment_id = request.data.get('payment_id')
@@ -49,20 +63,35 @@ class VerifyPaymentView(APIView):
             return Response({"error": "Missing required parameters"}, status=400)
 
         try:
+            if not get_payment_gateway().verify_payment_signature(order_id, payment_id, signature):
+                raise ValueError("Razorpay Signature Verification Failed")
 
-            params_dict = {
-                'razorpay_payment_id': payment_id,
-                'razorpay_order_id': order_id,
-                'razorpay_signature': signature
-            }
-            settings.razorpay_client.utility.verify_payment_signature(params_dict)
-
-
-            payment = Payment.objects.get(order_id=order_id)
-            payment.payment_id = payment_id
-            payment.status = 'completed'
-            payment.save()
+            payment = complete_payment(order_id, payment_id)
+            if payment is None:
+                raise Payment.DoesNotExist("No payment found for this order")
 
             return Response({"message": "Payment successful"})
         except Exception as e:
-            return Response({"error": "Payment verification failed", "details": str(e)}, status=401)
\ No newline at end of file
+            return Response({"error": "Payment verification failed", "details": str(e)}, status=401)
+
+
+class RazorpayWebhookView(APIView):
+    """
+    Razorpay webhook receiver. Verifies the signature, stores the event and
+    acknowledges immediately; credits are granted by the process_payment_event task.
+    """
+    authentication_classes = []
+    permission_classes = []
+    query_budget = 4
+
+    def post(self, request):
+        body = request.body
+        if not verify_webhook_signature(body, request.headers.get('X-Razorpay-Signature')):
+            return Response({"error": "Invalid signature"}, status=400)
+
+        try:
+            record_webhook_event(body, request.headers.get('X-Razorpay-Event-Id'))
+        except ValueError:
+            return Response({"error": "Invalid payload"}, status=400)
+
+        return Response({"status": "ok"})
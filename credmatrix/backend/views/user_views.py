@@ -1,23 +1,55 @@
+from functools import wraps
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from backend.models import Report, Activity, Transaction, Document
+from django.db import transaction
+from django.db.models import F
+from backend.models import Report, Activity, Transaction, Document, Entity, NotificationPreference, ArchivedReport
 from django.utils.timezone import now
-from backend.serializers import ReportSerializer
-from drf_spectacular.utils import extend_schema, OpenApiExample
-from backend.serializers import InitiateRequestSerializer
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from backend.serializers import ReportSerializer, ActivitySerializer, DocumentSerializer, ArchivedReportSerializer
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
+from backend.serializers import InitiateRequestSerializer, SERVICE_CHOICES
 from backend.serializers import DeleteReportSerializer, UploadDocumentSerializer, ConfirmDocumentUploadSerializer
+from backend.serializers import NotificationPreferenceSerializer
 from backend.services.s3_service import s3_service
-
-
-
-
-class GetReportsView(APIView):
+from backend.services.report_status_service import InvalidTransition, can_transition, transition
+from backend.services.event_stream import EventStream, publish_report_event
+from backend.services.archive_service import unpack
+from backend.services.document_rules import document_received, get_document_rules, received_types
+from backend.services.usage_service import record_reports_created
+from backend.services.pricing_service import get_required_credits
+from backend.authentication import aauthenticate_jwt
+from backend.db_router import ReplicaReadMixin, ais_pinned_to_primary, use_read_replica
+from backend.metrics import credits_debited
+from backend.renderers import ORJSONResponse
+
+
+def filter_by_service(reports, service):
+    """
+    Narrow `reports` to those including `service` through the ReportService index.
+
+    :return: The filtered queryset, or None if `service` is not a ServiceType name.
+    """
+    if service is None:
+        return reports
+    if service not in SERVICE_CHOICES:
+        return None
+    # report_service_unique means the join adds no duplicate rows
+    return reports.filter(service_links__service=service)
+
+
+class GetReportsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     @extend_schema(
         summary="Get Reports",
         description="Fetch all reports made by users in the same entity as the authenticated user, including document details.",
+        parameters=[
+            OpenApiParameter("service", str, enum=SERVICE_CHOICES, description="Only reports that include this service."),
+        ],
         responses={
             200: {
                 "description": "Reports fetched successfully",
@@ -53,18 +85,22 @@ class GetReportsView(APIView):
                     }
                 },
             },
-            400: {"description": "User does not belong to any entity"},
+            400: {"description": "User does not belong to any entity, or an unknown service"},
             401: {"description": "Authentication credentials were not provided"},
         },
     )
     def get(self, request):
-        user = request.user
-        entity = user.entity
+        entity_id = request.user.entity_id
 
-        if not entity:
+        if not entity_id:
             return Response({"error": "User does not belong to any entity"}, status=400)
 
-        reports = Report.objects.filter(user__entity=entity)
+        reports = filter_by_service(
+            Report.objects.filter(user__entity_id=entity_id).prefetch_related('documents'),
+            request.query_params.get("service"),
+        )
+        if reports is None:
+            return Response({"error": "Unknown service"}, status=400)
         serializer = ReportSerializer(reports, many=True)
         return Response(serializer.data, status=200)
 
@@ -72,6 +108,10 @@ class GetReportsView(APIView):
 
 class EditReportView(APIView):
     permission_classes = [IsAuthenticated]
+    # User, report, status transition (savepoint pair, conditional update, activity, notification and
+    # usage events), field update, and when services change the document types received and service
+    # rows (delete and insert), activity, documents, change event (a NOTIFY with the postgres event broker)
+    query_budget = 15
 
     @extend_schema(
         summary="Edit Report",
@@ -105,36 +145,61 @@ class EditReportView(APIView):
                 },
             },
             404: {"description": "Report not found"},
-            400: {"description": "Invalid data provided"},
+            400: {"description": "Invalid data or a status change the report's current status does not allow"},
+            409: {"description": "The report's status changed concurrently"},
         },
     )
     def put(self, request, report_id):
         try:
-            report = Report.objects.get(id=report_id)
+            # The owner's entity is needed for the change event
+            report = Report.objects.select_related('user').get(id=report_id)
+        except Report.DoesNotExist:
+            return Response({"error": "Report not found"}, status=404)
 
-            old_state = {field: getattr(report, field) for field in request.data.keys()}
+        # Status changes go through the state machine; other fields are edited directly
+        data = request.data.copy()
+        status = data.get("status")
+        data.pop("status", None)
+        if status is not None and status != report.status and not can_transition(report.status, status):
+            return Response({"error": f"Cannot move a report from {report.status} to {status}"}, status=400)
 
-            serializer = ReportSerializer(report, data=request.data, partial=True)
-            if serializer.is_valid():
-                serializer.save()
+        old_state = {field: getattr(report, field) for field in data.keys()}
 
-                new_state = {field: serializer.data[field] for field in request.data.keys()}
+        serializer = ReportSerializer(report, data=data, partial=True)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=400)
 
-                Activity.objects.create(
-                    report=report,
-                    user=request.user,
-                    old_state=old_state,
-                    new_state=new_state,
-                    timestamp=now(),
-                )
+        if status is not None and status != report.status:
+            try:
+                transition(report, status, request.user)
+            except InvalidTransition as e:
+                return Response({"error": str(e)}, status=409)
+
+        if data:
+            edited = dict(serializer.validated_data)
+            if "services" in edited:
+                # New services change what is required; documents already received still count
+                edited["pending_documents"] = get_document_rules().pending(edited["services"], received_types(report.id))
+            # Only the edited columns: a full save would revert a concurrent claim, release or escalation
+            for field, value in edited.items():
+                setattr(report, field, value)
+            report.save(update_fields=list(edited))
+            Activity.objects.create(
+                report=report,
+                user=request.user,
+                old_state=old_state,
+                new_state={field: serializer.data[field] for field in data.keys()},
+                timestamp=now(),
+            )
 
-                return Response({"message": "Report updated successfully", "report": serializer.data}, status=200)
-            return Response({"error": serializer.errors}, status=400)
-        except Report.DoesNotExist:
-            return Response({"error": "Report not found"}, status=404)
+        publish_report_event(report.user.entity_id, "report.updated", report.id, status=report.status)
+        report_data = serializer.data if data else ReportSerializer(report).data
+        return Response({"message": "Report updated successfully", "report": report_data}, status=200)
 
 class DeleteReportView(APIView):
     permission_classes = [IsAuthenticated]
+    # User, report, status transition (savepoint pair, conditional update, activity, usage event), change event
+    query_budget = 8
 
     @extend_schema(
         summary="Delete (Cancel) Report",
@@ -157,30 +222,26 @@ class DeleteReportView(APIView):
                 },
             },
             404: {"description": "Report not found"},
-            400: {"description": "Invalid data provided"},
+            400: {"description": "Invalid data provided, or the report is completed or already cancelled"},
+            409: {"description": "The report's status changed concurrently"},
         },
     )
     def patch(self, request, report_id):
         try:
-            report = Report.objects.get(id=report_id)
+            report = Report.objects.select_related('user').get(id=report_id)
 
             serializer = DeleteReportSerializer(data=request.data)
             if not serializer.is_valid():
                 return Response({"error": serializer.errors}, status=400)
 
             cancellation_reason = serializer.validated_data["cancellation_reason"]
-
-            report.status = "CANCELLED"
-            report.cancellation_reason = cancellation_reason
-            report.save()
-
-            Activity.objects.create(
-                report=report,
-                user=request.user,
-                old_state={"status": report.status, "cancellation_reason": report.cancellation_reason},
-                new_state={"status": "CANCELLED", "cancellation_reason": cancellation_reason},
-                timestamp=now(),
-            )
+            if not can_transition(report.status, "CANCELLED"):
+                return Response({"error": f"Cannot move a report from {report.status} to CANCELLED"}, status=400)
+            try:
+                transition(report, "CANCELLED", request.user, cancellation_reason=cancellation_reason)
+            except InvalidTransition as e:
+                return Response({"error": str(e)}, status=409)
+            publish_report_event(report.user.entity_id, "report.status_changed", report.id, status=report.status)
 
             return Response(
                 {
@@ -197,8 +258,45 @@ class DeleteReportView(APIView):
             return Response({"error": "Report not found"}, status=404)
 
 
+class NotificationPreferenceView(APIView):
+    permission_classes = [IsAuthenticated]
+    # User, preference row, then its insert or update
+    query_budget = 3
+
+    def _preference(self, user):
+        # Users without a row get the defaults until they change something
+        return NotificationPreference.objects.filter(user=user).first() or NotificationPreference(user=user)
+
+    @extend_schema(
+        summary="Get Notification Preferences",
+        description="Which report status changes the authenticated user is emailed about, and how often.",
+        responses={200: NotificationPreferenceSerializer},
+    )
+    def get(self, request):
+        return Response(NotificationPreferenceSerializer(self._preference(request.user)).data, status=200)
+
+    @extend_schema(
+        summary="Update Notification Preferences",
+        description="Change any of the authenticated user's notification preferences. Updates are collected into "
+                    "digest emails sent at most once per `digest_minutes`.",
+        request=NotificationPreferenceSerializer,
+        responses={
+            200: NotificationPreferenceSerializer,
+            400: {"description": "Invalid data provided"},
+        },
+    )
+    def put(self, request):
+        serializer = NotificationPreferenceSerializer(self._preference(request.user), data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=400)
+        serializer.save()
+        return Response(serializer.data, status=200)
+
+
 class InitiateRequestView(APIView):
     permission_classes = [IsAuthenticated]
+    # Includes the service rows, the usage event and the change event (a NOTIFY with the postgres event broker)
+    query_budget = 9
 
     @extend_schema(
         summary="Initiate Request",
@@ -219,10 +317,12 @@ class InitiateRequestView(APIView):
                                 "target_entity_name": "CredMatrix Inc.",
                                 "target_entity_pan": "ABCD123456",
                                 "credits": 12,
+                                "pending_documents": [],
                                 "documents": [
                                     {
                                         "id": 101,
-                                        "s3_path": "entity_id/report_id/financial_report.pdf",
+                                        "s3_path": "entity_id/report_id/pan.pdf",
+                                        "document_type": "PAN_CARD",
                                         "uploaded_at": "2025-07-01T10:00:00Z"
                                     }
                                 ]
@@ -240,43 +340,55 @@ class InitiateRequestView(APIView):
             return Response({"error": serializer.errors}, status=400)
 
         user = request.user
-        entity = user.entity
-        if not entity:
+        if not user.entity_id:
             return Response({"error": "User does not belong to any entity"}, status=400)
-        
-        data = serializer.validated_data
 
+        data = serializer.validated_data
         required_credits = get_required_credits(data["services"])
 
-        if entity.credits < required_credits:
-            return Response({"error": "Insufficient credits"}, status=400)
-
-
-        report = Report.objects.create(
-            user=user,
-            status="REQUEST_RAISED",
-            services=data["services"],
-            created_at=now(),
-            target_entity_name=data["entity_name"],
-            target_entity_pan=data["entity_pan"],
-            credits=required_credits,
-        )
-
-
-        document_ids = data.get("document_ids", [])
-        Document.objects.filter(id__in=document_ids, user=user, report=None).update(
-            report=report, uploaded_at=now()
-        )
+        with transaction.atomic():
+            # Check and debit in one statement so concurrent requests cannot overspend
+            debited = Entity.objects.filter(pk=user.entity_id, credits__gte=required_credits).update(
+                credits=F('credits') - required_credits
+            )
+            if not debited:
+                return Response({"error": "Insufficient credits"}, status=400)
+
+            # Documents uploaded before the report; attaching them counts as confirming them
+            document_ids = data.get("document_ids", [])
+            documents = list(Document.objects.filter(id__in=document_ids, user=user, report=None)) if document_ids else []
+
+            # Unassigned: the report waits in the agent work queue
+            report = Report.objects.create(
+                user=user,
+                status="REQUEST_RAISED",
+                services=data["services"],
+                created_at=now(),
+                target_entity_name=data["entity_name"],
+                target_entity_pan=data["entity_pan"],
+                credits=required_credits,
+                pending_documents=get_document_rules().pending(
+                    data["services"], [document.document_type for document in documents]
+                ),
+            )
 
-        entity.credits -= required_credits
-        entity.save()
+            if documents:
+                uploaded_at = now()
+                Document.objects.filter(id__in=[document.id for document in documents]).update(
+                    report=report, uploaded_at=uploaded_at
+                )
+                for document in documents:
+                    document.report, document.uploaded_at = report, uploaded_at
 
-        Transaction.objects.create(
-            user=user,
-            report=report,
-            credits=required_credits,
-            created_at=now(),
-        )
+            Transaction.objects.create(
+                user=user,
+                report=report,
+                credits=required_credits,
+                created_at=now(),
+            )
+            record_reports_created([report])
+            publish_report_event(user.entity_id, "report.created", report.id, status=report.status)
+        credits_debited.inc(required_credits)
 
         return Response(
             {
@@ -289,13 +401,15 @@ class InitiateRequestView(APIView):
                     "target_entity_name": report.target_entity_name,
                     "target_entity_pan": report.target_entity_pan,
                     "credits": report.credits,
+                    "pending_documents": report.pending_documents,
                     "documents": [
                         {
                             "id": doc.id,
                             "s3_path": doc.s3_path,
+                            "document_type": doc.document_type,
                             "uploaded_at": doc.uploaded_at,
                         }
-                        for doc in report.documents.all()
+                        for doc in documents
                     ],
                 },
             },
@@ -305,10 +419,13 @@ class InitiateRequestView(APIView):
 
 class ConfirmDocumentUploadView(APIView):
     permission_classes = [IsAuthenticated]
+    # User, document with its report, confirmation, pending documents update, change event
+    # (a NOTIFY with the postgres event broker)
+    query_budget = 5
 
     @extend_schema(
         summary="Confirm Document Upload",
-        description="Confirms that a document has been successfully uploaded to S3. Updates the `uploaded_at` timestamp for the document.",
+        description="Confirms that a document has been successfully uploaded to S3. Updates the `uploaded_at` timestamp for the document, and removes its `document_type` from the report's `pending_documents`.",
         request=ConfirmDocumentUploadSerializer,
         responses={
             201: {
@@ -320,6 +437,7 @@ class ConfirmDocumentUploadView(APIView):
                             "document": {
                                 "id": 123,
                                 "s3_path": "entity_id/report_id/financial_report.pdf",
+                                "document_type": "FINANCIAL_STATEMENT",
                                 "uploaded_at": "2025-07-01T10:00:00Z"
                             }
                         }
@@ -356,11 +474,16 @@ class ConfirmDocumentUploadView(APIView):
         document_id = serializer.validated_data["document_id"]
 
         try:
-            document = Document.objects.get(id=document_id, user=request.user)
+            # The report comes with the document, so its pending list needs no extra read
+            document = Document.objects.select_related('report').get(id=document_id, user=request.user)
 
             # Confirm the upload
             document.uploaded_at = now()
-            document.save()
+            document.save(update_fields=["uploaded_at"])
+            if document.report_id:
+                document_received(document.report, document.document_type)
+                publish_report_event(request.user.entity_id, "document.confirmed", document.report_id,
+                                     document_id=document.id, pending_documents=document.report.pending_documents)
 
             return Response(
                 {
@@ -368,6 +491,7 @@ class ConfirmDocumentUploadView(APIView):
                     "document": {
                         "id": document.id,
                         "s3_path": document.s3_path,
+                        "document_type": document.document_type,
                         "uploaded_at": document.uploaded_at,
                     },
                 },
@@ -379,6 +503,7 @@ class ConfirmDocumentUploadView(APIView):
 
 class UploadDocumentView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budget = 2
 
     @extend_schema(
         summary="Upload Document",
@@ -440,6 +565,7 @@ class UploadDocumentView(APIView):
             document = Document.objects.create(
                 user=request.user,
                 s3_path=s3_key,
+                document_type=serializer.validated_data.get("document_type"),
                 uploaded_at=None,  # Set uploaded_at to None until confirmed
                 report_id=report_id if report_id else None,
             )
@@ -454,4 +580,133 @@ class UploadDocumentView(APIView):
                 status=200,
             )
         except Exception as e:
-            return Response({"error": str(e)}, status=500)
\ No newline at end of file
+            return Response({"error": str(e)}, status=500)
+
+
+# Rows fetched per round trip by the async list views
+ASYNC_CHUNK_SIZE = 500
+
+
+def async_entity_view(view):
+    """
+    Authenticate an async read view with a JWT and route its reads to the
+    replica (unless the user is pinned to the primary), without leaving the
+    event loop except for the ORM calls themselves.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aauthenticate_jwt(request)
+        if user is None:
+            return ORJSONResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        if not user.entity_id:
+            return ORJSONResponse({"error": "User does not belong to any entity"}, status=400)
+        request.user = user
+        if not await ais_pinned_to_primary(user.pk):
+            use_read_replica()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _entity_report(request, report_id):
+    return await Report.objects.filter(id=report_id, user__entity_id=request.user.entity_id).afirst()
+
+
+async def _archived_report(request, report_id):
+    """Read-through for reports moved to the archive: the unpacked ArchivedReportData, or None."""
+    archived = await ArchivedReport.objects.filter(id=report_id, entity_id=request.user.entity_id).afirst()
+    return unpack(archived) if archived is not None else None
+
+
+@require_GET
+@async_entity_view
+async def async_reports_view(request):
+    """
+    Async Reports API
+    ---
+    Same payload and `service` filter as `GetReportsView`, served by a
+    native async view so polling clients do not each hold a worker thread.
+    """
+    reports = filter_by_service(
+        Report.objects.filter(user__entity_id=request.user.entity_id).prefetch_related('documents'),
+        request.GET.get("service"),
+    )
+    if reports is None:
+        return ORJSONResponse({"error": "Unknown service"}, status=400)
+    rows = [report async for report in reports.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return ORJSONResponse(ReportSerializer(rows, many=True).data)
+
+
+@require_GET
+@async_entity_view
+async def async_report_detail_view(request, report_id):
+    """Return one report of the user's entity, with its documents, from the archive if it has been moved there."""
+    report = await (
+        Report.objects.filter(id=report_id, user__entity_id=request.user.entity_id)
+        .prefetch_related('documents')
+        .afirst()
+    )
+    if report is None:
+        archived = await _archived_report(request, report_id)
+        if archived is None:
+            return ORJSONResponse({"error": "Report not found"}, status=404)
+        return ORJSONResponse(ArchivedReportSerializer(archived.report).data)
+    return ORJSONResponse(ReportSerializer(report).data)
+
+
+@require_GET
+@async_entity_view
+async def async_report_activities_view(request, report_id):
+    """Return the activity history of one report, oldest first."""
+    report = await _entity_report(request, report_id)
+    if report is None:
+        archived = await _archived_report(request, report_id)
+        if archived is None:
+            return ORJSONResponse({"error": "Report not found"}, status=404)
+        return ORJSONResponse(ActivitySerializer(archived.activities, many=True).data)
+    activities = Activity.objects.filter(report=report).order_by('timestamp', 'id')
+    rows = [activity async for activity in activities.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return ORJSONResponse(ActivitySerializer(rows, many=True).data)
+
+
+@require_GET
+@async_entity_view
+async def async_report_documents_view(request, report_id):
+    """Return the documents attached to one report."""
+    report = await _entity_report(request, report_id)
+    if report is None:
+        archived = await _archived_report(request, report_id)
+        if archived is None:
+            return ORJSONResponse({"error": "Report not found"}, status=404)
+        return ORJSONResponse(DocumentSerializer(archived.documents, many=True).data)
+    documents = Document.objects.filter(report=report).order_by('id')
+    rows = [document async for document in documents.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return ORJSONResponse(DocumentSerializer(rows, many=True).data)
+
+
+@require_GET
+@async_entity_view
+async def report_events_view(request):
+    """
+    Report Events API
+    ---
+    Server-sent event stream of changes to the reports and documents of the
+    user's entity (report.created, report.updated, report.status_changed,
+    document.confirmed), so clients need not poll `GetReportsView`. Events
+    carry ids and status only; clients re-read what they display. A
+    `resync` event means events were missed and the report list should be
+    reloaded. Serve under ASGI; each open stream holds no thread.
+    """
+    response = StreamingHttpResponse(EventStream(request.user.entity_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Each view: the JWT user, then the report (or list) and one related table; for an
+# archived report, the hot-table miss and the archive row
+async_reports_view.query_budget = 3
+async_report_detail_view.query_budget = 3
+async_report_activities_view.query_budget = 3
+async_report_documents_view.query_budget = 3
+# Only the JWT user lookup; events come from the broker
+report_events_view.query_budget = 1
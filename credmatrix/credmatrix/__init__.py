@@ -0,0 +1,10 @@
+__all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    # Celery is only imported by processes that use it (workers, beat and
+    # code that queues tasks), not by every web worker at startup.
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,11 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'credmatrix.settings')
+
+app = Celery('credmatrix')
+
+# Read CELERY_* keys from Django settings and pick up backend/tasks.py.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,57 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.urls import resolve
+from rest_framework.test import APIClient
+from backend.middleware import get_query_budget
+from backend.models import Entity, User
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+PASSWORD = "securepassword"
+
+
+@pytest.fixture(scope="session")
+def password_hash():
+    """PASSWORD hashed once per session; hashing per test would cost a PBKDF2 run each."""
+    return make_password(PASSWORD)
+
+
+@pytest.fixture
+def user(request, password_hash):
+    """
+    A user with password PASSWORD in an entity with 1000 credits. Parametrise
+    it indirectly to start the entity with other credits:
+    @pytest.mark.parametrize("user", [{"credits": 0}], indirect=True)
+    """
+    credits = getattr(request, "param", {}).get("credits", 1000)
+    entity = Entity.objects.create(name="Test Entity", entity_type="BANK", credits=credits)
+    return User.objects.create(username="user@example.com", email="user@example.com", password=password_hash,
+                               entity=entity)
+
+
+@pytest.fixture
+def api_client(request):
+    """An APIClient; tests that also use `user` get it authenticated as that user with a JWT access token."""
+    client = APIClient()
+    if "user" in request.fixturenames:
+        user = request.getfixturevalue("user")
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+    return client
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    Return a checker that fails when a response used more queries than its
+    view's declared `query_budget` (as recorded by QueryInstrumentationMiddleware).
+    """
+    def check(response):
+        match = resolve(response.request["PATH_INFO"])
+        budget = get_query_budget(match.func)
+        assert budget is not None, f"{match.route} does not declare a query_budget"
+        stats = response.db_stats
+        assert stats.query_count <= budget, (
+            f"{match.route} ran {stats.query_count} queries, budget is {budget}; "
+            f"slowest: {stats.slowest_sql}"
+        )
+        return stats.query_count
+    return check
@@ -0,0 +1,76 @@
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import timedelta
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils.timezone import now
+from backend.models import Activity, ArchivedReport, Document, Entity, Report, Transaction, User
+from backend.services.archive_service import archive_reports, restore_report
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+DETAIL_ROUTES = ("report-detail-async", "report-activities-async", "report-documents-async")
+
+
+def make_report(user, status, days_in_status):
+    report = Report.objects.create(user=user, status=status, services=["BUREAU_REPORT"],
+                                   target_entity_name="Target", target_entity_pan="ABCDE1234F")
+    Report.objects.filter(pk=report.pk).update(status_changed_at=now() - timedelta(days=days_in_status))
+    Document.objects.create(report=report, user=user, s3_path=f"{user.id}/{report.id}/bank.pdf")
+    Activity.objects.create(report=report, user=user, old_state={"status": "DRAFT"}, new_state={"status": status})
+    Transaction.objects.create(report=report, user=user, credits=5)
+    return report
+
+
+def get(user, name, *args):
+    headers = {"Authorization": f"Bearer {IndexedRefreshToken.for_user(user).access_token}"}
+    return async_to_sync(AsyncClient().get)(reverse(name, args=args), headers=headers)
+
+
+@pytest.mark.django_db
+def test_only_old_final_reports_are_archived(user):
+    """Old COMPLETED and CANCELLED reports leave the hot tables with their rows; others stay."""
+    old = [make_report(user, "COMPLETED", 200), make_report(user, "CANCELLED", 365), make_report(user, "COMPLETED", 181)]
+    recent = make_report(user, "COMPLETED", 10)
+    open_report = make_report(user, "UNDER_ASSESMENT", 400)
+
+    assert archive_reports(older_than_days=180, batch_size=2) == 3
+    assert archive_reports(older_than_days=180, batch_size=2) == 0
+    assert set(Report.objects.values_list("id", flat=True)) == {recent.id, open_report.id}
+    assert set(ArchivedReport.objects.values_list("id", flat=True)) == {report.id for report in old}
+    for model in (Document, Activity, Transaction):
+        assert not model.objects.filter(report_id__in=[report.id for report in old]).exists()
+    assert ArchivedReport.objects.get(id=old[0].id).entity_id == user.entity_id
+
+
+@pytest.mark.django_db
+def test_archived_reports_read_through(user):
+    """Async read endpoints serve archived reports exactly as before, only to the owning entity."""
+    report = make_report(user, "COMPLETED", 200)
+    before = {name: get(user, name, report.id).json() for name in DETAIL_ROUTES}
+
+    archive_reports(older_than_days=180)
+    assert not Report.objects.filter(id=report.id).exists()
+    assert {name: get(user, name, report.id).json() for name in DETAIL_ROUTES} == before
+    assert get(user, "reports-async").json() == []
+
+    outsider = User.objects.create(username="out@example.com", email="out@example.com",
+                                   entity=Entity.objects.create(name="Other", entity_type="BANK"))
+    for name in DETAIL_ROUTES:
+        assert get(outsider, name, report.id).status_code == 404
+
+
+@pytest.mark.django_db
+def test_restore_keeps_ids_and_timestamps(user):
+    """Restored reports come back with their original ids, timestamps and related rows."""
+    report = make_report(user, "CANCELLED", 200)
+    document = report.documents.get()
+    archive_reports(older_than_days=180)
+
+    restored = restore_report(report.id)
+    assert restored.id == report.id
+    assert not ArchivedReport.objects.exists()
+    fresh = Report.objects.get(id=report.id)
+    assert (fresh.created_at, fresh.status) == (report.created_at, "CANCELLED")
+    assert fresh.documents.get().uploaded_at == document.uploaded_at
+    assert fresh.activities.count() == 1 and fresh.transactions.get().credits == 5
+    assert restore_report(report.id) is None
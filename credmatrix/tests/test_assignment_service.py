@@ -0,0 +1,169 @@
+import pytest
+from datetime import timedelta
+from django.contrib.auth.models import Group
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from backend.models import Activity, AgentProfile, Entity, Report, Transaction, User
+from backend.services.assignment_service import (
+    AssignmentError,
+    assign_queued_reports,
+    claim_reports,
+    release_report,
+)
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+@pytest.fixture
+def customer():
+    entity = Entity.objects.create(name="Customer", entity_type="BANK", credits=100)
+    return User.objects.create_user(username="customer@example.com", email="customer@example.com", password="pw", entity=entity)
+
+
+def make_agent(email, services=(), admin=True):
+    agent = User.objects.create_user(username=email, email=email, password="pw")
+    if admin:
+        agent.groups.add(Group.objects.get_or_create(name="admin")[0])
+    AgentProfile.objects.create(user=agent, services=list(services))
+    return agent
+
+
+def queue(customer, *service_lists):
+    reports = []
+    for i, services in enumerate(service_lists):
+        report = Report.objects.create(user=customer, status="REQUEST_RAISED", services=list(services),
+                                       target_entity_name=f"Target {i}", target_entity_pan="ABCDE1234F")
+        # Distinct, increasing creation times so queue order is well defined
+        Report.objects.filter(pk=report.pk).update(created_at=now() - timedelta(minutes=len(service_lists) - i))
+        reports.append(report)
+    return reports
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+    return client
+
+
+@pytest.mark.django_db
+def test_claims_hand_out_each_report_once_oldest_first(customer):
+    """Successive claims take the oldest queued reports and never the same one twice."""
+    first, second, third = queue(customer, ["BUREAU_REPORT"], ["FINANCIAL_INFO"], ["BUREAU_REPORT"])
+    alice, bob = make_agent("alice@example.com"), make_agent("bob@example.com")
+
+    assert [report.id for report in claim_reports(alice, limit=2)] == [first.id, second.id]
+    assert [report.id for report in claim_reports(bob, limit=2)] == [third.id]
+    assert claim_reports(bob) == []
+
+    third.refresh_from_db()
+    assert (third.agent, third.status) == (bob, "UNDER_ASSESMENT")
+    assert third.assigned_at is not None
+    assert Activity.objects.filter(report=third, user=bob).exists()
+
+
+@pytest.mark.django_db
+def test_claim_filters_by_service(customer):
+    """A service-specific claim skips reports that do not include that service."""
+    _, wanted = queue(customer, ["FINANCIAL_INFO"], ["BANK_REF_CHECK", "BUREAU_REPORT"])
+    alice = make_agent("alice@example.com")
+
+    assert [report.id for report in claim_reports(alice, service="BUREAU_REPORT", limit=5)] == [wanted.id]
+
+
+@pytest.mark.django_db
+def test_release_returns_report_to_queue(customer):
+    """Released reports are unassigned and claimable again; unassigned ones cannot be released."""
+    report, = queue(customer, ["BUREAU_REPORT"])
+    alice, bob = make_agent("alice@example.com"), make_agent("bob@example.com")
+    claim_reports(alice)
+
+    release_report(report.id, alice)
+    report.refresh_from_db()
+    assert (report.agent, report.status, report.assigned_at) == (None, "REQUEST_RAISED", None)
+    with pytest.raises(AssignmentError):
+        release_report(report.id, alice)
+    assert [claimed.id for claimed in claim_reports(bob)] == [report.id]
+
+
+@pytest.mark.django_db
+def test_auto_assignment_prefers_least_loaded_eligible_agent(customer):
+    """Queued reports go to the least-loaded agent whose profile covers their services."""
+    busy = make_agent("busy@example.com")
+    idle = make_agent("idle@example.com")
+    specialist = make_agent("specialist@example.com", services=["BANK_REF_CHECK"])
+    queue(customer, ["BUREAU_REPORT"])
+    claim_reports(busy)
+
+    general, bank_check, nobody = queue(
+        customer, ["BUREAU_REPORT"], ["BANK_REF_CHECK"], ["BANK_REF_CHECK", "BUREAU_REPORT"],
+    )
+    AgentProfile.objects.filter(user=busy).update(services=["FINANCIAL_INFO", "BUREAU_REPORT"])
+    AgentProfile.objects.filter(user=idle).update(services=["BUREAU_REPORT"])
+
+    assert assign_queued_reports() == 2
+    assert Report.objects.get(pk=general.pk).agent == idle
+    assert Report.objects.get(pk=bank_check.pk).agent == specialist
+    assert Report.objects.get(pk=nobody.pk).agent is None
+
+
+@pytest.mark.django_db
+def test_auto_assignment_spreads_equal_load_round_robin(customer):
+    """Agents with equal load take turns."""
+    agents = [make_agent(f"agent{i}@example.com") for i in range(3)]
+    queue(customer, *[["BUREAU_REPORT"]] * 6)
+
+    assert assign_queued_reports() == 6
+    assert sorted(Report.objects.filter(agent__in=agents).values_list("agent", flat=True)) == \
+        sorted([agent.id for agent in agents] * 2)
+
+
+@pytest.mark.django_db
+def test_queue_endpoints_require_admin(customer):
+    """Non-admin users cannot claim or release reports."""
+    report, = queue(customer, ["BUREAU_REPORT"])
+    client = client_for(customer)
+
+    assert client.post(reverse("claim-reports"), {}, format="json").status_code == 403
+    assert client.post(reverse("release-report", args=[report.id])).status_code == 403
+
+
+@pytest.mark.django_db
+def test_claim_and_release_endpoints(customer):
+    """Admins claim queued reports over the API and release them back."""
+    report, = queue(customer, ["BUREAU_REPORT"])
+    client = client_for(make_agent("alice@example.com"))
+
+    response = client.post(reverse("claim-reports"), {"service": "BUREAU_REPORT"}, format="json")
+    assert response.status_code == 200
+    assert [row["id"] for row in response.data["reports"]] == [report.id]
+    assert response.data["reports"][0]["status"] == "UNDER_ASSESMENT"
+
+    response = client.post(reverse("release-report", args=[report.id]))
+    assert response.status_code == 200
+    assert response.data["report"]["status"] == "REQUEST_RAISED"
+    assert client.post(reverse("release-report", args=[report.id])).status_code == 409
+    assert client.post(reverse("release-report", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_initiate_request_queues_report_and_debits_credits(customer, settings):
+    """Initiated reports wait unassigned in the queue and are charged by service."""
+    settings.SERVICE_CREDITS = {**settings.SERVICE_CREDITS, "BUREAU_REPORT": 30, "BANK_REF_CHECK": 20}
+    client = client_for(customer)
+    payload = {"entity_name": "Target", "entity_pan": "ABCDE1234F",
+               "services": ["BUREAU_REPORT", "BANK_REF_CHECK"], "credits": 0}
+
+    response = client.post(reverse("initiate-request"), payload, format="json")
+    assert response.status_code == 201
+    report = Report.objects.get(pk=response.data["report"]["id"])
+    assert (report.agent, report.status, report.credits) == (None, "REQUEST_RAISED", 50)
+    assert Transaction.objects.get(report=report).credits == 50
+    assert Entity.objects.get(pk=customer.entity_id).credits == 50
+
+    assert client.post(reverse("initiate-request"), payload, format="json").status_code == 201
+    response = client.post(reverse("initiate-request"), payload, format="json")
+    assert response.status_code == 400
+    assert Entity.objects.get(pk=customer.entity_id).credits == 0
+
+    payload["services"] = ["UNKNOWN_SERVICE"]
+    assert client.post(reverse("initiate-request"), payload, format="json").status_code == 400
@@ -0,0 +1,73 @@
+import logging
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from django.urls import reverse
+from backend.models import Activity, Document, Entity, Report, User
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+@pytest.fixture
+def token(user):
+    """A JWT access token for `user`."""
+    return str(IndexedRefreshToken.for_user(user).access_token)
+
+
+@pytest.fixture
+def report(user):
+    report = Report.objects.create(user=user, agent=user, status="REQUEST_RAISED", services=["BUREAU_REPORT"],
+                                   target_entity_name="Target", target_entity_pan="ABCDE1234F")
+    Document.objects.create(report=report, user=user, s3_path=f"{user.id}/{report.id}/bank.pdf")
+    Activity.objects.create(report=report, user=user, old_state={"status": "DRAFT"}, new_state={"status": "REQUEST_RAISED"})
+    return report
+
+
+@pytest.fixture
+def other_report():
+    entity = Entity.objects.create(name="Other Entity", entity_type="BANK")
+    other = User.objects.create_user(username="other@example.com", email="other@example.com", password="pw", entity=entity)
+    return Report.objects.create(user=other, agent=other, services=["BUREAU_REPORT"],
+                                 target_entity_name="Hidden", target_entity_pan="ZZZZZ9999Z")
+
+
+def get(token, name, *args):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return async_to_sync(AsyncClient().get)(reverse(name, args=args), headers=headers)
+
+
+@pytest.mark.django_db
+def test_async_reports_list_is_scoped_to_entity(token, report, other_report):
+    """Only the user's entity's reports are listed, with their documents."""
+    response = get(token, "reports-async")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["id"] for row in data] == [report.id]
+    assert data[0]["documents"][0]["s3_path"].endswith("bank.pdf")
+
+
+@pytest.mark.django_db
+def test_async_report_detail_activities_and_documents(token, report, other_report):
+    """Detail, activity and document endpoints return the report's rows and 404 across entities."""
+    assert get(token, "report-detail-async", report.id).json()["target_entity_name"] == "Target"
+    assert get(token, "report-activities-async", report.id).json()[0]["new_state"] == {"status": "REQUEST_RAISED"}
+    assert len(get(token, "report-documents-async", report.id).json()) == 1
+
+    for name in ("report-detail-async", "report-activities-async", "report-documents-async"):
+        assert get(token, name, other_report.id).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_views_require_a_valid_token(report):
+    """Missing or malformed tokens are rejected."""
+    assert get(None, "reports-async").status_code == 401
+    assert get("not-a-token", "report-detail-async", report.id).status_code == 401
+
+
+def test_middleware_chain_runs_natively_async(caplog, settings):
+    """No middleware forces the ASGI handler to adapt the chain to sync."""
+    settings.DEBUG = True  # Django only logs adaptations in debug mode
+    with caplog.at_level(logging.DEBUG, logger="django.request"):
+        ASGIHandler()
+    assert not [record for record in caplog.records if "adapted" in record.getMessage()]
@@ -1,6 +1,6 @@
 import pytest
 from rest_framework.test import APIClient
-from backend.models import OTP
+from backend.models import OTP, User
 
 @pytest.fixture
 def api_client():
@@ -139,4 +139,65 @@ def test_send_otp_missing_email(api_client):
     payload = {}  # Missing email
     response = api_client.post("/api/auth/send-otp/", payload)
     assert response.status_code == 400
-    assert response.data["error"] == "Email is required"
\ No newline at end of file
+    assert response.data["error"] == "Email is required"
+
+@pytest.mark.django_db
+def test_signup_query_count(api_client, django_assert_num_queries):
+    """Signup stays within a fixed number of queries once the group id is cached."""
+    from django.urls import reverse
+    from backend.views.auth_views import get_group_id
+
+    get_group_id.cache_clear()
+    get_group_id('User')
+    OTP.objects.create(email="burst@example.com", otp="123456")
+
+    payload = {
+        "email": "burst@example.com",
+        "password": "newpassword",
+        "name": "Burst User",
+        "entity_name": "Burst Entity",
+        "entity_type": "STARTUP",
+        "otp": "123456"
+    }
+    # OTP read, savepoint, OTP delete, entity insert, user insert, group link, release
+    with django_assert_num_queries(7):
+        response = api_client.post(reverse("signup"), payload)
+    get_group_id.cache_clear()
+    assert response.status_code == 201
+
+    user = User.objects.get(email="burst@example.com")
+    assert user.check_password("newpassword")
+    assert user.groups.filter(name="User").exists()
+    assert not OTP.objects.filter(email="burst@example.com").exists()
+
+@pytest.mark.django_db(transaction=True)
+def test_signup_retries_with_recreated_group(api_client):
+    """A stale cached group id is looked up again instead of being reported as a duplicate email."""
+    from django.contrib.auth.models import Group
+    from django.urls import reverse
+    from backend.views.auth_views import get_group_id
+
+    get_group_id.cache_clear()
+    get_group_id('User')
+    Group.objects.filter(name='User').delete()
+    group = Group.objects.create(name='User')
+    OTP.objects.create(email="regroup@example.com", otp="123456")
+
+    payload = {
+        "email": "regroup@example.com",
+        "password": "newpassword",
+        "name": "Regroup User",
+        "entity_name": "Regroup Entity",
+        "entity_type": "STARTUP",
+        "otp": "123456"
+    }
+    response = api_client.post(reverse("signup"), payload)
+    assert response.status_code == 201
+    assert get_group_id('User') == group.id
+    assert User.objects.get(email="regroup@example.com").groups.get() == group
+
+    OTP.objects.create(email="regroup@example.com", otp="123456")
+    response = api_client.post(reverse("signup"), payload)
+    get_group_id.cache_clear()
+    assert response.status_code == 400
+    assert response.data["error"] == "User with this email already exists"
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from backend.management.commands.profile_startup import BOOT, LAZY_MODULES
+
+
+def test_heavy_modules_are_not_imported_at_boot():
+    """Loading settings, apps and the URLconf leaves boto3, razorpay, Celery's app and the schema views unloaded."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "credmatrix.settings"}
+    code = BOOT + f"import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_s3_client_is_created_on_first_use():
+    """Creating the service does not build a boto3 client."""
+    from backend.services.s3_service import S3Service
+
+    service = S3Service()
+    assert service._client is None
+    assert service.s3_client is service.s3_client
@@ -0,0 +1,55 @@
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from backend import db_router
+from backend.db_router import DatabaseRoutingMiddleware, ReplicaRouter, is_pinned_to_primary, use_read_replica
+from backend.models import Entity, User
+
+
+@pytest.fixture
+def with_replica(monkeypatch):
+    """Pretend a replica is configured without needing a second database."""
+    cache.clear()
+    monkeypatch.setattr(db_router, "replica_alias", lambda: "replica")
+    yield
+    cache.clear()
+
+
+def run_in_request(fn, user=None):
+    request = RequestFactory().get("/")
+    request.user = user
+    results = []
+    DatabaseRoutingMiddleware(lambda req: results.append(fn()))(request)
+    return results[0]
+
+
+def test_reads_stay_on_primary_unless_requested(with_replica):
+    """Without opting in, or outside a request, reads use the default database."""
+    router = ReplicaRouter()
+    assert router.db_for_read(User) is None
+    assert run_in_request(lambda: router.db_for_read(User)) is None
+
+
+def test_opted_in_reads_use_replica_until_a_write(with_replica):
+    """A write inside the request sends every later read to the primary."""
+    router = ReplicaRouter()
+
+    def handler():
+        use_read_replica()
+        before = router.db_for_read(User)
+        router.db_for_write(User)
+        return before, router.db_for_read(User)
+
+    assert run_in_request(handler) == ("replica", None)
+
+
+@pytest.mark.django_db
+def test_writes_pin_user_to_primary(with_replica):
+    """After a user's own mutation their reads skip the replica for a while."""
+    entity = Entity.objects.create(name="Pinned Entity", entity_type="BANK")
+    user = User.objects.create_user(username="pin@example.com", email="pin@example.com", password="pw", entity=entity)
+    assert not is_pinned_to_primary(user.pk)
+
+    run_in_request(lambda: Entity.objects.filter(pk=entity.pk).update(name="Renamed"), user=user)
+
+    assert is_pinned_to_primary(user.pk)
@@ -0,0 +1,145 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from backend.models import Document, Report
+from backend.services import s3_service as s3_module
+from backend.services.document_rules import DocumentRules, document_received, get_document_rules
+
+RULES = {
+    "FINANCIAL_INFO": ["FINANCIAL_STATEMENT", "INCOME_TAX_RETURN"],
+    "BUREAU_REPORT": ["PAN_CARD"],
+    "BANK_REF_CHECK": ["BANK_STATEMENT"],
+}
+
+
+@pytest.fixture(autouse=True)
+def rules(settings):
+    settings.REQUIRED_DOCUMENTS = RULES
+
+
+@pytest.fixture(autouse=True)
+def presigned_uploads(monkeypatch):
+    monkeypatch.setattr(s3_module.s3_service, "upload_file", lambda key: f"https://upload.example.com/{key}")
+
+
+def upload(api_client, report_id, document_type):
+    response = api_client.post(reverse("upload-document"), {"report_id": report_id, "document_name": f"{document_type}.pdf",
+                                                         "document_type": document_type})
+    assert response.status_code == 200
+    return response.data["document_id"]
+
+
+def confirm(api_client, document_id):
+    response = api_client.post(reverse("confirm-document-upload"), {"document_id": document_id})
+    assert response.status_code == 201
+    return response
+
+
+def test_rules_are_validated_and_memoised():
+    """Unknown names fail at compile time; requirements come out in DocumentType order and are reused."""
+    rules = DocumentRules(RULES)
+    required = rules.required(["FINANCIAL_INFO", "BUREAU_REPORT"])
+    assert required == ("PAN_CARD", "FINANCIAL_STATEMENT", "INCOME_TAX_RETURN")
+    assert rules.required(["BUREAU_REPORT", "FINANCIAL_INFO"]) is required
+    assert rules.pending(["FINANCIAL_INFO"], ["INCOME_TAX_RETURN"]) == ["FINANCIAL_STATEMENT"]
+
+    with pytest.raises(ImproperlyConfigured):
+        DocumentRules({"NOT_A_SERVICE": []})
+    with pytest.raises(ImproperlyConfigured):
+        DocumentRules({"BUREAU_REPORT": ["PASSPORT"]})
+
+
+@pytest.mark.django_db
+def test_initiate_sets_pending_documents(api_client, user):
+    """New reports start with every document their services require."""
+    response = api_client.post(reverse("initiate-request"), {
+        "entity_name": "Target", "entity_pan": "ABCDE1234F", "services": ["BUREAU_REPORT", "BANK_REF_CHECK"],
+        "credits": 15}, format="json")
+    assert response.status_code == 201
+    assert response.data["report"]["pending_documents"] == ["PAN_CARD", "BANK_STATEMENT"]
+    assert Report.objects.get().pending_documents == ["PAN_CARD", "BANK_STATEMENT"]
+
+
+@pytest.mark.django_db
+def test_confirmations_tick_off_pending_documents_in_constant_queries(api_client, user):
+    """Each confirmation costs the same number of queries however many documents the report has."""
+    report = Report.objects.create(user=user, services=["FINANCIAL_INFO", "BANK_REF_CHECK"], target_entity_name="T",
+                                   target_entity_pan="ABCDE1234F",
+                                   pending_documents=get_document_rules().pending(["FINANCIAL_INFO", "BANK_REF_CHECK"]))
+    for i in range(20):
+        Document.objects.create(report=report, user=user, s3_path=f"extra{i}.pdf")
+
+    counts = []
+    for document_type in ("BANK_STATEMENT", "FINANCIAL_STATEMENT", "INCOME_TAX_RETURN"):
+        document_id = upload(api_client, report.id, document_type)
+        with CaptureQueriesContext(connection) as queries:
+            confirm(api_client, document_id)
+        counts.append(len(queries))
+    assert len(set(counts)) == 1
+    assert Report.objects.get(pk=report.pk).pending_documents == []
+
+    # A second document of a type already received changes nothing
+    confirm(api_client, upload(api_client, report.id, "BANK_STATEMENT"))
+    assert Report.objects.get(pk=report.pk).pending_documents == []
+
+
+@pytest.mark.django_db
+def test_stale_reads_do_not_lose_confirmations(user):
+    """A confirmation based on an outdated pending list re-reads instead of overwriting."""
+    report = Report.objects.create(user=user, services=["FINANCIAL_INFO"], target_entity_name="T",
+                                   target_entity_pan="ABCDE1234F",
+                                   pending_documents=["FINANCIAL_STATEMENT", "INCOME_TAX_RETURN"])
+    stale = Report.objects.get(pk=report.pk)
+    document_received(report, "FINANCIAL_STATEMENT")
+    assert document_received(stale, "INCOME_TAX_RETURN") == []
+    assert Report.objects.get(pk=report.pk).pending_documents == []
+
+
+@pytest.mark.django_db
+def test_service_changes_recompute_and_manual_edits_are_ignored(api_client, user):
+    """Editing services recomputes the list, keeping received documents; the list itself is read-only."""
+    report = Report.objects.create(user=user, services=["BUREAU_REPORT"], target_entity_name="T",
+                                   target_entity_pan="ABCDE1234F", pending_documents=["PAN_CARD"])
+    Document.objects.create(report=report, user=user, s3_path="pan.pdf", document_type="PAN_CARD")
+    url = reverse("edit-report", args=[report.id])
+
+    response = api_client.put(url, {"services": ["BUREAU_REPORT", "BANK_REF_CHECK"]}, format="json")
+    assert response.status_code == 200
+    assert response.data["report"]["pending_documents"] == ["BANK_STATEMENT"]
+
+    api_client.put(url, {"pending_documents": []}, format="json")
+    assert Report.objects.get(pk=report.pk).pending_documents == ["BANK_STATEMENT"]
+
+
+@pytest.mark.django_db
+def test_unconfirmed_uploads_stay_pending(api_client, user):
+    """A presigned but unconfirmed document does not count as received when the list is recomputed."""
+    report = Report.objects.create(user=user, services=["BUREAU_REPORT"], target_entity_name="T",
+                                   target_entity_pan="ABCDE1234F", pending_documents=["PAN_CARD"],
+                                   status="DOC_PENDING")
+    upload(api_client, report.id, "PAN_CARD")
+
+    response = api_client.put(reverse("edit-report", args=[report.id]),
+                              {"services": ["BUREAU_REPORT", "BANK_REF_CHECK"]}, format="json")
+    assert response.data["report"]["pending_documents"] == ["PAN_CARD", "BANK_STATEMENT"]
+
+    Report.objects.filter(pk=report.pk).update(pending_documents=[])
+    call_command("rebuild_pending_documents")
+    assert Report.objects.get(pk=report.pk).pending_documents == ["PAN_CARD", "BANK_STATEMENT"]
+
+
+@pytest.mark.django_db
+def test_rebuild_command_applies_changed_rules(user, settings):
+    """After the rules change, the command brings open reports up to date."""
+    open_report = Report.objects.create(user=user, services=["BUREAU_REPORT"], target_entity_name="T",
+                                        target_entity_pan="ABCDE1234F", status="DOC_PENDING")
+    done = Report.objects.create(user=user, services=["BUREAU_REPORT"], target_entity_name="T",
+                                 target_entity_pan="ABCDE1234F", status="COMPLETED")
+    settings.REQUIRED_DOCUMENTS = {"BUREAU_REPORT": ["PAN_CARD", "BANK_STATEMENT"]}
+
+    call_command("rebuild_pending_documents", batch_size=1)
+    assert Report.objects.get(pk=open_report.pk).pending_documents == ["PAN_CARD", "BANK_STATEMENT"]
+    assert Report.objects.get(pk=done.pk).pending_documents == []
@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from backend.models import Report
+from backend.services import event_stream as events
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+@pytest.fixture
+def broker(settings):
+    settings.EVENT_STREAM_QUEUE_SIZE = 3
+    broker = events.InMemoryBroker(queue_size=3)
+    events.set_event_broker(broker)
+    yield broker
+    events.set_event_broker(None)
+
+
+def token(user):
+    return str(IndexedRefreshToken.for_user(user).access_token)
+
+
+async def read(stream, count):
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(count)]
+
+
+@pytest.mark.django_db
+def test_stream_delivers_only_the_entitys_events(broker, user):
+    """An open stream receives its entity's events, nothing for other entities, and unsubscribes on close."""
+    headers = {"Authorization": f"Bearer {token(user)}", "Accept-Encoding": "gzip"}
+
+    async def scenario():
+        response = await AsyncClient().get(reverse("report-events"), headers=headers)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        # Compression would hold events back in the gzip buffer
+        assert "Content-Encoding" not in response
+        stream = aiter(response.streaming_content)
+        assert (await read(stream, 1))[0].startswith(b"retry: ")
+
+        broker.fanout.dispatch(events.report_event(user.entity_id + 1, "report.created", 1))
+        broker.fanout.dispatch(events.report_event(user.entity_id, "report.created", 2, status="REQUEST_RAISED"))
+        chunk = (await read(stream, 1))[0]
+        assert chunk.startswith(b"event: report.created\n")
+        assert b'"report_id":2' in chunk and b'"status":"REQUEST_RAISED"' in chunk
+
+        assert broker.fanout.count() == 1
+        # What the ASGI handler does when the client goes away
+        response.close()
+        assert broker.fanout.count() == 0
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_stream_requires_authentication(broker):
+    """Anonymous requests are refused before a subscription is made."""
+    assert APIClient().get(reverse("report-events")).status_code == 401
+    assert broker.fanout.count() == 0
+
+
+def test_slow_subscriber_gets_one_resync(broker):
+    """A full queue is replaced by a single resync event instead of growing."""
+    async def scenario():
+        subscription = broker.subscribe(1)
+        for report_id in range(10):
+            broker.fanout.dispatch(events.report_event(1, "report.updated", report_id))
+        await asyncio.sleep(0)
+        assert await subscription.get() is events.RESYNC
+        assert subscription.queue.empty()
+
+        broker.fanout.dispatch(events.report_event(1, "report.updated", 11))
+        await asyncio.sleep(0)
+        assert (await subscription.get())["report_id"] == 11
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_views_publish_after_commit(broker, user, django_capture_on_commit_callbacks):
+    """Creating and cancelling a report publish events once their transactions commit."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(user)}")
+    published = []
+    broker.fanout.dispatch = published.append
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("initiate-request"), {
+            "entity_name": "Target", "entity_pan": "ABCDE1234F", "services": ["BUREAU_REPORT"], "credits": 10,
+        }, format="json")
+    assert response.status_code == 201
+    report = Report.objects.get()
+    assert published == [events.report_event(user.entity_id, "report.created", report.id, status="REQUEST_RAISED")]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.patch(reverse("delete-report", args=[report.id]), {"cancellation_reason": "Duplicate"})
+    assert response.status_code == 200
+    assert published[-1] == events.report_event(user.entity_id, "report.status_changed", report.id, status="CANCELLED")
+
+
+def test_postgres_broker_batches_notify_payloads(monkeypatch):
+    """Events are packed into as few NOTIFY payloads as fit under the size limit."""
+    sent = []
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            sent.append(params[1])
+
+    monkeypatch.setattr(events, "connection", Connection())
+    events.PostgresBroker().publish([events.report_event(1, "report.updated", i, note="x" * 1000) for i in range(10)])
+    assert len(sent) == 2
+    assert all(len(payload) <= events.MAX_NOTIFY_PAYLOAD for payload in sent)
+
+
+def test_listener_connects_with_djangos_connection_params(monkeypatch):
+    """The LISTEN connection keeps OPTIONS such as sslmode, and drops the sync cursor Django adds."""
+
+    class Connection:
+        def get_connection_params(self):
+            return {"dbname": "credmatrix", "host": "db", "sslmode": "require", "client_encoding": "UTF8",
+                    "cursor_factory": object, "context": object()}
+
+    monkeypatch.setattr(events, "connection", Connection())
+    assert events.PostgresBroker()._conninfo() == {
+        "dbname": "credmatrix", "host": "db", "sslmode": "require", "client_encoding": "UTF8",
+    }
+
+
+def test_memory_broker_is_flagged_outside_debug(settings):
+    """The event broker system check warns only for the in-process broker with DEBUG off."""
+    settings.EVENT_BROKER = "memory"
+    settings.DEBUG = True
+    assert events.check_event_broker(None) == []
+    settings.DEBUG = False
+    assert [message.id for message in events.check_event_broker(None)] == ["backend.W002"]
+    settings.EVENT_BROKER = "postgres"
+    assert events.check_event_broker(None) == []
@@ -0,0 +1,93 @@
+import os
+import pytest
+from django.urls import reverse
+from backend.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_render_counters_and_histograms():
+    """Counters and cumulative histogram buckets render in the Prometheus text format."""
+    registry = MetricsRegistry()
+    counter = Counter('jobs_total', 'Jobs run', ['queue'], registry=registry)
+    histogram = Histogram('job_seconds', 'Job time', buckets=(0.1, 1.0), registry=registry)
+
+    counter.labels('default').inc()
+    counter.labels('default').inc(2)
+    counter.labels('say "hi"').inc()
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    body = registry.render()
+    assert '# TYPE jobs_total counter' in body
+    assert 'jobs_total{queue="default"} 3.0' in body
+    assert 'jobs_total{queue="say \\"hi\\""} 1.0' in body
+    assert 'job_seconds_bucket{le="0.1"} 1.0' in body
+    assert 'job_seconds_bucket{le="1.0"} 2.0' in body
+    assert 'job_seconds_bucket{le="+Inf"} 3.0' in body
+    assert 'job_seconds_count 3.0' in body
+    assert 'job_seconds_sum 5.55' in body
+
+
+def test_labels_are_validated_and_duplicates_rejected():
+    """Wrong label counts and duplicate metric names fail loudly."""
+    registry = MetricsRegistry()
+    counter = Counter('calls_total', 'Calls', ['operation', 'outcome'], registry=registry)
+
+    with pytest.raises(ValueError):
+        counter.labels('create')
+    with pytest.raises(ValueError):
+        Counter('calls_total', 'Again', registry=registry)
+
+
+def test_multiprocess_snapshots_are_merged(settings, tmp_path):
+    """Each process writes its own snapshot and a scrape sums all of them."""
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    workers = [MetricsRegistry(), MetricsRegistry()]
+    for number, registry in enumerate(workers, start=1):
+        counter = Counter('orders_total', 'Orders', ['status'], registry=registry)
+        histogram = Histogram('order_seconds', 'Order time', buckets=(1.0,), registry=registry)
+        counter.labels('paid').inc(number)
+        histogram.observe(0.5 * number)
+        registry._token = f"worker{number}"
+        registry.flush()
+
+    assert len(os.listdir(tmp_path)) == 2
+    body = workers[0].render()
+    assert 'orders_total{status="paid"} 3.0' in body
+    assert 'order_seconds_bucket{le="1.0"} 2.0' in body
+    assert 'order_seconds_sum 1.5' in body
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_request_latency(api_client, settings):
+    """Requests are recorded per view and exposed on /metrics."""
+    settings.DEBUG = True
+    api_client.get(reverse('schema'))
+
+    response = api_client.get(reverse('metrics'))
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode()
+    assert 'http_request_duration_seconds_count{view="schema",method="GET"}' in body
+    assert 'http_requests_total{view="schema",method="GET",status="200"}' in body
+    assert '# TYPE smtp_sends_total counter' in body
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_requires_token_when_configured(api_client, settings):
+    """With METRICS_AUTH_TOKEN set, scrapes must present it."""
+    settings.METRICS_AUTH_TOKEN = 'scrape-secret'
+
+    assert api_client.get(reverse('metrics')).status_code == 401
+    response = api_client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_fails_closed_without_token(api_client, settings):
+    """Outside DEBUG, an unconfigured METRICS_AUTH_TOKEN disables scrapes instead of opening them."""
+    settings.DEBUG = False
+    settings.METRICS_AUTH_TOKEN = ''
+
+    assert api_client.get(reverse('metrics')).status_code == 403
@@ -0,0 +1,184 @@
+import pytest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core import mail
+from django.db import connection, connections, transaction
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from backend.models import Entity, Notification, NotificationPreference, Report, ReportLifecycleEvent, User
+from backend.services import notification_service
+from backend.services.notification_service import fan_out_lifecycle_events, send_notification_digests
+from backend.services.report_status_service import transition
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+@pytest.fixture
+def entity():
+    return Entity.objects.create(name="Notify Entity", entity_type="BANK")
+
+
+def make_user(entity, name, **preference):
+    user = User.objects.create(username=f"{name}@example.com", email=f"{name}@example.com", entity=entity)
+    if preference:
+        NotificationPreference.objects.create(user=user, **preference)
+    return user
+
+
+def make_report(user, status="UNDER_ASSESMENT"):
+    return Report.objects.create(user=user, status=status, services=["BUREAU_REPORT"],
+                                 target_entity_name="Target", target_entity_pan="ABCDE1234F")
+
+
+@pytest.mark.django_db
+def test_only_notified_statuses_are_recorded(entity):
+    """Transitions into notified statuses add one event row; others add none."""
+    owner = make_user(entity, "owner")
+    report = make_report(owner)
+
+    transition(report, "REQUEST_RAISED", owner)
+    assert not ReportLifecycleEvent.objects.exists()
+    transition(report, "UNDER_ASSESMENT", owner)
+    transition(report, "DOC_PENDING", owner)
+    assert list(ReportLifecycleEvent.objects.values_list("report_id", "status")) == [(report.id, "DOC_PENDING")]
+
+
+@pytest.mark.django_db
+def test_fan_out_respects_preferences(entity):
+    """Every active entity member is a recipient unless their preferences exclude the status."""
+    owner = make_user(entity, "owner")
+    make_user(entity, "muted", enabled=False)
+    make_user(entity, "completed-only", statuses=["COMPLETED"])
+    User.objects.create(username="gone@example.com", email="gone@example.com", entity=entity, is_active=False)
+    make_user(Entity.objects.create(name="Elsewhere", entity_type="BANK"), "outsider")
+    report = make_report(owner)
+    transition(report, "DOC_PENDING", owner)
+    transition(report, "UNDER_ASSESMENT", owner)
+    transition(report, "COMPLETED", owner)
+
+    assert fan_out_lifecycle_events(batch_size=1) == 3
+    assert not ReportLifecycleEvent.objects.exists()
+    recipients = sorted(Notification.objects.values_list("user__username", "status"))
+    assert recipients == [
+        ("completed-only@example.com", "COMPLETED"),
+        ("owner@example.com", "COMPLETED"),
+        ("owner@example.com", "DOC_PENDING"),
+    ]
+
+
+@pytest.mark.django_db
+def test_digests_wait_for_each_users_window(entity, settings):
+    """Notifications are held until the recipient's window passes, then sent as one email."""
+    settings.NOTIFICATION_DIGEST_MINUTES = 30
+    hourly = make_user(entity, "hourly", digest_minutes=60)
+    default = make_user(entity, "default")
+    reports = [make_report(default) for _ in range(3)]
+    started = now() - timedelta(minutes=45)
+    for user in (hourly, default):
+        Notification.objects.bulk_create(
+            Notification(user=user, report=report, status="COMPLETED", created_at=started) for report in reports
+        )
+
+    assert send_notification_digests(batch_size=1, max_workers=2) == 1
+    assert [message.to for message in mail.outbox] == [["default@example.com"]]
+    assert mail.outbox[0].subject == "CredMatrix: 3 report updates"
+    assert all(f"Report #{report.id} (Target): COMPLETED" in mail.outbox[0].body for report in reports)
+    assert list(Notification.objects.values_list("user_id", flat=True).distinct()) == [hourly.id]
+
+    assert send_notification_digests(at=now() + timedelta(minutes=20)) == 1
+    assert mail.outbox[1].to == ["hourly@example.com"]
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_digests_stay_pending(entity, monkeypatch):
+    """A digest that could not be sent is kept for the next run; muted users' notifications are dropped."""
+    sender = make_user(entity, "sender", digest_minutes=1)
+    muted = make_user(entity, "muted", digest_minutes=1)
+    report = make_report(sender)
+    earlier = now() - timedelta(minutes=5)
+    Notification.objects.create(user=sender, report=report, status="COMPLETED", created_at=earlier)
+    Notification.objects.create(user=muted, report=report, status="COMPLETED", created_at=earlier)
+    NotificationPreference.objects.filter(user=muted).update(enabled=False)
+    monkeypatch.setattr(notification_service, "send_emails", lambda emails: [False] * len(emails))
+
+    assert send_notification_digests() == 0
+    assert list(Notification.objects.values_list("user_id", "claimed_by")) == [(sender.id, None)]
+
+
+@pytest.mark.django_db
+def test_claimed_notifications_are_skipped_until_stale(entity, settings):
+    """Notifications another run has claimed are left to it unless its claim has gone stale."""
+    settings.NOTIFICATION_CLAIM_MINUTES = 15
+    user = make_user(entity, "claimed", digest_minutes=1)
+    Notification.objects.create(user=user, report=make_report(user), status="COMPLETED",
+                                created_at=now() - timedelta(minutes=5), claimed_by=uuid.uuid4(), claimed_at=now())
+
+    assert send_notification_digests() == 0
+    assert Notification.objects.exists()
+
+    Notification.objects.update(claimed_at=now() - timedelta(minutes=20))
+    assert send_notification_digests() == 1
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_digests_are_sent_outside_transactions(entity, monkeypatch):
+    """SMTP sends run after the claim has committed, holding no transaction or row locks."""
+    user = make_user(entity, "outside", digest_minutes=1)
+    Notification.objects.create(user=user, report=make_report(user), status="COMPLETED",
+                                created_at=now() - timedelta(minutes=5))
+    # The sends run on worker threads; check the connection of the thread running the digest
+    runner = connections["default"]
+    depth = len(runner.atomic_blocks)
+    send_emails = notification_service.send_emails
+
+    def send_outside_transactions(emails):
+        assert len(runner.atomic_blocks) == depth
+        return send_emails(emails)
+
+    monkeypatch.setattr(notification_service, "send_emails", send_outside_transactions)
+    assert send_notification_digests(max_workers=1) == 1
+
+
+def _send_digests_in_new_connection():
+    try:
+        return send_notification_digests()
+    finally:
+        connection.close()
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="SKIP LOCKED needs row locks, which SQLite does not have")
+@pytest.mark.django_db(transaction=True)
+def test_locked_notifications_are_skipped(entity):
+    """A run skips notifications whose rows another run's claim transaction has locked."""
+    user = make_user(entity, "locked", digest_minutes=1)
+    Notification.objects.create(user=user, report=make_report(user), status="COMPLETED",
+                                created_at=now() - timedelta(minutes=5))
+
+    with transaction.atomic():
+        list(Notification.objects.select_for_update())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(_send_digests_in_new_connection).result() == 0
+
+    assert send_notification_digests() == 1
+
+
+@pytest.mark.django_db
+def test_preferences_endpoint(entity):
+    """Users read their defaults and update their preferences without touching other users."""
+    user = make_user(entity, "prefs")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+    url = reverse("notification-preferences")
+
+    assert client.get(url).json() == {"enabled": True, "statuses": [], "digest_minutes": None}
+    assert client.put(url, {"statuses": ["CANCELLED"]}, format="json").status_code == 400
+    assert client.put(url, {"digest_minutes": 0}, format="json").status_code == 400
+
+    response = client.put(url, {"statuses": ["DOC_PENDING"], "digest_minutes": 120}, format="json")
+    assert response.status_code == 200
+    assert response.json() == {"enabled": True, "statuses": ["DOC_PENDING"], "digest_minutes": 120}
+    assert client.put(url, {"enabled": False}, format="json").json()["statuses"] == ["DOC_PENDING"]
+    assert NotificationPreference.objects.get().user == user
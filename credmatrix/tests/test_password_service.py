@@ -0,0 +1,92 @@
+import threading
+import pytest
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from backend.services.password_service import HashingPoolSaturated, PasswordHashingPool
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_counters():
+    """Keep login throttling state from leaking between tests."""
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_login_through_hashing_pool(api_client, user):
+    """Valid credentials return tokens, invalid ones are rejected."""
+    response = api_client.post(reverse("login"), {"email": user.email, "password": "securepassword"})
+    assert response.status_code == 200
+    assert "access" in response.data
+
+    response = api_client.post(reverse("login"), {"email": user.email, "password": "wrong"})
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_login(user):
+    """The async login path returns the same payload as the sync one."""
+    client = Client()
+    response = client.post(
+        reverse("login-async"),
+        {"email": user.email, "password": "securepassword"},
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert "refresh" in response.json()
+
+    response = client.post(
+        reverse("login-async"),
+        {"email": "nobody@example.com", "password": "securepassword"},
+        content_type="application/json",
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_login_rehashes_outdated_password(api_client, user):
+    """A hash with an old work factor is upgraded on successful login."""
+    user.password = PBKDF2PasswordHasher().encode("securepassword", "oldsalt", iterations=1000)
+    user.save(update_fields=["password"])
+
+    response = api_client.post(reverse("login"), {"email": user.email, "password": "securepassword"})
+    assert response.status_code == 200
+
+    user.refresh_from_db()
+    assert user.password.split("$")[1] == str(PBKDF2PasswordHasher.iterations)
+    assert user.check_password("securepassword")
+
+
+def test_pool_rejects_work_beyond_capacity():
+    """Admission control fails fast once max_pending calls are in flight."""
+    pool = PasswordHashingPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    future = pool.submit(release.wait)
+
+    with pytest.raises(HashingPoolSaturated):
+        pool.submit(release.wait)
+
+    release.set()
+    assert future.result() is True
+
+
+@pytest.mark.django_db
+def test_failed_logins_send_user_login_failed(api_client, user):
+    """Both login paths go through authenticate(), so failure signal receivers run."""
+    from django.contrib.auth.signals import user_login_failed
+
+    failures = []
+
+    def receiver(credentials, **kwargs):
+        failures.append(credentials["username"])
+
+    user_login_failed.connect(receiver)
+    try:
+        assert api_client.post(reverse("login"), {"email": user.email, "password": "wrong"}).status_code == 401
+        response = Client().post(reverse("login-async"), {"email": "nobody@example.com", "password": "x"},
+                                 content_type="application/json")
+        assert response.status_code == 401
+    finally:
+        user_login_failed.disconnect(receiver)
+    assert failures == [user.email, "nobody@example.com"]
@@ -0,0 +1,78 @@
+import pytest
+import requests
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.urls import reverse
+from backend.models import Entity, Payment
+from backend.services.payment_gateway import (
+    CircuitBreaker,
+    GatewayUnavailable,
+    RazorpayGateway,
+    StubPaymentGateway,
+    set_payment_gateway,
+)
+
+
+@pytest.fixture
+def stub_gateway():
+    """Route payment views to an offline gateway."""
+    cache.clear()
+    gateway = StubPaymentGateway()
+    set_payment_gateway(gateway)
+    yield gateway
+    set_payment_gateway(None)
+
+
+def test_breaker_opens_and_half_opens(monkeypatch):
+    """The breaker rejects calls after the threshold and retries after the timeout."""
+    clock = [100.0]
+    monkeypatch.setattr("backend.services.payment_gateway.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record(False)
+    assert breaker.allow() is True
+    breaker.record(False)
+    assert breaker.allow() is False
+
+    clock[0] += 10
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record(True)
+    assert breaker.allow() is True
+
+
+def test_gateway_fails_fast_when_circuit_open():
+    """Network errors surface as GatewayUnavailable and stop reaching the network."""
+    calls = []
+
+    def failing_create(data):
+        calls.append(data)
+        raise requests.ConnectionError("down")
+
+    gateway = RazorpayGateway("key", "secret", failure_threshold=2)
+    gateway._client = SimpleNamespace(order=SimpleNamespace(create=failing_create))
+
+    for _ in range(3):
+        with pytest.raises(GatewayUnavailable):
+            gateway.create_order(100, "INR", "r")
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("user", [{"credits": 0}], indirect=True)
+def test_create_and_verify_order_with_stub(api_client, user, stub_gateway):
+    """Orders created offline can be verified and credit the entity."""
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("create-order"), {"amount": 250}, format="json")
+    assert response.status_code == 200
+    order_id = response.data["order_id"]
+    assert Payment.objects.get(order_id=order_id).amount == 25000
+
+    payload = {"order_id": order_id, "payment_id": "pay_1", "signature": stub_gateway.sign(order_id, "pay_1")}
+    response = api_client.post(reverse("verify-payment"), payload, format="json")
+    assert response.status_code == 200
+    assert Entity.objects.get(pk=user.entity_id).credits == 250
+
+    payload["signature"] = "forged"
+    assert api_client.post(reverse("verify-payment"), payload, format="json").status_code == 401
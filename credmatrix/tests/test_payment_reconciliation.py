@@ -0,0 +1,54 @@
+import pytest
+from datetime import timedelta
+from backend.models import Entity, Payment
+from backend.services.payment_gateway import StubPaymentGateway, set_payment_gateway
+from backend.services.payment_service import reconcile_pending_payments
+
+
+@pytest.fixture
+def stub_gateway(settings):
+    settings.PAISE_PER_CREDIT = 100
+    gateway = StubPaymentGateway()
+    set_payment_gateway(gateway)
+    yield gateway
+    set_payment_gateway(None)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("user", [{"credits": 0}], indirect=True)
+def test_reconcile_settles_pending_payments(stub_gateway, user):
+    """Captured orders complete and credit, failed ones fail, open ones stay pending."""
+    for i in range(5):
+        Payment.objects.create(user=user, order_id=f"order_paid_{i}", amount=10000)
+    Payment.objects.create(user=user, order_id="order_failed", amount=10000)
+    Payment.objects.create(user=user, order_id="order_open", amount=10000)
+    Payment.objects.create(user=user, order_id="order_done", amount=10000, status="completed", payment_id="pay_done")
+
+    for i in range(5):
+        stub_gateway.payments[f"order_paid_{i}"] = [
+            {"id": f"pay_fail_{i}", "status": "failed"},
+            {"id": f"pay_ok_{i}", "status": "captured"},
+        ]
+    stub_gateway.payments["order_failed"] = [{"id": "pay_x", "status": "failed"}]
+    stub_gateway.payments["order_done"] = [{"id": "pay_done", "status": "captured"}]
+
+    assert reconcile_pending_payments(chunk_size=2, max_workers=2, older_than=timedelta(0)) == 6
+
+    assert Payment.objects.get(order_id="order_paid_3").payment_id == "pay_ok_3"
+    assert Payment.objects.filter(status="completed").count() == 6
+    assert Payment.objects.get(order_id="order_failed").status == "failed"
+    assert Payment.objects.get(order_id="order_open").status == "pending"
+    assert Entity.objects.get(pk=user.entity_id).credits == 500
+
+    # A second run finds nothing new and grants nothing twice
+    assert reconcile_pending_payments(chunk_size=2, older_than=timedelta(0)) == 0
+    assert Entity.objects.get(pk=user.entity_id).credits == 500
+
+
+@pytest.mark.django_db
+def test_reconcile_skips_recent_payments(stub_gateway, user):
+    """Payments newer than the cutoff are left for the client to verify."""
+    Payment.objects.create(user=user, order_id="order_new", amount=10000)
+    stub_gateway.payments["order_new"] = [{"id": "pay_new", "status": "captured"}]
+
+    assert reconcile_pending_payments(older_than=timedelta(minutes=30)) == 0
@@ -0,0 +1,86 @@
+import hashlib
+import hmac
+import json
+import pytest
+from django.urls import reverse
+from backend.models import Entity, Payment, PaymentEvent, User
+from backend.services.payment_service import complete_payment, process_payment_event
+
+WEBHOOK_SECRET = "test-webhook-secret"
+
+
+@pytest.fixture(autouse=True)
+def webhook_settings(settings):
+    settings.RAZORPAY_WEBHOOK_SECRET = WEBHOOK_SECRET
+    settings.PAISE_PER_CREDIT = 100
+
+
+@pytest.fixture
+def payment():
+    entity = Entity.objects.create(name="Payer Entity", entity_type="STARTUP")
+    user = User.objects.create_user(username="payer@example.com", email="payer@example.com", password="pw", entity=entity)
+    return Payment.objects.create(user=user, order_id="order_123", amount=50000)
+
+
+def captured_event(order_id="order_123", payment_id="pay_123"):
+    return json.dumps({
+        "event": "payment.captured",
+        "payload": {"payment": {"entity": {"id": payment_id, "order_id": order_id, "status": "captured"}}},
+    }).encode()
+
+
+def post_webhook(api_client, body, event_id="evt_1", secret=WEBHOOK_SECRET):
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return api_client.generic(
+        "POST",
+        reverse("razorpay-webhook"),
+        body,
+        content_type="application/json",
+        HTTP_X_RAZORPAY_SIGNATURE=signature,
+        HTTP_X_RAZORPAY_EVENT_ID=event_id,
+    )
+
+
+@pytest.mark.django_db
+def test_webhook_rejects_bad_signature(api_client, payment):
+    """Events signed with the wrong secret are not stored."""
+    response = post_webhook(api_client, captured_event(), secret="wrong")
+    assert response.status_code == 400
+    assert not PaymentEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_webhook_stores_event_once_and_queues_it(api_client, payment, django_capture_on_commit_callbacks):
+    """Redelivered events are stored once and queued again only until they are processed."""
+    with django_capture_on_commit_callbacks() as callbacks:
+        assert post_webhook(api_client, captured_event()).status_code == 200
+        assert post_webhook(api_client, captured_event()).status_code == 200
+    assert PaymentEvent.objects.count() == 1
+    assert len(callbacks) == 2
+
+    process_payment_event("evt_1")
+    with django_capture_on_commit_callbacks() as callbacks:
+        assert post_webhook(api_client, captured_event()).status_code == 200
+    assert callbacks == []
+
+
+@pytest.mark.django_db
+def test_webhook_rejects_non_object_payload(api_client):
+    """A signed body that is JSON but not an object is a bad request, not a server error."""
+    assert post_webhook(api_client, b"[]").status_code == 400
+    assert not PaymentEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_processing_credits_entity_once(api_client, payment):
+    """Replaying the event or verifying afterwards never credits twice."""
+    post_webhook(api_client, captured_event())
+
+    assert process_payment_event("evt_1") is True
+    assert process_payment_event("evt_1") is False
+    complete_payment("order_123", "pay_123")
+
+    payment.refresh_from_db()
+    assert payment.status == "completed"
+    assert payment.payment_id == "pay_123"
+    assert Entity.objects.get(pk=payment.user.entity_id).credits == 500
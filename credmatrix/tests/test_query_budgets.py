@@ -0,0 +1,131 @@
+import hashlib
+import hmac
+import json
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from backend.models import OTP, Document, Report, ReportImport
+from backend.services.payment_gateway import StubPaymentGateway, set_payment_gateway
+from backend.services.token_blacklist_service import IndexedRefreshToken, token_blacklist_index
+from backend.views.auth_views import get_group_id
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(settings):
+    settings.RAZORPAY_WEBHOOK_SECRET = "budget-secret"
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    cache.clear()
+    token_blacklist_index.reset()
+    get_group_id.cache_clear()
+    get_group_id("User")  # budgets describe a warm process
+    gateway = StubPaymentGateway()
+    set_payment_gateway(gateway)
+    yield gateway
+    set_payment_gateway(None)
+    token_blacklist_index.reset()
+    get_group_id.cache_clear()
+
+
+@pytest.fixture
+def report(user):
+    """Several reports with documents, so N+1 queries would exceed the budgets."""
+    reports = []
+    for _ in range(3):
+        report = Report.objects.create(user=user, agent=user, status="REQUEST_RAISED", services=["BUREAU_REPORT"],
+                                       target_entity_name="Target", target_entity_pan="ABCDE1234F")
+        for i in range(3):
+            Document.objects.create(report=report, user=user, s3_path=f"{user.id}/{report.id}/doc{i}.pdf")
+        reports.append(report)
+    return reports[0]
+
+
+def webhook_request(client):
+    body = json.dumps({"event": "payment.captured", "payload": {}}).encode()
+    signature = hmac.new(b"budget-secret", body, hashlib.sha256).hexdigest()
+    return client.generic("POST", reverse("razorpay-webhook"), body, content_type="application/json",
+                          HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID="evt_budget")
+
+
+def route_requests(user, report, gateway):
+    """One representative request per route name in backend/urls.py."""
+    anon = APIClient()
+    auth = APIClient()
+    auth.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+    OTP.objects.create(email="fresh@example.com", otp="123456")
+    auth.post(reverse("create-order"), {"amount": 10}, format="json")
+    order_id = user.payments.get().order_id
+    user.groups.add(Group.objects.get_or_create(name="admin")[0])
+    Report.objects.create(user=user, status="REQUEST_RAISED", services=["BUREAU_REPORT"],
+                          target_entity_name="Queued", target_entity_pan="ABCDE1234F")
+    pending_import = ReportImport.objects.create(user=user, s3_path="targets.csv", file_format="CSV")
+    claimed = Report.objects.create(user=user, agent=user, status="UNDER_ASSESMENT", services=["BUREAU_REPORT"],
+                                    target_entity_name="Claimed", target_entity_pan="ABCDE1234F")
+
+    return {
+        "signup": lambda: anon.post(reverse("signup"), {
+            "email": "fresh@example.com", "password": "pw12345678", "name": "Fresh",
+            "entity_name": "Fresh Co", "entity_type": "STARTUP", "otp": "123456"}),
+        "login": lambda: anon.post(reverse("login"), {"email": user.email, "password": "securepassword"}),
+        "login-async": lambda: anon.post(reverse("login-async"), {"email": user.email, "password": "securepassword"}, format="json"),
+        "logout": lambda: anon.post(reverse("logout"), {"refresh": str(IndexedRefreshToken.for_user(user))}),
+        "otp": lambda: anon.post(reverse("otp"), {"email": "otp@example.com"}),
+        "token-refresh": lambda: anon.post(reverse("token-refresh"), {"refresh": str(IndexedRefreshToken.for_user(user))}),
+        "schema": lambda: anon.get(reverse("schema")),
+        "swagger-ui": lambda: anon.get(reverse("swagger-ui")),
+        "get-reports": lambda: auth.get(reverse("get-reports")),
+        "edit-report": lambda: auth.put(reverse("edit-report", args=[report.id]), {"target_entity_name": "Renamed"}, format="json"),
+        "delete-report": lambda: auth.patch(reverse("delete-report", args=[report.id]), {"cancellation_reason": "No longer needed"}),
+        "initiate-request": lambda: auth.post(reverse("initiate-request"), {
+            "entity_name": "Target", "entity_pan": "ABCDE1234F", "services": ["BUREAU_REPORT"], "credits": 10},
+            format="json"),
+        "create-report-import": lambda: auth.post(reverse("create-report-import"), {"file_name": "targets.csv"}),
+        "start-report-import": lambda: auth.post(reverse("start-report-import", args=[pending_import.id])),
+        "report-import-status": lambda: auth.get(reverse("report-import-status", args=[pending_import.id])),
+        "reports-async": lambda: auth.get(reverse("reports-async")),
+        "report-detail-async": lambda: auth.get(reverse("report-detail-async", args=[report.id])),
+        "report-activities-async": lambda: auth.get(reverse("report-activities-async", args=[report.id])),
+        "report-documents-async": lambda: auth.get(reverse("report-documents-async", args=[report.id])),
+        "report-events": lambda: auth.get(reverse("report-events")),
+        "upload-document": lambda: auth.post(reverse("upload-document"), {"document_name": "bank.pdf", "report_id": report.id}),
+        "confirm-document-upload": lambda: auth.post(reverse("confirm-document-upload"), {"document_id": report.documents.first().id}),
+        "notification-preferences": lambda: auth.put(reverse("notification-preferences"), {"digest_minutes": 60},
+                                                     format="json"),
+        "usage-analytics": lambda: auth.get(reverse("usage-analytics"), {"start": "2025-07-01", "end": "2025-07-31"}),
+        "create-order": lambda: auth.post(reverse("create-order"), {"amount": 10}, format="json"),
+        "verify-payment": lambda: auth.post(reverse("verify-payment"), {
+            "order_id": order_id, "payment_id": "pay_1", "signature": gateway.sign(order_id, "pay_1")}, format="json"),
+        "razorpay-webhook": lambda: webhook_request(anon),
+        "claim-reports": lambda: auth.post(reverse("claim-reports"), {"service": "BUREAU_REPORT", "limit": 5}, format="json"),
+        "release-report": lambda: auth.post(reverse("release-report", args=[claimed.id])),
+    }
+
+
+def backend_route_names():
+    from backend import urls
+    return {pattern.name for pattern in urls.urlpatterns}
+
+
+@pytest.mark.django_db
+def test_every_route_stays_within_query_budget(user, report, isolated_state, assert_query_budget):
+    """Each route in backend/urls.py is exercised and kept within its query budget."""
+    requests = route_requests(user, report, isolated_state)
+    assert set(requests) == backend_route_names(), "add a request for every new route"
+
+    for name, send in requests.items():
+        response = send()
+        assert response.status_code < 500, (name, response.status_code)
+        assert_query_budget(response)
+
+
+@pytest.mark.django_db
+def test_debug_responses_expose_db_stats(user, settings):
+    """With DEBUG on, query stats are returned as response headers."""
+    settings.DEBUG = True
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+
+    response = client.get(reverse("get-reports"))
+    assert response["X-DB-Query-Count"] == str(response.db_stats.query_count)
+    assert "X-DB-Time-Ms" in response
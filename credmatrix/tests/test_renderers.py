@@ -0,0 +1,86 @@
+import gzip
+import json
+import uuid
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from backend.models import Document, Entity, Report, User
+from backend.renderers import ORJSONParser, ORJSONRenderer
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+def test_renderer_matches_drf_output():
+    """Serializer-style payloads render byte-for-byte like DRF's JSONRenderer."""
+    data = [{"id": 1, "services": ["BUREAU_REPORT"], "pending_documents": [], "name": "Crédit", "nested": {"a": None}}]
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_renderer_escapes_javascript_line_terminators():
+    """U+2028 and U+2029 are escaped as DRF does, so the JSON is also valid JavaScript."""
+    data = {"note": "line\u2028break\u2029here"}
+    body = ORJSONRenderer().render(data)
+    assert body == b'{"note":"line\\u2028break\\u2029here"}'
+    assert body == JSONRenderer().render(data)
+    assert json.loads(body) == data
+
+
+def test_renderer_float_format_differs_from_drf():
+    """Floats and Decimals use orjson's exponent format, the one documented difference from DRF."""
+    data = {"small": 12.5, "decimal": Decimal("1E+16")}
+    assert ORJSONRenderer().render(data) == b'{"small":12.5,"decimal":1e16}'
+    assert JSONRenderer().render(data) == b'{"small":12.5,"decimal":1e+16}'
+
+
+def test_renderer_handles_native_and_fallback_types():
+    """Datetimes and UUIDs are native; Decimals and lazy strings use DRF's fallbacks."""
+    ident = uuid.uuid4()
+    body = ORJSONRenderer().render({
+        "at": datetime(2025, 7, 1, 10, 0, tzinfo=timezone.utc),
+        "id": ident,
+        "amount": Decimal("12.50"),
+        "label": gettext_lazy("Reports"),
+        1: "non-string key",
+    })
+    assert json.loads(body) == {
+        "at": "2025-07-01T10:00:00Z", "id": str(ident), "amount": 12.5, "label": "Reports", "1": "non-string key",
+    }
+
+
+def test_renderer_indents_on_request():
+    """An indent media-type parameter produces pretty-printed output."""
+    body = ORJSONRenderer().render({"a": 1}, accepted_media_type="application/json; indent=4")
+    assert body == b'{\n  "a": 1\n}'
+
+
+def test_parser_rejects_invalid_json():
+    """Malformed bodies raise ParseError, which DRF turns into a 400."""
+    assert ORJSONParser().parse(BytesIO(b'{"a": [1, 2]}')) == {"a": [1, 2]}
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(BytesIO(b'{"a": '))
+
+
+@pytest.mark.django_db
+def test_large_responses_are_gzipped_when_accepted():
+    """Report lists are compressed for clients that accept gzip and left alone otherwise."""
+    entity = Entity.objects.create(name="Gzip Entity", entity_type="BANK")
+    user = User.objects.create_user(username="gzip@example.com", email="gzip@example.com", password="pw", entity=entity)
+    for i in range(50):
+        report = Report.objects.create(user=user, agent=user, services=["BUREAU_REPORT"],
+                                       target_entity_name=f"Target {i}", target_entity_pan="ABCDE1234F")
+        Document.objects.create(report=report, user=user, s3_path=f"{user.id}/{report.id}/doc.pdf")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(user).access_token}")
+
+    plain = client.get(reverse("get-reports"))
+    compressed = client.get(reverse("get-reports"), HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+
+    assert "Content-Encoding" not in plain
+    assert compressed["Content-Encoding"] == "gzip"
+    assert len(compressed.content) < len(plain.content) / 3
+    assert json.loads(gzip.decompress(compressed.content)) == plain.json()
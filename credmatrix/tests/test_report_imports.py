@@ -0,0 +1,157 @@
+import io
+import pytest
+from itertools import islice
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from backend import tasks
+from backend.models import Entity, Report, ReportImport, ReportService, Transaction, UsageEvent, User
+from backend.services import import_service
+from backend.services import s3_service as s3_module
+from backend.services.import_service import READ_SIZE, read_rows, run_import
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+HEADER = "Entity Name,PAN,Services\n"
+
+
+@pytest.fixture
+def files(monkeypatch):
+    """Uploaded file contents by S3 key, served by s3_service.open_file."""
+    uploaded = {}
+    monkeypatch.setattr(s3_module.s3_service, "upload_file", lambda key: f"https://upload.example.com/{key}")
+    monkeypatch.setattr(s3_module.s3_service, "open_file", lambda key: io.BytesIO(uploaded[key]))
+    return uploaded
+
+
+def csv_rows(count, services="BUREAU_REPORT"):
+    return "".join(f"Target {i},ABCDE{i:04d}F,{services}\n" for i in range(count))
+
+
+def make_import(user, files, content, file_format="CSV", **fields):
+    fields.setdefault("status", "QUEUED")
+    job = ReportImport.objects.create(user=user, s3_path=f"{user.id}/imports/{len(files)}", file_format=file_format,
+                                      **fields)
+    files[job.s3_path] = content.encode() if isinstance(content, str) else content
+    return job
+
+
+@pytest.mark.django_db
+def test_upload_start_and_poll(api_client, user, files, monkeypatch, django_capture_on_commit_callbacks):
+    """The API hands out an upload URL, queues the import once, and reports per-row results."""
+    assert api_client.post(reverse("create-report-import"), {"file_name": "targets.pdf"}).status_code == 400
+    response = api_client.post(reverse("create-report-import"), {"file_name": "targets.csv"})
+    assert response.status_code == 201
+    job = ReportImport.objects.get(id=response.data["import"]["id"])
+    assert response.data["upload_url"].endswith(job.s3_path) and job.status == "AWAITING_UPLOAD"
+    files[job.s3_path] = (HEADER + "Acme,ABCDE1234F,BUREAU_REPORT; FINANCIAL_INFO\n\n"
+                          + "Bad,ABCDE1235F,NOT_A_SERVICE\nBeta,ABCDE1236F,bank_ref_check\n").encode()
+
+    monkeypatch.setattr(tasks.import_reports, "delay", lambda import_id: run_import(import_id))
+    with django_capture_on_commit_callbacks(execute=True):
+        assert api_client.post(reverse("start-report-import", args=[job.id])).status_code == 202
+    assert api_client.post(reverse("start-report-import", args=[job.id])).status_code == 409
+
+    data = api_client.get(reverse("report-import-status", args=[job.id])).data
+    assert (data["status"], data["rows_processed"], data["reports_created"], data["rows_failed"]) == ("COMPLETED", 3, 2, 1)
+    assert data["credits_spent"] == 20
+    assert [error["row"] for error in data["errors"]] == [4]
+    assert "services" in data["errors"][0]["errors"]
+
+    reports = Report.objects.order_by("id")
+    assert [report.services for report in reports] == [["BUREAU_REPORT", "FINANCIAL_INFO"], ["BANK_REF_CHECK"]]
+    assert {report.status for report in reports} == {"REQUEST_RAISED"}
+    assert ReportService.objects.count() == 3 and Transaction.objects.count() == 2 and UsageEvent.objects.count() == 2
+    assert Entity.objects.get(pk=user.entity_id).credits == user.entity.credits - 20
+
+    outsider = User.objects.create(username="out@example.com", email="out@example.com")
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(outsider).access_token}")
+    assert api_client.get(reverse("report-import-status", args=[job.id])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_queries_per_chunk_do_not_grow_with_rows(user, files):
+    """A chunk is one batch of statements whether it holds 5 rows or 50."""
+    counts = []
+    for rows in (5, 50):
+        job = make_import(user, files, HEADER + csv_rows(rows))
+        with CaptureQueriesContext(connection) as queries:
+            run_import(job.id, chunk_size=rows)
+        assert ReportImport.objects.get(pk=job.pk).reports_created == rows
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_credits_are_checked_per_chunk(user, files):
+    """A chunk the entity cannot pay for is rolled back whole and stops the import."""
+    Entity.objects.filter(pk=user.entity_id).update(credits=45)
+    job = run_import(make_import(user, files, HEADER + csv_rows(7)).id, chunk_size=3)
+    assert job.status == "FAILED" and "rows 5 to 7" in job.failure_reason
+    assert (job.rows_processed, job.reports_created, job.credits_spent) == (3, 3, 30)
+    assert Report.objects.count() == 3
+    assert Entity.objects.get(pk=user.entity_id).credits == 15
+
+
+@pytest.mark.django_db
+def test_rerun_resumes_after_committed_rows(user, files):
+    """An interrupted import skips the rows it already processed; finished imports are left alone."""
+    job = make_import(user, files, HEADER + csv_rows(5), status="RUNNING", rows_processed=2, reports_created=2)
+    job = run_import(job.id, chunk_size=2)
+    assert (job.status, job.rows_processed, job.reports_created) == ("COMPLETED", 5, 5)
+    assert sorted(Report.objects.values_list("target_entity_name", flat=True)) == ["Target 2", "Target 3", "Target 4"]
+
+    run_import(job.id)
+    assert Report.objects.count() == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("content, reason", [
+    ("", "empty"),
+    ("Name,Services\nAcme,BUREAU_REPORT\n", "entity_pan"),
+    (b"Name,PAN,Services\n\xff\xfe,ABCDE1234F,BUREAU_REPORT\n", "UTF-8"),
+])
+def test_unreadable_files_fail_the_import(user, files, content, reason):
+    """Files that cannot be parsed fail with a reason instead of retrying."""
+    job = run_import(make_import(user, files, content).id)
+    assert job.status == "FAILED" and reason in job.failure_reason
+    assert ReportImport.objects.get(pk=job.pk).status == "FAILED"
+
+
+def test_rows_are_parsed_as_the_file_is_read():
+    """Reading the first rows of a large file consumes only the first buffers of it."""
+    stream = io.BytesIO((HEADER + csv_rows(50_000)).encode())
+    first = list(islice(read_rows(stream, "CSV"), 10))
+    assert [row_number for row_number, _ in first] == list(range(2, 12))
+    assert first[0][1] == {"entity_name": "Target 0", "entity_pan": "ABCDE0000F", "services": ["BUREAU_REPORT"]}
+    assert stream.tell() <= 2 * READ_SIZE < len(stream.getvalue())
+
+
+@pytest.mark.django_db
+def test_xlsx_imports(user, files):
+    """Workbooks are read in read-only (streaming) mode, first sheet only."""
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["entity_name", "entity_pan", "services"])
+    sheet.append(["Acme", "ABCDE1234F", "FINANCIAL_INFO"])
+    sheet.append([None, None, None])
+    sheet.append(["Beta", "ABCDE1235F", "BUREAU_REPORT,BANK_REF_CHECK"])
+    content = io.BytesIO()
+    workbook.save(content)
+
+    job = run_import(make_import(user, files, content.getvalue(), file_format="XLSX").id)
+    assert (job.status, job.reports_created, job.credits_spent) == ("COMPLETED", 2, 20)
+
+
+@pytest.mark.django_db
+def test_task_marks_import_failed_after_last_retry(user, files, monkeypatch):
+    """Unexpected errors are retried; once retries run out the import is marked failed."""
+    job = make_import(user, files, HEADER + csv_rows(1))
+
+    def broken(*args, **kwargs):
+        raise ConnectionError("S3 unavailable")
+
+    monkeypatch.setattr(import_service, "run_import", broken)
+    with pytest.raises(ConnectionError):
+        tasks.import_reports.apply(args=[job.id], retries=tasks.import_reports.max_retries, throw=True)
+    assert ReportImport.objects.get(pk=job.pk).status == "FAILED"
@@ -0,0 +1,74 @@
+import importlib
+import pytest
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from backend.models import Report, ReportService
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+@pytest.fixture
+def token(user):
+    return str(IndexedRefreshToken.for_user(user).access_token)
+
+
+def make_report(user, services):
+    return Report.objects.create(user=user, services=services, target_entity_name="Target", target_entity_pan="ABCDE1234F")
+
+
+def links(report):
+    return set(ReportService.objects.filter(report=report).values_list("service", flat=True))
+
+
+@pytest.mark.django_db
+def test_saves_keep_service_rows_in_sync(user, token):
+    """Creating and editing a report mirrors its services; invalid names are rejected."""
+    report = make_report(user, ["BUREAU_REPORT", "FINANCIAL_INFO", "BUREAU_REPORT"])
+    assert links(report) == {"BUREAU_REPORT", "FINANCIAL_INFO"}
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    url = reverse("edit-report", args=[report.id])
+    response = client.put(url, {"services": ["BANK_REF_CHECK"]}, format="json")
+    assert response.status_code == 200
+    assert response.data["report"]["services"] == ["BANK_REF_CHECK"]
+    assert links(report) == {"BANK_REF_CHECK"}
+
+    assert client.put(url, {"services": ["NOT_A_SERVICE"]}, format="json").status_code == 400
+    assert links(report) == {"BANK_REF_CHECK"}
+
+
+@pytest.mark.django_db
+def test_report_lists_filter_by_service(user, token):
+    """Both report lists accept a service filter and reject unknown services."""
+    bureau = make_report(user, ["BUREAU_REPORT", "FINANCIAL_INFO"])
+    make_report(user, ["FINANCIAL_INFO"])
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    response = client.get(reverse("get-reports"), {"service": "BUREAU_REPORT"})
+    assert [report["id"] for report in response.data] == [bureau.id]
+    assert len(client.get(reverse("get-reports"), {"service": "FINANCIAL_INFO"}).data) == 2
+    assert client.get(reverse("get-reports"), {"service": "BOGUS"}).status_code == 400
+
+    get = async_to_sync(AsyncClient().get)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = get(reverse("reports-async"), {"service": "BUREAU_REPORT"}, headers=headers)
+    assert [report["id"] for report in response.json()] == [bureau.id]
+    assert get(reverse("reports-async"), {"service": "BOGUS"}, headers=headers).status_code == 400
+
+
+@pytest.mark.django_db
+def test_backfill_migration_skips_invalid_names(user):
+    """The data migration creates one row per valid, distinct service of existing reports."""
+    report = make_report(user, ["BUREAU_REPORT"])
+    Report.objects.filter(pk=report.pk).update(services=["BUREAU_REPORT", "BUREAU_REPORT", "LEGACY", {"x": 1}])
+    legacy = make_report(user, [])
+    Report.objects.filter(pk=legacy.pk).update(services="FINANCIAL_INFO")
+    ReportService.objects.all().delete()
+
+    migration = importlib.import_module("backend.migrations.0011_report_services")
+    migration.backfill_report_services(apps, None)
+    assert list(ReportService.objects.values_list("report_id", "service")) == [(report.id, "BUREAU_REPORT")]
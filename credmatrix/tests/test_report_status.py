@@ -0,0 +1,123 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils.timezone import now
+from backend.models import Activity, Report
+from backend.services.report_status_service import (
+    InvalidTransition,
+    escalate_sla_breaches,
+    transition,
+)
+
+
+def make_report(user, status, hours_in_status=0):
+    report = Report.objects.create(user=user, status=status, services=["BUREAU_REPORT"],
+                                   target_entity_name="Target", target_entity_pan="ABCDE1234F")
+    Report.objects.filter(pk=report.pk).update(status_changed_at=now() - timedelta(hours=hours_in_status))
+    report.refresh_from_db()
+    return report
+
+
+@pytest.mark.django_db
+def test_transition_follows_allowed_edges(user):
+    """Allowed edges update the status and SLA clock and are logged; others are rejected."""
+    report = make_report(user, "UNDER_ASSESMENT", hours_in_status=10)
+    started = report.status_changed_at
+
+    transition(report, "DOC_PENDING", user)
+    report.refresh_from_db()
+    assert report.status == "DOC_PENDING"
+    assert report.status_changed_at > started
+    activity = Activity.objects.get(report=report)
+    assert (activity.old_state, activity.new_state) == ({"status": "UNDER_ASSESMENT"}, {"status": "DOC_PENDING"})
+
+    with pytest.raises(InvalidTransition):
+        transition(report, "COMPLETED", user)
+
+
+@pytest.mark.django_db
+def test_stale_transition_does_not_apply(user):
+    """A transition based on an outdated status read is refused instead of overwriting."""
+    report = make_report(user, "UNDER_ASSESMENT")
+    stale = Report.objects.get(pk=report.pk)
+    transition(report, "COMPLETED", user)
+
+    with pytest.raises(InvalidTransition):
+        transition(stale, "DOC_PENDING", user)
+    assert Report.objects.get(pk=report.pk).status == "COMPLETED"
+
+
+@pytest.mark.django_db
+def test_edit_view_rejects_disallowed_status(api_client, user):
+    """Status edits go through the state machine; other fields still update."""
+    report = make_report(user, "COMPLETED")
+    url = reverse("edit-report", args=[report.id])
+
+    assert api_client.put(url, {"status": "DRAFT"}, format="json").status_code == 400
+    assert api_client.put(url, {"status": "NOT_A_STATUS"}, format="json").status_code == 400
+    response = api_client.put(url, {"target_entity_name": "Renamed"}, format="json")
+    assert response.status_code == 200
+    assert Report.objects.get(pk=report.pk).status == "COMPLETED"
+
+    report = make_report(user, "DOC_PENDING")
+    response = api_client.put(reverse("edit-report", args=[report.id]),
+                              {"status": "UNDER_ASSESMENT", "target_entity_name": "Back"}, format="json")
+    assert response.status_code == 200
+    assert response.data["report"]["status"] == "UNDER_ASSESMENT"
+    assert response.data["report"]["target_entity_name"] == "Back"
+
+
+@pytest.mark.django_db
+def test_edit_view_keeps_concurrent_changes(api_client, user, monkeypatch):
+    """Editing fields writes only those columns, so a concurrent escalation or claim survives."""
+    from backend.views import user_views
+
+    report = make_report(user, "UNDER_ASSESMENT")
+    escalated_at = now()
+
+    class RacingSerializer(user_views.ReportSerializer):
+        def is_valid(self, **kwargs):
+            Report.objects.filter(pk=report.pk).update(status="DOC_PENDING", escalated_at=escalated_at)
+            return super().is_valid(**kwargs)
+
+    monkeypatch.setattr(user_views, "ReportSerializer", RacingSerializer)
+    response = api_client.put(reverse("edit-report", args=[report.id]), {"target_entity_name": "Renamed"}, format="json")
+    assert response.status_code == 200
+
+    report.refresh_from_db()
+    assert (report.target_entity_name, report.status, report.escalated_at) == ("Renamed", "DOC_PENDING", escalated_at)
+
+
+@pytest.mark.django_db
+def test_cancelling_a_final_report_is_rejected(api_client, user):
+    """Completed and cancelled reports cannot be cancelled: a disallowed edge, not a conflict."""
+    for status in ("COMPLETED", "CANCELLED"):
+        report = make_report(user, status)
+        response = api_client.patch(reverse("delete-report", args=[report.id]), {"cancellation_reason": "Late"})
+        assert response.status_code == 400
+
+    report = make_report(user, "REQUEST_RAISED")
+    response = api_client.patch(reverse("delete-report", args=[report.id]), {"cancellation_reason": "Late"})
+    assert response.status_code == 200
+    activity = Activity.objects.get(report=report)
+    assert activity.old_state == {"status": "REQUEST_RAISED", "cancellation_reason": None}
+
+
+@pytest.mark.django_db
+def test_escalation_flags_only_breaches_in_batches(user, settings):
+    """Reports past their status SLA are flagged once; fresh and exempt ones are not."""
+    settings.REPORT_SLA_HOURS = {"UNDER_ASSESMENT": 48, "DOC_PENDING": 72}
+    overdue = [make_report(user, "UNDER_ASSESMENT", hours_in_status=49) for _ in range(5)]
+    waiting = make_report(user, "DOC_PENDING", hours_in_status=73)
+    fresh = make_report(user, "DOC_PENDING", hours_in_status=1)
+    exempt = make_report(user, "REQUEST_RAISED", hours_in_status=500)
+
+    assert escalate_sla_breaches(batch_size=2) == {"UNDER_ASSESMENT": 5, "DOC_PENDING": 1}
+    assert escalate_sla_breaches(batch_size=2) == {"UNDER_ASSESMENT": 0, "DOC_PENDING": 0}
+    flagged = set(Report.objects.filter(escalated_at__isnull=False).values_list("id", flat=True))
+    assert flagged == {report.id for report in overdue} | {waiting.id}
+    assert fresh.id not in flagged and exempt.id not in flagged
+
+    # Moving on resets the escalation and the SLA clock
+    transition(waiting, "UNDER_ASSESMENT", user)
+    assert Report.objects.get(pk=waiting.pk).escalated_at is None
@@ -0,0 +1,55 @@
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from backend import schema
+
+
+@pytest.fixture(autouse=True)
+def fresh_artifact():
+    schema.schema_artifact.reset()
+    yield
+    schema.schema_artifact.reset()
+
+
+def test_schema_artifact_matches_code():
+    """openapi.json must be regenerated (`manage.py generate_schema`) whenever the API changes."""
+    call_command("generate_schema", "--check")
+
+
+@pytest.mark.django_db
+def test_schema_is_served_from_memory(api_client, monkeypatch):
+    """The committed artifact is served without introspecting the views."""
+    monkeypatch.setattr(schema, "generate_schema", lambda: pytest.fail("schema was regenerated"))
+
+    first = api_client.get(reverse("schema"))
+    second = api_client.get(reverse("schema"), {"format": "json"})
+
+    assert first.status_code == 200
+    assert first["Content-Type"].startswith("application/vnd.oai.openapi")
+    assert b"CredMatrix API" in first.content
+    assert json.loads(second.content)["info"]["title"] == "CredMatrix API"
+    assert first["ETag"] != second["ETag"]
+
+
+@pytest.mark.django_db
+def test_schema_honours_if_none_match(api_client):
+    """A client holding the current ETag gets a 304 with no body."""
+    etag = api_client.get(reverse("schema"))["ETag"]
+
+    response = api_client.get(reverse("schema"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert api_client.get(reverse("schema"), HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+
+
+@pytest.mark.django_db
+def test_schema_generated_on_first_request_without_artifact(api_client, settings, tmp_path):
+    """Without an artifact the schema is generated once, on first use."""
+    settings.OPENAPI_SCHEMA_FILE = tmp_path / "missing.json"
+
+    response = api_client.get(reverse("schema"), {"format": "json"})
+
+    assert response.status_code == 200
+    assert "/api/reports/" in json.loads(response.content)["paths"]
@@ -0,0 +1,27 @@
+import pytest
+from django.contrib.auth import authenticate
+from backend.models import Activity, Document, Entity, Payment, Report, User
+from backend.synthetic_data import DEFAULT_PASSWORD, generate_dataset
+
+
+@pytest.mark.django_db
+def test_generate_dataset_counts():
+    """Row counts match the requested shape across several insert slices."""
+    totals = generate_dataset(5, users_per_entity=2, reports_per_user=3, documents_per_report=2,
+                              activities_per_report=1, payments_per_user=1, batch_size=6, seed=1)
+
+    assert totals['entities'] == Entity.objects.count() == 5
+    assert totals['users'] == User.objects.count() == 10
+    assert totals['reports'] == Report.objects.count() == 30
+    assert totals['documents'] == Document.objects.count() == 60
+    assert totals['activities'] == Activity.objects.count() == 30
+    assert totals['payments'] == Payment.objects.count() == 10
+
+
+@pytest.mark.django_db
+def test_generated_users_can_log_in():
+    """Generated users share the default password."""
+    totals = generate_dataset(1, users_per_entity=1, reports_per_user=1)
+    user = User.objects.get(username__startswith=totals['run'])
+
+    assert authenticate(username=user.username, password=DEFAULT_PASSWORD) == user
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from backend.throttling import CacheWindowCounterBackend
+
+
+@pytest.fixture(autouse=True)
+def clear_counters():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_window_allows_capacity_then_resets():
+    """A window serves `capacity` requests, then denies until the next window starts."""
+    backend = CacheWindowCounterBackend()
+
+    assert [backend.consume("counter", 3, 60, now=120.0)[0] for _ in range(3)] == [True, True, True]
+    allowed, wait = backend.consume("counter", 3, 60, now=150.0)
+    assert allowed is False
+    assert wait == pytest.approx(30.0)
+
+    assert backend.consume("counter", 3, 60, now=180.0)[0] is True
+
+
+def test_concurrent_requests_never_exceed_capacity():
+    """Simultaneous requests against one counter are allowed at most `capacity` times."""
+    backend = CacheWindowCounterBackend()
+    barrier = threading.Barrier(50)
+
+    def consume(_):
+        barrier.wait()
+        return backend.consume("burst", 5, 60, now=0.0)[0]
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        results = list(executor.map(consume, range(200)))
+
+    assert sum(results) == 5
+
+
+def test_evicted_counter_is_denied(monkeypatch):
+    """A counter that disappears between add and incr denies the request with a Retry-After."""
+    backend = CacheWindowCounterBackend()
+
+    def evicted(key, delta=1, version=None):
+        raise ValueError(f"Key '{key}' not found")
+
+    monkeypatch.setattr(cache, "incr", evicted)
+    assert backend.consume("evicted", 5, 60, now=10.0) == (False, pytest.approx(50.0))
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_per_scope(api_client, settings):
+    """Login returns 429 once the scope's window is used up."""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"login": "2/min"},
+    }
+    payload = {"email": "nobody@example.com", "password": "wrongpassword"}
+
+    assert api_client.post(reverse("login"), payload).status_code == 401
+    assert api_client.post(reverse("login"), payload).status_code == 401
+    response = api_client.post(reverse("login"), payload)
+    assert response.status_code == 429
+    assert "Retry-After" in response
+
+
+def test_per_process_cache_is_flagged_outside_debug(settings):
+    """The shared-cache system check warns only when DEBUG is off and the cache is LocMemCache."""
+    from backend.caching import check_shared_cache
+
+    settings.DEBUG = True
+    assert check_shared_cache(None) == []
+    settings.DEBUG = False
+    assert [message.id for message in check_shared_cache(None)] == ["backend.W001"]
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+    assert check_shared_cache(None) == []
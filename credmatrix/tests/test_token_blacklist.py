@@ -0,0 +1,96 @@
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from backend.services.token_blacklist_service import (
+    BloomFilter,
+    IndexedRefreshToken,
+    prune_expired_tokens,
+    token_blacklist_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_index():
+    """Start every test with an empty cache and an unbuilt Bloom filter."""
+    cache.clear()
+    token_blacklist_index.reset()
+    yield
+    cache.clear()
+    token_blacklist_index.reset()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added value must be reported as present."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    values = [f"jti-{i}" for i in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+@pytest.mark.django_db
+def test_refresh_rotates_and_rejects_reuse(api_client, user):
+    """A rotated refresh token cannot be used a second time."""
+    refresh = str(IndexedRefreshToken.for_user(user))
+
+    response = api_client.post(reverse("token-refresh"), {"refresh": refresh})
+    assert response.status_code == 200
+    assert response.data["refresh"] != refresh
+
+    response = api_client.post(reverse("token-refresh"), {"refresh": refresh})
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_index_sees_tokens_blacklisted_elsewhere(user):
+    """Tokens blacklisted outside this process are found after a rebuild."""
+    token = IndexedRefreshToken.for_user(user)
+    jti = token["jti"]
+    assert token_blacklist_index.contains(jti) is False
+
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+    token_blacklist_index.reset()
+
+    assert token_blacklist_index.contains(jti) is True
+
+
+@pytest.mark.django_db
+def test_unblacklisted_lookup_skips_database(user, django_assert_num_queries, monkeypatch):
+    """With a shared cache, lookups for tokens that were never blacklisted are answered in memory."""
+    monkeypatch.setattr(token_blacklist_index, "shared_cache", True)
+    token = IndexedRefreshToken.for_user(user)
+    token_blacklist_index.rebuild()
+
+    with django_assert_num_queries(0):
+        assert token_blacklist_index.contains(token["jti"]) is False
+
+
+@pytest.mark.django_db
+def test_per_process_cache_checks_database_on_bloom_miss(user):
+    """With LocMemCache another worker's blacklisting is seen without waiting for a rebuild."""
+    token = IndexedRefreshToken.for_user(user)
+    token_blacklist_index.rebuild()
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token["jti"]))
+
+    assert token_blacklist_index.contains(token["jti"], token["exp"]) is True
+    assert 0 < cache._expire_info[cache.make_and_validate_key(f"token_blacklist:{token['jti']}")] <= token["exp"]
+
+
+@pytest.mark.django_db
+def test_prune_expired_tokens_in_chunks(user):
+    """Only expired tokens are removed, along with their blacklist entries."""
+    expired = now() - timedelta(hours=1)
+    for i in range(5):
+        outstanding = OutstandingToken.objects.create(user=user, jti=f"old-{i}", token="t", expires_at=expired)
+        BlacklistedToken.objects.create(token=outstanding)
+    OutstandingToken.objects.create(user=user, jti="fresh", token="t", expires_at=now() + timedelta(hours=1))
+
+    assert prune_expired_tokens(chunk_size=2) == 5
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["fresh"]
+    assert not BlacklistedToken.objects.exists()
@@ -0,0 +1,117 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import localdate
+from rest_framework.test import APIClient
+from backend.models import EntityDailyServiceUsage, EntityDailyStatusUsage, EntityDailyUsage, Entity, UsageEvent, User
+from backend.services.assignment_service import claim_reports
+from backend.services.report_status_service import transition
+from backend.services.usage_service import rebuild_usage, roll_up_usage
+from backend.services.token_blacklist_service import IndexedRefreshToken
+
+
+def initiate(api_client, services):
+    response = api_client.post(reverse("initiate-request"), {
+        "entity_name": "Target", "entity_pan": "ABCDE1234F", "services": services, "credits": 0}, format="json")
+    assert response.status_code == 201
+    return response.data["report"]
+
+
+def rollups():
+    return {
+        model.__name__: set(model.objects.values_list(*columns))
+        for model, columns in (
+            (EntityDailyUsage, ("entity_id", "date", "reports_created", "credits_spent")),
+            (EntityDailyServiceUsage, ("entity_id", "date", "service", "reports")),
+            (EntityDailyStatusUsage, ("entity_id", "date", "status", "reports")),
+        )
+    }
+
+
+@pytest.fixture
+def activity(api_client, user):
+    """Two reports created, both claimed, one completed; returns the credits spent."""
+    first = initiate(api_client, ["BUREAU_REPORT", "FINANCIAL_INFO"])
+    second = initiate(api_client, ["BUREAU_REPORT"])
+    claimed = claim_reports(user, limit=2)
+    transition(claimed[0], "COMPLETED", user)
+    return first["credits"] + second["credits"]
+
+
+@pytest.mark.django_db
+def test_write_paths_roll_up_per_entity_and_day(api_client, user, activity):
+    """Creations, claims and transitions are counted once the events are rolled up, in batches."""
+    assert UsageEvent.objects.count() == 5
+    assert roll_up_usage(batch_size=2) == 5
+    assert not UsageEvent.objects.exists()
+
+    today = localdate()
+    response = api_client.get(reverse("usage-analytics"))
+    assert response.status_code == 200
+    assert response.data["end"] == today and response.data["start"] == today - timedelta(days=29)
+    assert response.data["totals"] == {
+        "reports_created": 2,
+        "credits_spent": activity,
+        "statuses": {"REQUEST_RAISED": 2, "UNDER_ASSESMENT": 2, "COMPLETED": 1},
+        "services": {"BUREAU_REPORT": 2, "FINANCIAL_INFO": 1},
+    }
+    assert [day["date"] for day in response.data["days"]] == [today]
+
+    # Later events add to the same rows
+    initiate(api_client, ["FINANCIAL_INFO"])
+    roll_up_usage()
+    assert api_client.get(reverse("usage-analytics")).data["totals"]["services"] == {"BUREAU_REPORT": 2, "FINANCIAL_INFO": 2}
+
+
+@pytest.mark.django_db
+def test_rebuild_reproduces_incremental_rollups(user, activity):
+    """Recomputing a day from the source tables gives the rows the write paths produced."""
+    roll_up_usage()
+    incremental = rollups()
+    EntityDailyUsage.objects.update(reports_created=0)
+
+    assert rebuild_usage(localdate(), localdate()) == 6
+    assert rollups() == incremental
+
+
+@pytest.mark.django_db
+def test_service_edits_keep_creation_services(api_client, user):
+    """A report counts under the services it was created with, whenever the rollup runs and after a rebuild."""
+    report = initiate(api_client, ["BUREAU_REPORT"])
+    response = api_client.put(reverse("edit-report", args=[report["id"]]), {"services": ["FINANCIAL_INFO"]}, format="json")
+    assert response.status_code == 200
+
+    roll_up_usage()
+    incremental = rollups()
+    assert {row[2:] for row in incremental["EntityDailyServiceUsage"]} == {("BUREAU_REPORT", 1)}
+
+    rebuild_usage(localdate(), localdate())
+    assert rollups() == incremental
+
+
+@pytest.mark.django_db
+def test_rebuild_command_replaces_pending_events(user, activity):
+    """The command covers events not yet rolled up, so nothing is counted twice."""
+    call_command("rebuild_usage_rollups", since=localdate(), until=localdate())
+    assert not UsageEvent.objects.exists()
+    roll_up_usage()
+    assert EntityDailyUsage.objects.get().reports_created == 2
+
+
+@pytest.mark.django_db
+def test_analytics_is_scoped_and_validated(api_client, user, activity, settings):
+    """Each entity sees only its own usage; inverted or oversized ranges are rejected."""
+    roll_up_usage()
+    other = User.objects.create(username="other@example.com", email="other@example.com",
+                                entity=Entity.objects.create(name="Other", entity_type="BANK"))
+    outsider = APIClient()
+    outsider.credentials(HTTP_AUTHORIZATION=f"Bearer {IndexedRefreshToken.for_user(other).access_token}")
+    assert outsider.get(reverse("usage-analytics")).data["days"] == []
+
+    today = localdate()
+    url = reverse("usage-analytics")
+    assert api_client.get(url, {"start": today, "end": today - timedelta(days=1)}).status_code == 400
+    settings.USAGE_ANALYTICS_MAX_DAYS = 7
+    assert api_client.get(url, {"start": today - timedelta(days=7), "end": today}).status_code == 400
+    assert api_client.get(url, {"start": today - timedelta(days=6), "end": today}).status_code == 200